@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Caso del control adaptativo contra el sitio sintético con latencia inyectada
+Descarga fichas de standin_server.py a través de AdaptiveController en tres
+fases: latencia normal, un pico de latencia y de nuevo latencia normal, y
+muestra cómo el límite de requests en curso baja durante el pico y se
+recupera después. Termina con código 1 si el controlador no retrocede o no
+se recupera.
+
+Uso: python benchmark_controller.py --latency 0.02 --spike-latency 0.2 --max-limit 8
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+from typing import Dict, List
+import requests
+from rate_controller import AdaptiveController
+from standin_server import Faults, StandinServer, SyntheticSite
+
+
+def run_phase(server: StandinServer, controller: AdaptiveController, rbds: List[str], seconds: float) -> Dict:
+    """
+    Descarga fichas con tantos hilos como controller.max_limit durante
+    `seconds` segundos (el controlador decide cuántas van en curso) y
+    retorna requests, errores y el límite mínimo y final de la fase
+    """
+    deadline = time.monotonic() + seconds
+    counts = {'requests': 0, 'errors': 0}
+    lowest = [controller.limit]
+    lock = threading.Lock()
+
+    def worker(offset: int):
+        session = requests.Session()
+        i = offset
+        while time.monotonic() < deadline:
+            url = server.ficha_url_template.format(rbd=rbds[i % len(rbds)])
+            i += controller.max_limit
+            with controller.track("ficha") as outcome:
+                try:
+                    ok = session.get(url, timeout=30).status_code == 200
+                except requests.RequestException:
+                    ok = False
+                if not ok:
+                    outcome.fail()
+            with lock:
+                counts['requests'] += 1
+                counts['errors'] += not ok
+                lowest[0] = min(lowest[0], controller.limit)
+        session.close()
+
+    threads = [threading.Thread(target=worker, args=(offset,), name=f"fase-{offset}")
+               for offset in range(controller.max_limit)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {**counts, 'min_limit': lowest[0], 'final_limit': controller.limit, 'interval': controller.interval}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retroceso y recuperación del control adaptativo ante un pico de latencia")
+    parser.add_argument("--latency", type=float, default=0.02, help="Latencia normal del servidor (s)")
+    parser.add_argument("--spike-latency", type=float, default=0.2, help="Latencia durante el pico (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Variación aleatoria de la latencia (s)")
+    parser.add_argument("--max-limit", type=int, default=8, help="Máximo de requests en curso")
+    parser.add_argument("--normal-seconds", type=float, default=5, help="Duración de la fase inicial")
+    parser.add_argument("--spike-seconds", type=float, default=3, help="Duración del pico")
+    parser.add_argument("--recovery-seconds", type=float, default=30, help="Duración de la fase posterior al pico")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del sitio sintético")
+    parser.add_argument("--verbose", action="store_true", help="Muestra cada decisión del controlador")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s - %(levelname)s - %(message)s')
+
+    site = SyntheticSite(schools=200, seed=args.seed)
+    rbds = list(site.schools)
+    faults = Faults(latency=args.latency, jitter=args.jitter, seed=args.seed)
+    controller = AdaptiveController(max_limit=args.max_limit)
+    phases = [
+        ("normal", args.latency, args.normal_seconds),
+        ("pico", args.spike_latency, args.spike_seconds),
+        ("recuperación", args.latency, args.recovery_seconds),
+    ]
+    results = {}
+    with StandinServer(site, faults=faults) as server:
+        for name, latency, seconds in phases:
+            faults.update(latency=latency)
+            results[name] = result = run_phase(server, controller, rbds, seconds)
+            print(f"{name:>13}: latencia {latency:.3f}s, {result['requests']} requests "
+                  f"({result['errors']} errores), límite mínimo {result['min_limit']}, "
+                  f"límite final {result['final_limit']}, intervalo {result['interval']:.2f}s")
+
+    before = results["normal"]['final_limit']
+    backed_off = results["pico"]['min_limit'] < before
+    recovered = results["recuperación"]['final_limit'] >= before
+    print(f"Retrocede en el pico: {'sí' if backed_off else 'no'} ({before}→{results['pico']['min_limit']}); "
+          f"se recupera: {'sí' if recovered else 'no'} (→{results['recuperación']['final_limit']})")
+    controller.log_summary()
+    sys.exit(0 if backed_off and recovered else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Verificación y micro-benchmark del parser de fichas (sin red ni navegador)
+Parsea las fichas guardadas en fixtures/fichas, compara cada resultado con
+su .json esperado y mide cuántas páginas por segundo se parsean
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import Dict, List, Tuple
+from mineduc_parser import parse_ficha_html
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "fichas")
+
+
+def load_fixtures(directory: str = FIXTURES_DIR) -> List[Tuple[str, str, Dict]]:
+    """Retorna (nombre, html, esperado) por cada par .html/.json del directorio"""
+    fixtures = []
+    for filename in sorted(os.listdir(directory)):
+        if not filename.endswith(".html"):
+            continue
+        name = filename[:-len(".html")]
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as f:
+            html = f.read()
+        with open(os.path.join(directory, f"{name}.json"), 'r', encoding='utf-8') as f:
+            expected = json.load(f)
+        fixtures.append((name, html, expected))
+    return fixtures
+
+
+def check_fixtures(fixtures: List[Tuple[str, str, Dict]]) -> int:
+    """Compara el parseo de cada ficha con lo esperado y retorna la cantidad de errores"""
+    errors = 0
+    for name, html, expected in fixtures:
+        parsed = parse_ficha_html(html)
+        diffs = {
+            field: (expected.get(field), parsed.get(field))
+            for field in set(expected) | set(parsed)
+            if expected.get(field) != parsed.get(field)
+        }
+        if diffs:
+            errors += 1
+            print(f"✗ {name}")
+            for field, (want, got) in sorted(diffs.items()):
+                print(f"    {field}: esperado {want!r}, obtenido {got!r}")
+        else:
+            print(f"✓ {name}")
+    return errors
+
+
+def benchmark(fixtures: List[Tuple[str, str, Dict]], seconds: float) -> float:
+    """Parsea las fichas en ciclo durante `seconds` segundos y retorna páginas por segundo"""
+    pages = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < seconds:
+        for _, html, _ in fixtures:
+            parse_ficha_html(html)
+        pages += len(fixtures)
+        elapsed = time.perf_counter() - start
+    return pages / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica y mide el parser de fichas MINEDUC")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directorio con pares .html/.json")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duración del benchmark")
+    parser.add_argument("--min-rate", type=float, default=0.0,
+                        help="Falla si se parsean menos páginas por segundo que este valor")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No hay fichas en {args.fixtures}")
+        return 1
+
+    errors = check_fixtures(fixtures)
+    rate = benchmark(fixtures, args.seconds)
+    print(f"\n{len(fixtures)} fichas, {errors} con diferencias")
+    print(f"Velocidad: {rate:.1f} páginas/segundo ({1000 / rate:.2f} ms por página)")
+
+    if errors:
+        return 1
+    if rate < args.min_rate:
+        print(f"✗ Velocidad bajo el mínimo de {args.min_rate:.1f} páginas/segundo")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Benchmark de punta a punta del scraper contra el sitio sintético local
+Ejecuta scrape_all completo sobre standin_server.py con 1, 10 y 100 comunas
+(configurable) para cada motor y nivel de concurrencia, y guarda en JSON los
+colegios por minuto, la latencia por colegio (p50/p95/p99), la memoria máxima
+(RSS) y el tiempo de CPU de cada caso (del proceso de Python y de sus procesos
+hijos), para comparar ejecuciones entre commits.
+
+Uso: python benchmark_scraper.py --sizes 1,10,100 --engines selenium,http --concurrency 1,4
+     python benchmark_scraper.py --compare benchmarks/scraper_anterior.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from datetime import datetime
+from typing import Dict, List, Optional
+from mineduc_parser import select_fields
+from standin_server import Faults, StandinServer, SyntheticSite
+
+logger = logging.getLogger(__name__)
+
+RESULTS_DIR = "benchmarks"
+
+
+def _percentile(values: List[float], fraction: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ProcessTreeSampler:
+    """
+    Muestrea en segundo plano, leyendo /proc, los procesos descendientes del
+    actual (chromedriver, Chrome con sus procesos de render y selenium-manager):
+    el pico de la suma de sus RSS y el CPU de todos ellos, incluidos los que ya
+    terminaron (se cuenta su última muestra). Es una aproximación: lo que un
+    proceso hace después de su última muestra no se ve. Solo Linux; sin /proc
+    los resultados quedan en None.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self.available = os.path.isdir("/proc/self")
+        self.peak_rss_bytes = 0
+        # (pid, inicio) → segundos de CPU en la última muestra
+        self._cpu: Dict[tuple, float] = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if self.available else 0
+        self._ticks = os.sysconf("SC_CLK_TCK") if self.available else 0
+
+    @staticmethod
+    def _read_stat(pid: str) -> Optional[List[str]]:
+        """Campos de /proc/<pid>/stat que siguen al nombre (estado, ppid, ...)"""
+        try:
+            with open(f"/proc/{pid}/stat", 'r') as f:
+                return f.read().rsplit(")", 1)[1].split()
+        except (OSError, IndexError):
+            return None
+
+    def sample(self):
+        """Suma RSS y CPU de los descendientes del proceso actual"""
+        stats = {}
+        for pid in os.listdir("/proc"):
+            if pid.isdigit():
+                fields = self._read_stat(pid)
+                if fields:
+                    stats[int(pid)] = fields
+        children: Dict[int, List[int]] = {}
+        for pid, fields in stats.items():
+            children.setdefault(int(fields[1]), []).append(pid)
+        pending = list(children.get(os.getpid(), []))
+        rss = 0
+        while pending:
+            pid = pending.pop()
+            pending.extend(children.get(pid, []))
+            fields = stats[pid]
+            rss += int(fields[21]) * self._page_size
+            self._cpu[(pid, fields[19])] = (int(fields[11]) + int(fields[12])) / self._ticks
+        self.peak_rss_bytes = max(self.peak_rss_bytes, rss)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def start(self) -> "ProcessTreeSampler":
+        if self.available:
+            self._thread = threading.Thread(target=self._run, name="muestreo_procesos", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self.sample()
+
+    @property
+    def peak_rss_mb(self) -> Optional[float]:
+        return self.peak_rss_bytes / (1024 * 1024) if self.available else None
+
+    @property
+    def cpu_seconds(self) -> Optional[float]:
+        return sum(self._cpu.values()) if self.available else None
+
+
+def _run_case(options: Dict, catalog_tree: List, workdir: str, result_queue):
+    """
+    Proceso de un caso: ejecuta scrape_all en workdir (salida, registro y
+    catálogo propios) y reporta tiempos, latencias por colegio, RSS y CPU.
+    Corre en un proceso nuevo para que la memoria máxima sea solo la del caso
+    y sus descendientes sean solo los procesos que abrió el scraper.
+    """
+    os.chdir(workdir)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+    from comuna_catalog import ComunaCatalog
+    from scraper_mineduc import MinEducScraper
+
+    # Catálogo ya escrito: el caso mide el scraping, no la lectura de los dropdowns
+    catalog = ComunaCatalog("catalogo_comunas.json")
+    catalog.replace(catalog_tree)
+    catalog.save()
+
+    # Sin cargas de referencia del perfil liviano: solo se mide el scraping
+    scraper = MinEducScraper(headless=True, trace_file="trace.json", metrics_interval=3600,
+                             lean_calibrate=False, **options)
+    sampler = ProcessTreeSampler().start()
+    start = time.perf_counter()
+    error = None
+    try:
+        scraper.scrape_all()
+    except Exception as e:
+        error = str(e)
+    finally:
+        elapsed = time.perf_counter() - start
+        sampler.stop()
+        summary = scraper.metrics.summary()
+        scraper.close_output()
+
+    with open("trace.json", 'r', encoding='utf-8') as f:
+        spans = [event['dur'] / 1e6 for event in json.load(f)['traceEvents'] if event.get('name') == "colegio"]
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    records = len(scraper.data)
+    result_queue.put({
+        'records': records,
+        'fichas_failed': int(summary['counters'].get('fichas_failed', 0)),
+        'fichas_omitidas': int(summary['counters'].get('fichas_omitidas', 0)),
+        'elapsed_seconds': elapsed,
+        'schools_per_minute': records / elapsed * 60 if elapsed > 0 else 0.0,
+        'latency_p50': _percentile(spans, 0.5),
+        'latency_p95': _percentile(spans, 0.95),
+        'latency_p99': _percentile(spans, 0.99),
+        # ru_maxrss está en KB en Linux
+        'peak_rss_mb': own.ru_maxrss / 1024,
+        'cpu_seconds': own.ru_utime + own.ru_stime,
+        'descendants_peak_rss_mb': sampler.peak_rss_mb,
+        'descendants_cpu_seconds': sampler.cpu_seconds,
+        'error': error,
+    })
+
+
+def run_case(server: StandinServer, comunas: int, engine: str, concurrency: int,
+             fields: Optional[List[str]] = None, timeout: float = 3600) -> Dict:
+    """Ejecuta un caso en un proceso aparte contra el servidor y retorna su resultado"""
+    site = server.site
+    regions = [region for region in site.regions if site.comunas[region['value']]]
+    tree = [(region, site.comunas[region['value']]) for region in regions]
+    options = {
+        'engine': engine,
+        'concurrency': concurrency,
+        'base_url': server.base_url,
+        'ficha_url_template': server.ficha_url_template,
+        'fields': fields,
+    }
+    ctx = multiprocessing.get_context("spawn")
+    result_queue = ctx.Queue()
+    with tempfile.TemporaryDirectory(prefix="benchmark_scraper_") as workdir:
+        process = ctx.Process(target=_run_case, args=(options, tree, workdir, result_queue),
+                              name=f"benchmark-{engine}-{concurrency}-{comunas}")
+        process.start()
+        try:
+            result = result_queue.get(timeout=timeout)
+        except Exception:
+            process.terminate()
+            result = {'error': "el caso no terminó o no reportó resultados"}
+        process.join()
+    result.update({'comunas': comunas, 'schools': len(site.schools), 'engine': engine, 'concurrency': concurrency})
+    return result
+
+
+def compare(current: List[Dict], previous_path: str):
+    """Muestra la variación de colegios/min y p95 respecto a un JSON anterior"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = {(case['engine'], case['concurrency'], case['comunas']): case for case in json.load(f)['cases']}
+    print(f"\nComparación con {previous_path}:")
+    for case in current:
+        old = previous.get((case['engine'], case['concurrency'], case['comunas']))
+        if not old or not old.get('schools_per_minute') or not case.get('schools_per_minute'):
+            continue
+        change = 100 * (case['schools_per_minute'] / old['schools_per_minute'] - 1)
+        print(f"  {case['engine']:>8} c={case['concurrency']:<3} {case['comunas']:>4} comunas: "
+              f"{old['schools_per_minute']:.1f} → {case['schools_per_minute']:.1f} colegios/min ({change:+.1f}%), "
+              f"p95 {old['latency_p95'] or 0:.3f}s → {case['latency_p95'] or 0:.3f}s")
+
+
+def _int_list(text: str) -> List[int]:
+    return [int(value) for value in text.split(",") if value]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de punta a punta del scraper contra el sitio sintético")
+    parser.add_argument("--sizes", type=_int_list, default=[1, 10, 100], help="Comunas por caso (ej. 1,10,100)")
+    parser.add_argument("--engines", default="selenium,http", help="Motores a comparar")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 4], help="Niveles de concurrencia")
+    parser.add_argument("--schools-per-comuna", type=int, default=20, help="Colegios promedio por comuna")
+    parser.add_argument("--regions", type=int, default=4, help="Regiones del sitio sintético")
+    parser.add_argument("--latency", type=float, default=0.05, help="Latencia del servidor por request (s)")
+    parser.add_argument("--jitter", type=float, default=0.05, help="Variación aleatoria de la latencia (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas con error")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla del sitio sintético")
+    parser.add_argument("--fields", default=None, help="Campos que extrae el scraper (por defecto todos)")
+    parser.add_argument("--table-fields", default="",
+                        help="Columnas extra de la tabla de resultados del sitio sintético (ej. telefono,matricula_total)")
+    parser.add_argument("--output", default=None, help=f"JSON de resultados (por defecto en {RESULTS_DIR}/)")
+    parser.add_argument("--compare", default=None, help="JSON de una ejecución anterior para comparar")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    engines = [engine for engine in args.engines.split(",") if engine]
+    fields = select_fields(args.fields) if args.fields else None
+    commit = _git_commit()
+    cases = []
+    for comunas in args.sizes:
+        site = SyntheticSite(schools=comunas * args.schools_per_comuna, regions=min(args.regions, comunas),
+                             comunas=comunas, seed=args.seed,
+                             table_fields=[field for field in args.table_fields.split(",") if field])
+        faults = Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, seed=args.seed)
+        with StandinServer(site, faults=faults) as server:
+            for engine in engines:
+                for concurrency in args.concurrency:
+                    logger.info(f"Caso: {engine}, concurrencia {concurrency}, {comunas} comunas "
+                                f"({len(site.schools)} colegios)")
+                    result = run_case(server, comunas, engine, concurrency, fields)
+                    cases.append(result)
+                    if result.get('error'):
+                        logger.error(f"  Error: {result['error']}")
+                    if 'schools_per_minute' in result:
+                        logger.info(
+                            f"  {result['records']} colegios en {result['elapsed_seconds']:.1f}s "
+                            f"({result['schools_per_minute']:.1f} colegios/min), "
+                            f"p50 {result['latency_p50'] or 0:.3f}s p95 {result['latency_p95'] or 0:.3f}s "
+                            f"p99 {result['latency_p99'] or 0:.3f}s, RSS {result['peak_rss_mb']:.0f} MB "
+                            f"(procesos hijos {result['descendants_peak_rss_mb'] or 0:.0f} MB), "
+                            f"CPU {result['cpu_seconds']:.1f}s "
+                            f"(procesos hijos {result['descendants_cpu_seconds'] or 0:.1f}s)"
+                        )
+
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {
+            'schools_per_comuna': args.schools_per_comuna, 'regions': args.regions, 'latency': args.latency,
+            'jitter': args.jitter, 'error_rate': args.error_rate, 'seed': args.seed,
+            'fields': args.fields, 'table_fields': args.table_fields,
+        },
+        'cases': cases,
+    }
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"scraper_{datetime.now():%Y%m%d_%H%M%S}_{commit or 'sin_commit'}.json")
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"\nResultados guardados en {output}")
+
+    if args.compare:
+        compare(cases, args.compare)
+    return 1 if any(case.get('error') for case in cases) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Catálogo en disco de regiones y comunas del buscador MINEDUC
+Guarda el árbol región → comunas (value y texto de cada opción) junto con la
+última cantidad de colegios vista en cada comuna, para no recorrer los
+dropdowns en cada ejecución y poder planificar con tamaños reales
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Option = Dict[str, str]
+
+
+class ComunaCatalog:
+    """
+    Catálogo región → comunas guardado como JSON. Se considera vencido si no
+    existe o si su árbol se obtuvo hace más de `max_age` segundos; las
+    cantidades de colegios se actualizan cada vez que se busca una comuna.
+    """
+
+    def __init__(self, path: str = "catalogo_comunas.json", max_age: float = 30 * 24 * 3600):
+        """
+        Args:
+            path: Archivo JSON del catálogo
+            max_age: Segundos tras los cuales el árbol se vuelve a leer del sitio
+        """
+        self.path = path
+        self.max_age = max_age
+        self.updated = None
+        self._regions = []
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                self.updated = saved.get('updated')
+                self._regions = saved.get('regions', [])
+            except (OSError, ValueError) as e:
+                logger.warning(f"No se pudo leer el catálogo {path}, se volverá a generar: {e}")
+
+    def is_stale(self) -> bool:
+        """True si no hay catálogo o si es más antiguo que max_age"""
+        return not self._regions or self.updated is None or time.time() - self.updated > self.max_age
+
+    def regions(self) -> List[Tuple[Option, List[Option]]]:
+        """Retorna (región, comunas) en el orden de los dropdowns"""
+        with self._lock:
+            return [
+                ({'value': region['value'], 'text': region['text']},
+                 [{'value': comuna['value'], 'text': comuna['text']} for comuna in region['comunas']])
+                for region in self._regions
+            ]
+
+    def replace(self, tree: List[Tuple[Option, Optional[List[Option]]]]):
+        """
+        Reemplaza el árbol con el leído del sitio. Se conservan las cantidades
+        de colegios de las comunas que ya existían; una región con comunas
+        None (no se pudo leer) mantiene las comunas que tenía.
+        """
+        with self._lock:
+            previous = {region['value']: region for region in self._regions}
+            regions = []
+            for region, comunas in tree:
+                old = previous.get(region['value'])
+                if comunas is None:
+                    if old:
+                        regions.append(old)
+                    continue
+                old_comunas = {comuna['value']: comuna for comuna in (old or {}).get('comunas', [])}
+                regions.append({
+                    'value': region['value'],
+                    'text': region['text'],
+                    'comunas': [
+                        {
+                            'value': comuna['value'],
+                            'text': comuna['text'],
+                            'schools': old_comunas.get(comuna['value'], {}).get('schools'),
+                            'counted': old_comunas.get(comuna['value'], {}).get('counted'),
+                        }
+                        for comuna in comunas
+                    ],
+                })
+            self._regions = regions
+            self.updated = time.time()
+            self._save()
+
+    def school_count(self, region: Option, comuna: Option) -> Optional[int]:
+        """Última cantidad de colegios vista en la comuna (None si nunca se buscó)"""
+        entry = self._find(region, comuna)
+        return entry.get('schools') if entry else None
+
+    def set_school_count(self, region: Option, comuna: Option, count: int):
+        """Registra la cantidad de colegios encontrada al buscar la comuna"""
+        with self._lock:
+            entry = self._find(region, comuna)
+            if entry is None:
+                return
+            entry['schools'] = count
+            entry['counted'] = time.time()
+            self._save()
+
+    def _find(self, region: Option, comuna: Option) -> Optional[Dict]:
+        for entry in self._regions:
+            if entry['value'] == region['value']:
+                for candidate in entry['comunas']:
+                    if candidate['value'] == comuna['value']:
+                        return candidate
+        return None
+
+    def _save(self):
+        """Escribe el catálogo de forma atómica (archivo temporal + rename)"""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'updated': self.updated, 'regions': self._regions}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def log_summary(self):
+        """Registra en el log el tamaño del catálogo y los colegios conocidos"""
+        with self._lock:
+            comunas = [comuna for region in self._regions for comuna in region['comunas']]
+            counted = [comuna['schools'] for comuna in comunas if comuna.get('schools') is not None]
+            age_days = (time.time() - self.updated) / 86400 if self.updated else 0
+        logger.info(
+            f"Catálogo: {len(self._regions)} regiones, {len(comunas)} comunas "
+            f"({len(counted)} con conteo, {sum(counted)} colegios), actualizado hace {age_days:.1f} días"
+        )
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Registro persistente (SQLite) del estado de cada comuna y cada colegio
+Permite reanudar una ejecución saltando exactamente los RBD ya extraídos
+"""
+
+import time
+import logging
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Estados de una comuna o un colegio
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+
+class JobLedger:
+    """
+    Estado de cada región/comuna y de cada RBD. Cada cambio se confirma de
+    inmediato (WAL), así que tras un corte el registro refleja el último
+    estado conocido; los trabajos que quedaron en curso vuelven a pendientes.
+    """
+
+    def __init__(self, path: str = "scraper_ledger.sqlite", reset: bool = False):
+        """
+        Args:
+            path: Archivo SQLite del registro
+            reset: Si es True se borra el estado anterior (ejecución nueva)
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS comunas (
+                region_value TEXT NOT NULL, region_text TEXT NOT NULL,
+                comuna_value TEXT NOT NULL, comuna_text TEXT NOT NULL,
+                position INTEGER NOT NULL, state TEXT NOT NULL, updated REAL NOT NULL,
+                PRIMARY KEY (region_value, comuna_value)
+            );
+            CREATE TABLE IF NOT EXISTS schools (
+                rbd TEXT PRIMARY KEY, url TEXT NOT NULL,
+                region_value TEXT NOT NULL, comuna_value TEXT NOT NULL,
+                position INTEGER NOT NULL, state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0, error TEXT, updated REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS schools_comuna ON schools (region_value, comuna_value);
+        """)
+        with self._lock:
+            if reset:
+                self._db.execute("DELETE FROM comunas")
+                self._db.execute("DELETE FROM schools")
+            else:
+                # Lo que quedó en curso en la ejecución anterior se vuelve a intentar
+                self._db.execute("UPDATE comunas SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT))
+                self._db.execute("UPDATE schools SET state = ? WHERE state = ?", (PENDING, IN_FLIGHT))
+            self._db.commit()
+
+    # --- Comunas ---
+
+    def add_comunas(self, region: Dict[str, str], comunas: List[Dict[str, str]]):
+        """Registra las comunas de una región como pendientes (si no existían)"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO comunas VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(region['value'], region['text'], comuna['value'], comuna['text'], position, PENDING, now)
+                 for position, comuna in enumerate(comunas)]
+            )
+            self._db.commit()
+
+    def region_done(self, region: Dict[str, str]) -> bool:
+        """True si la región ya tiene comunas registradas y todas están completadas"""
+        with self._lock:
+            total, done = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(state = ?), 0) FROM comunas WHERE region_value = ?",
+                (DONE, region['value'])
+            ).fetchone()
+        return total > 0 and total == done
+
+    def comuna_state(self, region: Dict[str, str], comuna: Dict[str, str]) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT state FROM comunas WHERE region_value = ? AND comuna_value = ?",
+                (region['value'], comuna['value'])
+            ).fetchone()
+        return row[0] if row else None
+
+    def mark_comuna(self, region: Dict[str, str], comuna: Dict[str, str], state: str):
+        with self._lock:
+            self._db.execute(
+                "UPDATE comunas SET state = ?, updated = ? WHERE region_value = ? AND comuna_value = ?",
+                (state, time.time(), region['value'], comuna['value'])
+            )
+            self._db.commit()
+
+    def comuna_states(self) -> Dict[tuple, str]:
+        """Estado de cada comuna registrada, por (valor región, valor comuna)"""
+        with self._lock:
+            rows = self._db.execute("SELECT region_value, comuna_value, state FROM comunas").fetchall()
+        return {(region_value, comuna_value): state for region_value, comuna_value, state in rows}
+
+    # --- Colegios ---
+
+    def add_schools(self, region: Dict[str, str], comuna: Dict[str, str], rbd_urls: List[tuple]):
+        """Registra los (rbd, url) de una comuna como pendientes (si no existían)"""
+        now = time.time()
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO schools (rbd, url, region_value, comuna_value, position, state, updated)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(rbd, url, region['value'], comuna['value'], position, PENDING, now)
+                 for position, (rbd, url) in enumerate(rbd_urls)]
+            )
+            self._db.commit()
+
+    def done_rbds(self, region: Dict[str, str], comuna: Dict[str, str]) -> Set[str]:
+        """RBD ya extraídos de una comuna"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT rbd FROM schools WHERE region_value = ? AND comuna_value = ? AND state = ?",
+                (region['value'], comuna['value'], DONE)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def mark_schools(self, rbds: Iterable[str], state: str, error: Optional[str] = None):
+        """Cambia el estado de varios RBD; pasar a en curso cuenta un intento"""
+        now = time.time()
+        attempt = 1 if state == IN_FLIGHT else 0
+        with self._lock:
+            self._db.executemany(
+                "UPDATE schools SET state = ?, error = ?, attempts = attempts + ?, updated = ? WHERE rbd = ?",
+                [(state, error, attempt, now, rbd) for rbd in rbds]
+            )
+            self._db.commit()
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Cantidad de comunas y colegios por estado"""
+        with self._lock:
+            return {
+                table: dict(self._db.execute(f"SELECT state, COUNT(*) FROM {table} GROUP BY state").fetchall())
+                for table in ("comunas", "schools")
+            }
+
+    def log_counts(self):
+        counts = self.counts()
+        logger.info(f"Registro de trabajos: comunas {counts['comunas']}, colegios {counts['schools']}")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Perfil liviano de Chrome para el scraper MINEDUC
+Bloquea imágenes, fuentes, multimedia y hosts de terceros (analítica, redes
+sociales, CDNs de fuentes) y mide cuántos bytes y cuánto tiempo se ahorran
+por página respecto a una carga completa
+"""
+
+import time
+import logging
+import threading
+from typing import Dict, List, Optional
+from selenium.webdriver.support.ui import WebDriverWait
+
+logger = logging.getLogger(__name__)
+
+# Patrones de Network.setBlockedURLs ('*' calza cualquier texto). No incluye
+# scripts ni hojas de estilo del propio sitio: el JS que llena #comuna y los
+# formularios EnviaBusqueda/fichaescuela tiene que seguir funcionando.
+DEFAULT_BLOCKED_URLS = [
+    # Imágenes
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.bmp",
+    # Fuentes
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    # Multimedia
+    "*.mp4", "*.webm", "*.mp3", "*.ogg", "*.wav", "*.avi",
+    # Terceros
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*fonts.googleapis.com*", "*fonts.gstatic.com*", "*facebook.net*", "*facebook.com*",
+    "*twitter.com*", "*youtube.com*", "*hotjar.com*", "*addthis.com*",
+]
+
+# Bytes transferidos por el documento y sus recursos (Resource Timing)
+PAGE_WEIGHT_SCRIPT = """
+var entries = performance.getEntriesByType('navigation').concat(performance.getEntriesByType('resource'));
+var bytes = 0;
+for (var i = 0; i < entries.length; i++) { bytes += entries[i].transferSize || 0; }
+return bytes;
+"""
+
+
+def configure_lean_options(chrome_options):
+    """
+    Estrategia de carga 'eager': driver.get retorna con el DOM listo, sin
+    esperar imágenes ni iframes. Las esperas explícitas de readiness cubren
+    lo que el JS de la página completa después.
+    """
+    chrome_options.page_load_strategy = "eager"
+
+
+def set_blocked_urls(driver, patterns: List[str]):
+    """Activa (o con una lista vacía, desactiva) el bloqueo de URLs vía CDP"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+
+def set_cache_disabled(driver, disabled: bool):
+    """Desactiva (o vuelve a activar) la caché HTTP de Chrome vía CDP"""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setCacheDisabled", {"cacheDisabled": disabled})
+
+
+def page_weight(driver) -> int:
+    """Bytes transferidos por la página actual"""
+    return driver.execute_script(PAGE_WEIGHT_SCRIPT) or 0
+
+
+class LeanLoadStats:
+    """
+    Carga páginas con el bloqueo activo y acumula bytes y segundos por tipo
+    de página. La primera página de cada tipo se carga además sin bloqueo y
+    con bloqueo, ambas sin caché (referencia), para estimar el ahorro. Es
+    segura entre hilos.
+    """
+
+    def __init__(self, blocked_urls: List[str], calibrate: bool = True):
+        """
+        Args:
+            blocked_urls: Patrones que se bloquean en cada driver
+            calibrate: Si es True se mide una carga completa por tipo de página
+        """
+        self.blocked_urls = blocked_urls
+        self.calibrate = calibrate
+        self.baseline: Dict[str, Dict[str, float]] = {}
+        self.reference: Dict[str, Dict[str, float]] = {}
+        self.loads: Dict[str, Dict[str, float]] = {}
+        self._calibrating = set()
+        self._lock = threading.Lock()
+
+    def enable(self, driver):
+        """Aplica el bloqueo a un driver recién creado"""
+        set_blocked_urls(driver, self.blocked_urls)
+
+    def load(self, driver, url: str, kind: str):
+        """Navega a url con el perfil liviano y registra lo transferido"""
+        if self._claim_calibration(kind):
+            try:
+                self._measure_baseline(driver, url, kind)
+            except Exception as e:
+                logger.warning(f"No se pudo medir la carga completa de '{kind}': {e}")
+            finally:
+                self.enable(driver)
+
+        start = time.monotonic()
+        driver.get(url)
+        elapsed = time.monotonic() - start
+        self._record(self.loads, kind, page_weight(driver), elapsed)
+
+    def _claim_calibration(self, kind: str) -> bool:
+        with self._lock:
+            if not self.calibrate or kind in self._calibrating:
+                return False
+            self._calibrating.add(kind)
+            return True
+
+    def _measure_baseline(self, driver, url: str, kind: str):
+        """
+        Carga url sin bloqueo y luego con bloqueo, las dos con la caché de
+        Chrome desactivada: la diferencia es solo lo bloqueado, y la carga
+        completa no deja en la caché recursos que abaratarían las siguientes
+        """
+        set_blocked_urls(driver, [])
+        set_cache_disabled(driver, True)
+        try:
+            self._record(self.baseline, kind, *self._complete_load(driver, url))
+            set_blocked_urls(driver, self.blocked_urls)
+            self._record(self.reference, kind, *self._complete_load(driver, url))
+        finally:
+            set_cache_disabled(driver, False)
+
+    @staticmethod
+    def _complete_load(driver, url: str) -> tuple:
+        """Carga url hasta document.readyState == 'complete' y retorna (bytes, segundos)"""
+        start = time.monotonic()
+        driver.get(url)
+        WebDriverWait(driver, 30).until(lambda d: d.execute_script("return document.readyState") == "complete")
+        return page_weight(driver), time.monotonic() - start
+
+    def _record(self, table: Dict[str, Dict[str, float]], kind: str, weight: int, elapsed: float):
+        with self._lock:
+            stats = table.setdefault(kind, {'pages': 0, 'bytes': 0, 'seconds': 0.0})
+            stats['pages'] += 1
+            stats['bytes'] += weight
+            stats['seconds'] += elapsed
+
+    def summary(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Por tipo de página: páginas, bytes y segundos promedio, y el ahorro
+        por página de la referencia sin caché (carga completa menos carga con
+        bloqueo; None sin referencia)
+        """
+        with self._lock:
+            result = {}
+            for kind, stats in self.loads.items():
+                avg_bytes = stats['bytes'] / stats['pages']
+                avg_seconds = stats['seconds'] / stats['pages']
+                base = self.baseline.get(kind)
+                lean = self.reference.get(kind)
+                paired = base is not None and lean is not None
+                result[kind] = {
+                    'pages': stats['pages'],
+                    'avg_bytes': avg_bytes,
+                    'avg_seconds': avg_seconds,
+                    'saved_bytes': base['bytes'] / base['pages'] - lean['bytes'] / lean['pages'] if paired else None,
+                    'saved_seconds': (base['seconds'] / base['pages'] - lean['seconds'] / lean['pages']
+                                      if paired else None),
+                }
+            return result
+
+    def log_summary(self):
+        """Registra en el log el peso promedio por página y el ahorro estimado"""
+        for kind, stats in sorted(self.summary().items()):
+            message = (
+                f"Perfil liviano '{kind}': {stats['pages']} páginas, promedio "
+                f"{stats['avg_bytes'] / 1024:.1f} KB y {stats['avg_seconds']:.2f}s por página"
+            )
+            if stats['saved_bytes'] is not None:
+                message += (
+                    f"; ahorro estimado {stats['saved_bytes'] / 1024:.1f} KB y "
+                    f"{stats['saved_seconds']:.2f}s por página"
+                )
+            logger.info(message)
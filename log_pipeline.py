@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Logging sin bloqueo para los scrapers MINEDUC
+Los hilos de scraping solo encolan el registro (QueueHandler); el formateo y
+la escritura a disco y consola los hace un hilo aparte (QueueListener). Los
+datos de cada colegio se registran como JSON en un archivo propio con
+rotación, y cada etapa (logger) puede tener su propio nivel.
+"""
+
+import json
+import queue
+import logging
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional
+
+# Logger de los registros por colegio (un JSON por colegio extraído)
+SCHOOL_LOGGER = "colegios"
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+def log_school(logger: logging.Logger, message: str, school: Dict, level: int = logging.INFO, **fields):
+    """
+    Registra los datos de un colegio como registro estructurado. No hace nada
+    (ni copia el registro) si el nivel del logger lo descarta.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={'school': dict(school, **fields)})
+
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    Encola el LogRecord tal cual: el mensaje se arma con sus args recién en
+    el hilo del listener, no en el hilo que llamó al logger
+    """
+
+    def prepare(self, record):
+        return record
+
+
+class _SchoolFilter(logging.Filter):
+    """Deja pasar solo (o excluye) los registros estructurados de colegios"""
+
+    def __init__(self, schools: bool):
+        super().__init__()
+        self.schools = schools
+
+    def filter(self, record):
+        return hasattr(record, 'school') == self.schools
+
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por registro: hora, nivel, logger, mensaje y los datos del colegio"""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'school', {}))
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class LogPipeline:
+    """
+    Configura el logging raíz con un QueueHandler y un listener que escribe
+    en consola, en un log de texto y en un log JSON de colegios, ambos con
+    rotación por tamaño. Usar start()/stop() (o como context manager).
+    """
+
+    def __init__(self, log_file: str, school_log_file: Optional[str] = None, level: str = "INFO",
+                 levels: Optional[Dict[str, str]] = None, max_bytes: int = 20 * 1024 * 1024,
+                 backup_count: int = 5, console: bool = True):
+        """
+        Args:
+            log_file: Log de texto (mensajes de progreso, advertencias y errores)
+            school_log_file: Log JSON con un registro por colegio (None no lo escribe)
+            level: Nivel del logger raíz
+            levels: Nivel por etapa, p. ej. {"colegios": "WARNING", "readiness": "DEBUG"}
+            max_bytes: Tamaño máximo de cada archivo antes de rotarlo
+            backup_count: Archivos rotados que se conservan
+            console: Si es True los mensajes de texto también van a la consola
+        """
+        self.level = level
+        self.levels = levels or {}
+        self.queue = queue.SimpleQueue()
+        self.handlers = []
+
+        text_formatter = logging.Formatter(TEXT_FORMAT)
+        text_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.handlers.append(text_handler)
+        if console:
+            self.handlers.append(logging.StreamHandler())
+        for handler in self.handlers:
+            handler.setFormatter(text_formatter)
+            handler.addFilter(_SchoolFilter(schools=False))
+
+        if school_log_file:
+            school_handler = RotatingFileHandler(school_log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                 encoding='utf-8')
+            school_handler.setFormatter(JsonFormatter())
+            school_handler.addFilter(_SchoolFilter(schools=True))
+            self.handlers.append(school_handler)
+
+        self._listeners = []
+        self._queue_handler = None
+
+    def start(self) -> "LogPipeline":
+        """Reemplaza los handlers del logger raíz por la cola y arranca el listener"""
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        self._queue_handler = _DeferredQueueHandler(self.queue)
+        root.addHandler(self._queue_handler)
+        apply_levels(self.level, self.levels)
+        self.listen(self.queue)
+        return self
+
+    def listen(self, source) -> QueueListener:
+        """
+        Escribe también los registros que lleguen por otra cola, por ejemplo
+        la multiprocessing.Queue de los procesos del pool
+        """
+        listener = QueueListener(source, *self.handlers, respect_handler_level=True)
+        listener.start()
+        self._listeners.append(listener)
+        return listener
+
+    def stop(self):
+        """Vacía las colas, detiene los listeners y cierra los archivos"""
+        for listener in self._listeners:
+            listener.stop()
+        self._listeners = []
+        if self._queue_handler:
+            logging.getLogger().removeHandler(self._queue_handler)
+            self._queue_handler = None
+        for handler in self.handlers:
+            handler.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def apply_levels(level: str = "INFO", levels: Optional[Dict[str, str]] = None):
+    """Aplica el nivel del logger raíz y el de cada etapa"""
+    logging.getLogger().setLevel(level)
+    for name, stage_level in (levels or {}).items():
+        logging.getLogger(name).setLevel(stage_level)
+
+
+def configure_worker_logging(log_queue, level: str = "INFO", levels: Optional[Dict[str, str]] = None):
+    """
+    Logging de un proceso del pool: todo se envía por log_queue al proceso
+    principal, que es el único que escribe los archivos
+    """
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+    apply_levels(level, levels)
+
+
+class ForwardHandler(logging.Handler):
+    """
+    Reenvía registros que llegan de otro proceso al logger del mismo nombre
+    en este proceso, para que los escriba la configuración de logging vigente
+    """
+
+    def emit(self, record):
+        logging.getLogger(record.name).handle(record)
+
+
+def current_levels() -> Dict[str, str]:
+    """
+    Nivel del logger raíz (clave 'root') y de cada logger configurado
+    explícitamente, para replicarlos en otro proceso
+    """
+    levels = {
+        name: logging.getLevelName(logger.level)
+        for name, logger in logging.root.manager.loggerDict.items()
+        if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET
+    }
+    levels['root'] = logging.getLevelName(logging.root.level)
+    return levels
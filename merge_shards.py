@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Combina las salidas de los shards en colegios_chile.jsonl / colegios_chile.xlsx
+Antes de combinar verifica con los manifiestos que estén todos los shards del
+mismo reparto, que cada uno haya terminado sus comunas y que su salida sea la
+misma que registró el manifiesto. Los RBD repetidos se escriben una sola vez
+(ver record_merge.py).
+
+Uso: python merge_shards.py [shard_manifest_shard1de4.json ...] [--allow-incomplete]
+"""
+
+import os
+import sys
+import glob
+import logging
+import argparse
+from typing import Dict, List
+from mineduc_parser import record_columns
+from record_merge import merge_outputs
+from record_sink import export_excel
+from sharding import file_sha256, load_manifest
+
+logger = logging.getLogger(__name__)
+
+
+def verify_manifests(manifests: List[Dict], base_dir: str, allow_incomplete: bool = False) -> List[str]:
+    """
+    Problemas que impiden combinar los shards (lista vacía si está todo bien):
+    shards faltantes, de otro reparto o con otros campos, comunas sin terminar, comunas
+    repetidas o sin asignar y salidas que no coinciden con su manifiesto
+    """
+    if not manifests:
+        return ["No se encontraron manifiestos de shards"]
+    problems = []
+    total = manifests[0]['shards']
+    digest = manifests[0]['plan_digest']
+    for manifest in manifests:
+        if manifest['shards'] != total or manifest['plan_digest'] != digest:
+            problems.append(f"El shard {manifest['shard']}/{manifest['shards']} usa otro reparto")
+        if manifest.get('fields') != manifests[0].get('fields'):
+            problems.append(f"El shard {manifest['shard']}/{manifest['shards']} extrajo otros campos")
+    indices = sorted(manifest['shard'] for manifest in manifests)
+    missing = sorted(set(range(1, total + 1)) - set(indices))
+    if missing:
+        problems.append(f"Faltan los shards {', '.join(map(str, missing))} de {total}")
+    if len(indices) != len(set(indices)):
+        problems.append("Hay manifiestos repetidos para un mismo shard")
+
+    seen = set()
+    for manifest in manifests:
+        label = f"Shard {manifest['shard']}/{manifest['shards']}"
+        for entry in manifest['assigned']:
+            key = (entry['region'], entry['comuna'])
+            if key in seen:
+                problems.append(f"La comuna {entry['region_text']} / {entry['comuna_text']} está en más de un shard")
+            seen.add(key)
+        pending = [entry for entry in manifest['assigned'] if entry['state'] != 'done']
+        if pending and not allow_incomplete:
+            names = ", ".join(f"{entry['comuna_text']} ({entry['state']})" for entry in pending[:5])
+            problems.append(f"{label}: {len(pending)} comunas sin completar: {names}"
+                            f"{'...' if len(pending) > 5 else ''}")
+        output = os.path.join(base_dir, manifest['output_file'])
+        if file_sha256(output) != manifest['output_sha256']:
+            problems.append(f"{label}: {output} no coincide con el manifiesto (falta o cambió)")
+    if not missing and len(seen) != manifests[0]['comunas_total']:
+        problems.append(f"Los shards cubren {len(seen)} de {manifests[0]['comunas_total']} comunas")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica y combina las salidas de los shards del scraper")
+    parser.add_argument("manifests", nargs="*",
+                        help="Manifiestos de los shards (por defecto shard_manifest_*.json)")
+    parser.add_argument("--output", default="colegios_chile.jsonl", help="Salida JSONL combinada")
+    parser.add_argument("--excel", default="colegios_chile.xlsx", help="Excel combinado")
+    parser.add_argument("--allow-incomplete", action="store_true",
+                        help="Combina aunque haya comunas sin completar")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    paths = args.manifests or sorted(glob.glob("shard_manifest_*.json"))
+    manifests = sorted((load_manifest(path) for path in paths), key=lambda manifest: manifest['shard'])
+    base_dir = os.path.dirname(paths[0]) if paths else "."
+    problems = verify_manifests(manifests, base_dir, args.allow_incomplete)
+    for problem in problems:
+        logger.error(problem)
+    if problems:
+        logger.error("No se combinaron los shards")
+        return 1
+
+    outputs = [os.path.join(base_dir, manifest['output_file']) for manifest in manifests]
+    stats = merge_outputs(outputs, args.output)
+    logger.info(f"{len(manifests)} shards combinados en {args.output}: {stats['unique']} registros "
+                f"({stats['duplicates']} RBD repetidos descartados)")
+    total = export_excel(args.output, args.excel, record_columns(manifests[0].get('fields')))
+    logger.info(f"Datos guardados en {args.excel} ({total} registros)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Métricas de tiempo por etapa del scraper MINEDUC
+Contadores e histogramas de latencia por etapa (carga de páginas, búsquedas,
+fichas, cada campo, checkpoints, exportación) que se escriben al final de la
+ejecución y cada cierto tiempo en formato texto de Prometheus y en un resumen
+JSON con el rendimiento en colegios por minuto
+"""
+
+import os
+import json
+import time
+import bisect
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Límites superiores (segundos) de los buckets del histograma
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, fraction: float) -> float:
+        """Límite superior del bucket donde cae el percentil (el máximo en el último)"""
+        target = fraction * self.count
+        cumulative = 0
+        for index, bucket_count in enumerate(self.counts):
+            cumulative += bucket_count
+            if cumulative >= target and bucket_count:
+                return BUCKETS[index] if index < len(BUCKETS) else self.max
+        return self.max
+
+
+class Metrics:
+    """
+    Contadores e histogramas por etapa, seguros entre hilos. Con
+    start_periodic() se escriben cada `interval` segundos en un hilo aparte.
+    """
+
+    def __init__(self, prometheus_file: Optional[str] = "scraper_metrics.prom",
+                 summary_file: Optional[str] = "scraper_metrics.json", prefix: str = "scraper"):
+        """
+        Args:
+            prometheus_file: Archivo en formato texto de Prometheus (None no lo escribe)
+            summary_file: Archivo JSON con el resumen (None no lo escribe)
+            prefix: Prefijo de los nombres de las métricas
+        """
+        self.prometheus_file = prometheus_file
+        self.summary_file = summary_file
+        self.prefix = prefix
+        self.started = time.time()
+        self.counters: Dict[str, float] = {}
+        self.histograms: Dict[str, _Histogram] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def inc(self, name: str, value: float = 1):
+        """Suma value al contador name"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, stage: str, seconds: float):
+        """Registra la duración de una ejecución de la etapa"""
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = _Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage: str):
+        """Mide la duración del bloque como una observación de la etapa"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def schools_per_minute(self) -> float:
+        minutes = (time.time() - self.started) / 60
+        return self.counters.get('schools', 0) / minutes if minutes > 0 else 0.0
+
+    def summary(self) -> Dict:
+        """Resumen con contadores, estadísticas por etapa y colegios por minuto"""
+        with self._lock:
+            return {
+                'started': self.started,
+                'elapsed_seconds': time.time() - self.started,
+                'schools_per_minute': self.schools_per_minute(),
+                'counters': dict(self.counters),
+                'stages': {
+                    stage: {
+                        'count': histogram.count,
+                        'sum': histogram.sum,
+                        'avg': histogram.sum / histogram.count if histogram.count else 0.0,
+                        'max': histogram.max,
+                        'p50': histogram.quantile(0.5),
+                        'p95': histogram.quantile(0.95),
+                        'p99': histogram.quantile(0.99),
+                    }
+                    for stage, histogram in sorted(self.histograms.items())
+                },
+            }
+
+    def prometheus_text(self) -> str:
+        """Métricas en el formato de exposición de texto de Prometheus"""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric} {value}")
+
+            metric = f"{self.prefix}_stage_seconds"
+            lines.append(f"# HELP {metric} Duración de cada etapa del scraping")
+            lines.append(f"# TYPE {metric} histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                label = stage.replace('\\', '\\\\').replace('"', '\\"')
+                cumulative = 0
+                for bucket, bucket_count in zip(BUCKETS, histogram.counts):
+                    cumulative += bucket_count
+                    lines.append(f'{metric}_bucket{{stage="{label}",le="{bucket}"}} {cumulative}')
+                lines.append(f'{metric}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{metric}_sum{{stage="{label}"}} {histogram.sum}')
+                lines.append(f'{metric}_count{{stage="{label}"}} {histogram.count}')
+
+            metric = f"{self.prefix}_schools_per_minute"
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {self.schools_per_minute()}")
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _write_atomic(path: str, text: str):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def write(self):
+        """Escribe el archivo Prometheus y el resumen JSON"""
+        try:
+            if self.prometheus_file:
+                self._write_atomic(self.prometheus_file, self.prometheus_text())
+            if self.summary_file:
+                self._write_atomic(self.summary_file, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+        except OSError as e:
+            logger.warning(f"No se pudieron escribir las métricas: {e}")
+
+    def start_periodic(self, interval: float = 60):
+        """Escribe las métricas cada `interval` segundos hasta stop_periodic()"""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.write()
+
+        self._thread = threading.Thread(target=loop, name="metrics", daemon=True)
+        self._thread.start()
+
+    def stop_periodic(self):
+        """Detiene la escritura periódica y escribe las métricas finales"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self.write()
+
+    def log_summary(self):
+        """Registra en el log el rendimiento y las etapas que más tiempo tomaron"""
+        summary = self.summary()
+        logger.info(
+            f"Métricas: {summary['counters'].get('schools', 0):.0f} colegios en "
+            f"{summary['elapsed_seconds'] / 60:.1f} min ({summary['schools_per_minute']:.1f} colegios/min)"
+        )
+        stages = sorted(summary['stages'].items(), key=lambda item: item[1]['sum'], reverse=True)
+        for stage, stats in stages[:10]:
+            logger.info(
+                f"Etapa '{stage}': {stats['count']} veces, total {stats['sum']:.1f}s, "
+                f"promedio {stats['avg']:.3f}s, p95 ≤{stats['p95']:.3f}s, máximo {stats['max']:.3f}s"
+            )
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Parser de las páginas del sitio MINEDUC
+Funciones puras (sin navegador ni red): reciben HTML y retornan los datos
+"""
+
+import re
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from bs4 import BeautifulSoup
+
+# Columnas de cada registro, en el orden del Excel
+RECORD_COLUMNS = ['nombre', 'direccion', 'telefono', 'email', 'pagina_web', 'director', 'sostenedor', 'matricula_total', 'region', 'comuna', 'url', 'rbd']
+
+# RBD dentro del onclick de cada fila: document.fichaescuela.rbd.value='12736'
+RBD_ONCLICK_PATTERN = re.compile(r"value='(\d+)'")
+
+# RBD en la URL de una ficha: ficha?rbd=12736
+RBD_URL_PATTERN = re.compile(r"[?&]rbd=(\d+)")
+
+# Campos de la ficha. Cada campo tiene una lista de alternativas que se
+# prueban en orden; una alternativa es un selector CSS ('selector') o una
+# etiqueta de texto ('label' dentro de un <label_tag>) cuyo valor está en el
+# siguiente hermano <value_tag> (opcionalmente con clase 'value_class').
+# Lo usan tanto este parser como la extracción en un solo viaje de Selenium.
+FICHA_FIELDS = [
+    ('nombre', [{'selector': "div.titulo_color td"}]),
+    ('direccion', [{'label_tag': "td", 'label': "Dirección:", 'value_tag': "td"}]),
+    ('telefono', [{'label_tag': "td", 'label': "Teléfono:", 'value_tag': "td"}]),
+    ('email', [{'label_tag': "td", 'label': "E-mail contacto:", 'value_tag': "td"}]),
+    ('pagina_web', [{'label_tag': "td", 'label': "Página web:", 'value_tag': "td"}]),
+    ('director', [{'label_tag': "td", 'label': "Director(a):", 'value_tag': "td"}]),
+    ('sostenedor', [{'label_tag': "td", 'label': "Sostenedor:", 'value_tag': "td"}]),
+    ('matricula_total', [
+        {'label_tag': "div", 'label': "Matrícula total de alumnos:", 'value_tag': "div", 'value_class': "form_detalle"},
+        # Intentar con td (por si la estructura es diferente)
+        {'label_tag': "td", 'label': "Matrícula total de alumnos:", 'value_tag': "td"},
+    ]),
+]
+
+# Columnas de la tabla de resultados que ya traen un campo de la ficha: el
+# encabezado (en minúsculas, sin ':') y el campo que llena. Las columnas
+# que no están aquí (RBD, Comuna, etc.) se ignoran.
+RESULTS_COLUMNS = {
+    'nombre': 'nombre', 'nombre establecimiento': 'nombre', 'establecimiento': 'nombre',
+    'dirección': 'direccion', 'direccion': 'direccion',
+    'teléfono': 'telefono', 'telefono': 'telefono', 'fono': 'telefono',
+    'e-mail': 'email', 'email': 'email', 'e-mail contacto': 'email', 'correo': 'email',
+    'página web': 'pagina_web', 'pagina web': 'pagina_web', 'sitio web': 'pagina_web',
+    'director': 'director', 'director(a)': 'director',
+    'sostenedor': 'sostenedor',
+    'matrícula': 'matricula_total', 'matricula': 'matricula_total',
+    'matrícula total': 'matricula_total', 'matrícula total de alumnos': 'matricula_total',
+}
+
+# Campos de la ficha que se pueden pedir (el resto de RECORD_COLUMNS son de
+# referencia y van siempre en el registro)
+FIELD_NAMES = [field for field, _ in FICHA_FIELDS]
+
+
+def _clean_text(text: str) -> str:
+    """Normaliza espacios igual que el .text de Selenium"""
+    return ' '.join(text.split())
+
+
+def _find_value(soup: BeautifulSoup, alternative: Dict[str, str]) -> Optional[str]:
+    """
+    Busca el valor de una alternativa de FICHA_FIELDS. Para las etiquetas es
+    equivalente al XPath //label_tag[contains(text(), label)]/following-sibling::value_tag
+    """
+    if 'selector' in alternative:
+        element = soup.select_one(alternative['selector'])
+        return _clean_text(element.get_text(" ")) if element is not None else None
+    
+    value_class = alternative.get('value_class')
+    for element in soup.find_all(alternative['label_tag']):
+        own_text = ''.join(element.find_all(string=True, recursive=False))
+        if alternative['label'] not in own_text:
+            continue
+        if value_class:
+            sibling = element.find_next_sibling(alternative['value_tag'], class_=value_class)
+        else:
+            sibling = element.find_next_sibling(alternative['value_tag'])
+        if sibling is not None:
+            return _clean_text(sibling.get_text(" "))
+    return None
+
+
+def select_fields(fields: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    Valida los campos pedidos (lista o texto "nombre,matricula_total") y los
+    retorna en el orden de FICHA_FIELDS. Sin fields se piden todos.
+    """
+    if fields is None:
+        return list(FIELD_NAMES)
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    wanted = {field.strip() for field in fields if field.strip()}
+    unknown = wanted - set(FIELD_NAMES)
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(sorted(unknown))} "
+                         f"(disponibles: {', '.join(FIELD_NAMES)})")
+    if not wanted:
+        raise ValueError("Hay que pedir al menos un campo")
+    return [field for field in FIELD_NAMES if field in wanted]
+
+
+def record_columns(fields: Optional[Iterable[str]] = None) -> List[str]:
+    """Columnas de RECORD_COLUMNS con solo los campos pedidos más las de referencia"""
+    selected = set(select_fields(fields))
+    return [column for column in RECORD_COLUMNS if column in selected or column not in FIELD_NAMES]
+
+
+def ficha_fields_subset(fields: Optional[Iterable[str]] = None) -> List[tuple]:
+    """Entradas de FICHA_FIELDS de los campos indicados (todas si fields es None)"""
+    if fields is None:
+        return FICHA_FIELDS
+    wanted = set(fields)
+    return [entry for entry in FICHA_FIELDS if entry[0] in wanted]
+
+
+def parse_ficha_html(html: str, on_field: Optional[Callable[[str, float], None]] = None,
+                     fields: Optional[Iterable[str]] = None) -> Dict[str, Optional[str]]:
+    """
+    Parsea el HTML de una ficha?rbd=N y retorna los campos de FICHA_FIELDS.
+    Un campo vale None si no se encontró en la página.
+    
+    Args:
+        on_field: Si se indica, se llama con (campo, segundos) por cada campo buscado
+        fields: Solo busca estos campos (por defecto todos)
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    values = {}
+    for field, alternatives in ficha_fields_subset(fields):
+        start = time.perf_counter() if on_field else 0.0
+        value = None
+        for alternative in alternatives:
+            value = _find_value(soup, alternative)
+            if value is not None:
+                break
+        values[field] = value
+        if on_field:
+            on_field(field, time.perf_counter() - start)
+    return values
+
+
+def build_record(fields: Dict[str, Optional[str]], url: str = '', region: str = '', comuna: str = '') -> Dict[str, str]:
+    """
+    Arma el registro completo con las columnas de RECORD_COLUMNS a partir
+    de los campos parseados. Los campos no encontrados quedan como cadena vacía.
+    """
+    record = dict.fromkeys(RECORD_COLUMNS, '')
+    for field, value in fields.items():
+        if value is not None:
+            record[field] = value
+    record.update({'region': region, 'comuna': comuna, 'url': url, 'rbd': rbd_from_url(url) or ''})
+    return record
+
+
+def parse_ficha(html: str, url: str = '', region: str = '', comuna: str = '') -> Dict[str, str]:
+    """Parsea una ficha y retorna el registro completo del colegio"""
+    return build_record(parse_ficha_html(html), url=url, region=region, comuna=comuna)
+
+
+def rbd_from_url(url: str) -> Optional[str]:
+    """Retorna el RBD de la URL de una ficha, o None si no lo tiene"""
+    match = RBD_URL_PATTERN.search(url or '')
+    return match.group(1) if match else None
+
+
+def record_rbd(record: Dict[str, str]) -> Optional[str]:
+    """RBD de un registro: su columna rbd o, en salidas anteriores sin ella, el de su URL"""
+    return record.get('rbd') or rbd_from_url(record.get('url', ''))
+
+
+def parse_results_rbds(html: str) -> List[str]:
+    """
+    Retorna los RBD de la tabla de resultados (table#busqueda_avanzada) de
+    una búsqueda, en el orden en que aparecen
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    rbds = []
+    for link in soup.select("table#busqueda_avanzada tbody tr a"):
+        onclick = link.get("onclick") or ''
+        if "document.fichaescuela" in onclick:
+            match = RBD_ONCLICK_PATTERN.search(onclick)
+            if match:
+                rbds.append(match.group(1))
+    return rbds
+
+
+def results_table_present(html: str) -> bool:
+    """La página trae la tabla de resultados (table#busqueda_avanzada), aunque esté vacía"""
+    return BeautifulSoup(html, "html.parser").select_one("table#busqueda_avanzada") is not None
+
+
+def parse_results_table(html: str) -> List[Tuple[str, Dict[str, str]]]:
+    """
+    Lee la tabla de resultados (table#busqueda_avanzada) de una búsqueda y
+    retorna (rbd, campos) por cada fila, en el orden de la tabla. Los campos
+    son los de las columnas reconocidas en RESULTS_COLUMNS que no están vacías.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.select_one("table#busqueda_avanzada")
+    if table is None:
+        return []
+    headers = table.select("thead tr th") or table.select("tr th")
+    columns = {}
+    for index, header in enumerate(headers):
+        field = RESULTS_COLUMNS.get(_clean_text(header.get_text(" ")).rstrip(':').strip().lower())
+        if field and field not in columns.values():
+            columns[index] = field
+
+    rows = []
+    for row in table.select("tbody tr"):
+        rbd = None
+        for link in row.select("a"):
+            onclick = link.get("onclick") or ''
+            match = RBD_ONCLICK_PATTERN.search(onclick) if "document.fichaescuela" in onclick else None
+            if match:
+                rbd = match.group(1)
+                break
+        if rbd is None:
+            continue
+        cells = row.find_all("td", recursive=False)
+        fields = {}
+        for index, field in columns.items():
+            if index < len(cells):
+                value = _clean_text(cells[index].get_text(" "))
+                if value:
+                    fields[field] = value
+        rows.append((rbd, fields))
+    return rows
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Caché en disco del HTML crudo descargado del sitio MINEDUC
+Permite repetir extracciones, corregir el parser o reanudar una ejecución
+sin volver a pedir las mismas páginas al servidor
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class PageCache:
+    """
+    Caché de páginas con direccionamiento por contenido: el índice (SQLite)
+    asocia cada clave (URL o parámetros del formulario) al SHA-256 del HTML,
+    y el HTML se guarda comprimido una sola vez por contenido en blobs/.
+    Cada entrada tiene su propio TTL; si el total supera max_bytes se
+    eliminan las entradas usadas hace más tiempo (LRU).
+    """
+
+    def __init__(self, directory: str = "page_cache", ttl: float = 7 * 24 * 3600,
+                 max_bytes: int = 500 * 1024 * 1024):
+        """
+        Args:
+            directory: Carpeta donde se guardan el índice y los blobs
+            ttl: Segundos de vigencia por defecto de cada entrada
+            max_bytes: Tamaño máximo (comprimido) antes de desalojar entradas
+        """
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+        # timeout: en modo pool varios procesos comparten el mismo índice
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), timeout=30, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL, expires REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_digest ON entries (digest)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_expires ON entries (expires)")
+        self._db.commit()
+        self._bytes = self._total_bytes()
+
+    @staticmethod
+    def key_for(url: str, params: Optional[Dict[str, str]] = None) -> str:
+        """Clave de una página: la URL, más los parámetros del formulario si los hay"""
+        if not params:
+            return url
+        return f"{url}?{json.dumps(params, sort_keys=True, ensure_ascii=False)}"
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.directory, "blobs", digest[:2], f"{digest}.html.gz")
+
+    def get(self, key: str) -> Optional[str]:
+        """Retorna el HTML guardado para la clave, o None si no está o venció"""
+        with self._lock:
+            row = self._db.execute("SELECT digest, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            digest, expires = row
+            if expires < time.time():
+                self.expired += 1
+                self.misses += 1
+                self._delete_entry(key, digest)
+                self._db.commit()
+                return None
+            try:
+                with gzip.open(self._blob_path(digest), 'rt', encoding='utf-8') as f:
+                    html = f.read()
+            except OSError:
+                # El blob se perdió o está corrupto: se trata como ausente
+                self.misses += 1
+                self._delete_entry(key, digest)
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE entries SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+            self.hits += 1
+            return html
+
+    def put(self, key: str, html: str, ttl: Optional[float] = None):
+        """Guarda el HTML para la clave con el TTL indicado (o el por defecto)"""
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        now = time.time()
+
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with gzip.open(tmp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, path)
+                self._bytes += os.path.getsize(path)
+            size = os.path.getsize(path)
+
+            previous = self._db.execute("SELECT digest FROM entries WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries (key, digest, size, created, accessed, expires) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, digest, size, now, now, now + (ttl if ttl is not None else self.ttl))
+            )
+            if previous and previous[0] != digest:
+                self._remove_blob_if_unused(previous[0])
+            self._evict()
+            self._db.commit()
+
+    def _delete_entry(self, key: str, digest: str):
+        self._db.execute("DELETE FROM entries WHERE key = ?", (key,))
+        self._remove_blob_if_unused(digest)
+
+    def _remove_blob_if_unused(self, digest: str):
+        in_use = self._db.execute("SELECT 1 FROM entries WHERE digest = ? LIMIT 1", (digest,)).fetchone()
+        if not in_use:
+            path = self._blob_path(digest)
+            try:
+                size = os.path.getsize(path)
+                os.remove(path)
+                self._bytes -= size
+            except FileNotFoundError:
+                pass
+
+    def _total_bytes(self) -> int:
+        """Recalcula desde el índice el tamaño en disco de los blobs"""
+        # Cada blob se cuenta una vez aunque lo compartan varias claves
+        row = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT digest, MAX(size) AS size FROM entries GROUP BY digest)"
+        ).fetchone()
+        return row[0]
+
+    def _evict(self):
+        """Si se superó max_bytes elimina las vencidas y luego las menos usadas (LRU)"""
+        if self._bytes <= self.max_bytes:
+            return
+        for key, digest in self._db.execute("SELECT key, digest FROM entries WHERE expires < ?", (time.time(),)).fetchall():
+            self._delete_entry(key, digest)
+            self.expired += 1
+
+        while self._bytes > self.max_bytes:
+            row = self._db.execute("SELECT key, digest FROM entries ORDER BY accessed LIMIT 1").fetchone()
+            if row is None:
+                break
+            self._delete_entry(*row)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna aciertos, fallos, vencidas, desalojadas, entradas y bytes en disco"""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'entries': entries,
+                'bytes': self._bytes,
+            }
+
+    def log_stats(self):
+        """Registra en el log las estadísticas de la caché"""
+        stats = self.stats()
+        lookups = stats['hits'] + stats['misses']
+        hit_rate = 100 * stats['hits'] / lookups if lookups else 0
+        logger.info(
+            f"Caché de páginas: {stats['hits']} aciertos, {stats['misses']} fallos ({hit_rate:.1f}% aciertos), "
+            f"{stats['expired']} vencidas, {stats['evictions']} desalojadas, "
+            f"{stats['entries']} entradas, {stats['bytes'] / 1024 / 1024:.1f} MB"
+        )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Control adaptativo de concurrencia y ritmo de requests (AIMD)
+Mide la latencia y los errores de cada request (búsquedas y fichas) y ajusta
+cuántos requests pueden estar en curso a la vez y el intervalo mínimo entre
+requests: sube de a uno mientras el servidor responde bien y baja a la mitad
+apenas la latencia se dispara o aparecen errores
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RequestOutcome:
+    """
+    Resultado de un request medido con AdaptiveController.track; wait son
+    los segundos que esperó su cupo (no cuentan en la latencia medida)
+    """
+
+    def __init__(self, wait: float = 0.0):
+        self.ok = True
+        self.wait = wait
+
+    def fail(self):
+        """Marca el request como fallido aunque no haya lanzado excepción"""
+        self.ok = False
+
+
+class AdaptiveController:
+    """
+    Controlador AIMD. Cada `window` requests se evalúa la ventana: si la
+    tasa de errores supera `max_error_rate` o el percentil 90 de latencia de
+    alguna etapa supera `latency_factor` veces su latencia base (la menor
+    mediana de las últimas `baseline_windows` ventanas, o `target_latency` si
+    se indica), el límite de
+    requests en curso se multiplica por `decrease` y el intervalo mínimo se
+    duplica; si no, el límite sube en `increase` y el intervalo se reduce a la
+    mitad. Cada decisión se registra en el log y queda en self.decisions.
+    La base sale de una ventana móvil y no del mínimo histórico: si el
+    servidor queda más lento de forma permanente, tras `baseline_windows`
+    ventanas esa pasa a ser la nueva base y el límite vuelve a subir.
+    """
+
+    def __init__(self, max_limit: int, initial_limit: int = 1, min_limit: int = 1,
+                 window: int = 10, latency_factor: float = 3.0, target_latency: Optional[float] = None,
+                 max_error_rate: float = 0.1, increase: int = 1, decrease: float = 0.5,
+                 min_interval_step: float = 0.1, max_interval: float = 5.0, baseline_windows: int = 20):
+        """
+        Args:
+            max_limit: Máximo de requests en curso (los hilos disponibles)
+            initial_limit: Límite con el que se parte
+            min_limit: Límite mínimo
+            window: Requests por cada decisión
+            latency_factor: Veces la latencia base que se considera congestión
+            target_latency: Latencia (s) aceptable fija en vez de la base observada
+            max_error_rate: Fracción de errores que se considera congestión
+            increase: Cuánto sube el límite en cada ventana sana
+            decrease: Factor por el que se multiplica el límite al congestionarse
+            min_interval_step: Intervalo (s) con el que se empieza a espaciar requests
+            max_interval: Intervalo máximo (s) entre inicios de requests
+            baseline_windows: Ventanas cuyas medianas definen la latencia base
+        """
+        self.max_limit = max_limit
+        self.min_limit = min(min_limit, max_limit)
+        self.limit = max(self.min_limit, min(initial_limit, max_limit))
+        self.interval = 0.0
+        self.window = window
+        self.latency_factor = latency_factor
+        self.target_latency = target_latency
+        self.max_error_rate = max_error_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.min_interval_step = min_interval_step
+        self.max_interval = max_interval
+        self.in_flight = 0
+        self.decisions: List[Dict] = []
+        self._baseline: Dict[str, float] = {}
+        self._medians: Dict[str, deque] = {}
+        self._baseline_windows = baseline_windows
+        self._samples: Dict[str, List[float]] = {}
+        self._errors = 0
+        self._count = 0
+        self._next_start = 0.0
+        # Tras una baja se ignoran los requests que partieron con el límite anterior
+        self._epoch = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def track(self, stage: str):
+        """
+        Espera un cupo, ejecuta el bloque y registra su latencia. Una
+        excepción (o outcome.fail()) cuenta como error.
+        """
+        requested = time.monotonic()
+        epoch = self._acquire()
+        start = time.monotonic()
+        outcome = RequestOutcome(wait=start - requested)
+        try:
+            yield outcome
+        except BaseException:
+            outcome.ok = False
+            raise
+        finally:
+            self._release(stage, time.monotonic() - start, outcome.ok, epoch)
+
+    def _acquire(self) -> int:
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self.in_flight < self.limit and now >= self._next_start:
+                    self.in_flight += 1
+                    self._next_start = now + self.interval
+                    return self._epoch
+                self._cond.wait(None if self.in_flight >= self.limit else self._next_start - now)
+
+    def _release(self, stage: str, latency: float, ok: bool, epoch: int):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+            if epoch != self._epoch:
+                return
+            self._samples.setdefault(stage, []).append(latency)
+            self._count += 1
+            if not ok:
+                self._errors += 1
+            if self._count >= self.window:
+                self._decide()
+                self._cond.notify_all()
+
+    @staticmethod
+    def _percentile(values: List[float], fraction: float) -> float:
+        ordered = sorted(values)
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+    def _decide(self):
+        """Evalúa la ventana cerrada y ajusta límite e intervalo (con el lock tomado)"""
+        error_rate = self._errors / self._count
+        slow = []
+        p90s = {}
+        for stage, values in self._samples.items():
+            p90 = self._percentile(values, 0.9)
+            median = self._percentile(values, 0.5)
+            p90s[stage] = p90
+            if self.target_latency is not None:
+                baseline = self.target_latency
+            else:
+                medians = self._medians.setdefault(stage, deque(maxlen=self._baseline_windows))
+                medians.append(median)
+                baseline = min(medians)
+                self._baseline[stage] = baseline
+            if p90 > self.latency_factor * baseline:
+                slow.append(stage)
+
+        previous_limit, previous_interval = self.limit, self.interval
+        congested = error_rate > self.max_error_rate or bool(slow)
+        if congested:
+            self.limit = max(self.min_limit, int(self.limit * self.decrease))
+            self.interval = min(self.max_interval, max(self.min_interval_step, self.interval * 2))
+            self._epoch += 1
+            action = "baja"
+        else:
+            self.limit = min(self.max_limit, self.limit + self.increase)
+            self.interval = self.interval / 2 if self.interval / 2 >= self.min_interval_step / 4 else 0.0
+            action = "sube"
+
+        decision = {
+            'time': time.time(),
+            'action': action,
+            'limit': self.limit,
+            'previous_limit': previous_limit,
+            'interval': self.interval,
+            'previous_interval': previous_interval,
+            'error_rate': error_rate,
+            'p90': p90s,
+            'slow_stages': slow,
+        }
+        self.decisions.append(decision)
+        if (self.limit, self.interval) != (previous_limit, previous_interval):
+            latencies = ", ".join(f"{stage} p90 {p90:.2f}s" for stage, p90 in sorted(p90s.items()))
+            logger.info(
+                f"Control adaptativo ({action}): límite {previous_limit}→{self.limit}, "
+                f"intervalo {previous_interval:.2f}→{self.interval:.2f}s "
+                f"({latencies}, errores {100 * error_rate:.0f}%)"
+            )
+        self._samples = {}
+        self._errors = 0
+        self._count = 0
+
+    def snapshot(self) -> Dict:
+        """Estado actual del controlador (límite, intervalo, en curso, bases y decisiones)"""
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'interval': self.interval,
+                'in_flight': self.in_flight,
+                'baseline': dict(self._baseline),
+                'decisions': len(self.decisions),
+                'decreases': sum(1 for decision in self.decisions if decision['action'] == "baja"),
+            }
+
+    def log_summary(self):
+        """Registra en el log el estado final del controlador"""
+        state = self.snapshot()
+        logger.info(
+            f"Control adaptativo: límite final {state['limit']}, intervalo {state['interval']:.2f}s, "
+            f"{state['decisions']} decisiones ({state['decreases']} bajas)"
+        )
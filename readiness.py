@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Condiciones de "página lista" para el scraper MINEDUC
+Reemplazan los time.sleep fijos por esperas explícitas que terminan apenas
+la página cumple la condición, y registran cuánto se esperó realmente
+"""
+
+import time
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+
+logger = logging.getLogger(__name__)
+
+Condition = Callable[[object], object]
+
+
+def option_signature(driver, select_id: str) -> tuple:
+    """Retorna los values de las opciones de un <select> como tupla"""
+    return tuple(driver.execute_script(
+        "var s = document.getElementById(arguments[0]);"
+        "return s ? Array.prototype.map.call(s.options, function(o) { return o.value; }) : [];",
+        select_id
+    ))
+
+
+def select_has_options(select_id: str, minimum: int = 2) -> Condition:
+    """El <select> existe y tiene al menos `minimum` opciones (además de 'Todas')"""
+    def condition(driver):
+        return len(option_signature(driver, select_id)) >= minimum
+    return condition
+
+
+def comuna_options_repopulated(previous: tuple) -> Condition:
+    """
+    Las opciones de #comuna cambiaron respecto a `previous` (snapshot tomado
+    antes de seleccionar la región) y hay al menos una comuna real
+    """
+    def condition(driver):
+        current = option_signature(driver, "comuna")
+        return current != previous and any(value and value != "0" for value in current)
+    return condition
+
+
+def results_row_count_stable(window: float = 0.5) -> Condition:
+    """
+    La tabla #busqueda_avanzada existe y su número de filas no cambió
+    durante `window` segundos
+    """
+    state = {'count': None, 'since': None}
+
+    def condition(driver):
+        if not driver.find_elements(By.ID, "busqueda_avanzada"):
+            return False
+        count = len(driver.find_elements(By.CSS_SELECTOR, "table#busqueda_avanzada tbody tr"))
+        now = time.monotonic()
+        if count != state['count']:
+            state['count'] = count
+            state['since'] = now
+            return False
+        return now - state['since'] >= window
+    return condition
+
+
+def element_present(by: str, selector: str) -> Condition:
+    """Existe al menos un elemento que calza con el selector"""
+    def condition(driver):
+        return bool(driver.find_elements(by, selector))
+    return condition
+
+
+def search_submitted(previous_html) -> Condition:
+    """
+    La búsqueda respondió: la página anterior fue reemplazada (`previous_html`
+    quedó obsoleto) o la tabla de resultados ya tiene filas
+    """
+    def condition(driver):
+        try:
+            previous_html.tag_name
+        except StaleElementReferenceException:
+            return True
+        return bool(driver.find_elements(By.CSS_SELECTOR, "table#busqueda_avanzada tbody tr"))
+    return condition
+
+
+class PageReadiness:
+    """
+    Espera condiciones con timeout y acumula el tiempo realmente esperado
+    por cada paso. Es seguro usarla desde varios hilos (un driver por hilo).
+    """
+
+    def __init__(self, timeout: float = 10, poll_frequency: float = 0.1,
+                 observer: Optional[Callable[[str, float], None]] = None):
+        """
+        Args:
+            observer: Si se indica, se llama con (paso, segundos) por cada espera
+        """
+        self.timeout = timeout
+        self.poll_frequency = poll_frequency
+        self.observer = observer
+        self.waits: Dict[str, List[float]] = {}
+        self.timeouts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def wait_for(self, driver, name: str, condition: Condition, timeout: Optional[float] = None,
+                 required: bool = True):
+        """
+        Espera hasta que condition(driver) sea verdadera
+
+        Args:
+            name: Nombre del paso (se usa en las estadísticas)
+            timeout: Segundos máximos; por defecto self.timeout
+            required: Si es False, un timeout solo se registra y retorna None
+
+        Raises:
+            TimeoutException si la condición no se cumple y required es True
+        """
+        start = time.monotonic()
+        try:
+            result = WebDriverWait(
+                driver,
+                timeout if timeout is not None else self.timeout,
+                poll_frequency=self.poll_frequency,
+                ignored_exceptions=(NoSuchElementException, StaleElementReferenceException)
+            ).until(condition)
+            self._record(name, time.monotonic() - start)
+            return result
+        except TimeoutException:
+            elapsed = time.monotonic() - start
+            self._record(name, elapsed, timed_out=True)
+            if required:
+                raise TimeoutException(f"Timeout esperando '{name}' ({elapsed:.1f}s)")
+            logger.debug(f"Timeout esperando '{name}' ({elapsed:.1f}s), se continúa")
+            return None
+
+    def _record(self, name: str, elapsed: float, timed_out: bool = False):
+        with self._lock:
+            self.waits.setdefault(name, []).append(elapsed)
+            if timed_out:
+                self.timeouts[name] = self.timeouts.get(name, 0) + 1
+        if self.observer:
+            self.observer(name, elapsed)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Retorna por paso: cantidad, promedio, máximo y timeouts"""
+        with self._lock:
+            return {
+                name: {
+                    'count': len(values),
+                    'avg': sum(values) / len(values),
+                    'max': max(values),
+                    'timeouts': self.timeouts.get(name, 0),
+                }
+                for name, values in self.waits.items()
+            }
+
+    def log_summary(self):
+        """Registra en el log el tiempo esperado por cada paso"""
+        for name, stats in sorted(self.summary().items()):
+            logger.info(
+                f"Espera '{name}': {stats['count']} veces, promedio {stats['avg']:.2f}s, "
+                f"máximo {stats['max']:.2f}s, timeouts {stats['timeouts']}"
+            )
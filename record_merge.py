@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Combina salidas de varias ejecuciones (.jsonl o .xlsx) en una sola, un
+registro por RBD
+Sirve para juntar ejecuciones reanudadas, shards o re-extracciones. Las
+entradas se leen una sola vez, registro a registro, y los registros vigentes
+se guardan en un SQLite temporal en disco, así que la memoria no depende del
+tamaño de las entradas.
+
+Uso: python record_merge.py anterior.jsonl nueva.jsonl [--rule non_empty] [--excel colegios_chile.xlsx]
+"""
+
+import os
+import sys
+import json
+import sqlite3
+import logging
+import argparse
+import tempfile
+from typing import Dict, Iterator, List, Optional
+from mineduc_parser import record_columns, record_rbd
+from record_sink import JsonlRecordSink, export_excel, iter_records
+
+logger = logging.getLogger(__name__)
+
+# Reglas ante un RBD repetido. Las entradas van de la más antigua a la más nueva.
+RULE_NEWEST = "newest"  # El registro más nuevo reemplaza al anterior completo
+RULE_NON_EMPTY = "non_empty"  # Campo a campo: el valor más nuevo que no esté vacío
+RULES = (RULE_NEWEST, RULE_NON_EMPTY)
+
+
+def _merge_non_empty(old: Dict[str, str], new: Dict[str, str]) -> Dict[str, str]:
+    merged = dict(old)
+    for field, value in new.items():
+        if value not in ('', None) or field not in merged:
+            merged[field] = value
+    return merged
+
+
+class RecordMerger:
+    """
+    Registros por RBD en un SQLite temporal. Cada RBD conserva la posición
+    de su primera aparición, que es el orden de la salida.
+    """
+
+    def __init__(self, rule: str = RULE_NEWEST, temp_dir: Optional[str] = None, batch_size: int = 1000):
+        """
+        Args:
+            rule: RULE_NEWEST o RULE_NON_EMPTY
+            temp_dir: Carpeta del SQLite temporal (por defecto la del sistema)
+            batch_size: Registros por transacción
+        """
+        if rule not in RULES:
+            raise ValueError(f"Regla desconocida: {rule}")
+        self.rule = rule
+        self.batch_size = batch_size
+        self.stats = {'read': 0, 'unique': 0, 'duplicates': 0, 'without_rbd': 0}
+        fd, self._path = tempfile.mkstemp(prefix="record_merge_", suffix=".sqlite", dir=temp_dir)
+        os.close(fd)
+        self._db = sqlite3.connect(self._path)
+        self._db.execute("PRAGMA journal_mode=OFF")
+        self._db.execute("PRAGMA synchronous=OFF")
+        self._db.execute("CREATE TABLE records (rbd TEXT PRIMARY KEY, position INTEGER NOT NULL, data TEXT NOT NULL)")
+        self._pending = 0
+
+    def add(self, record: Dict[str, str]):
+        """Agrega un registro más nuevo que todos los anteriores"""
+        self.stats['read'] += 1
+        rbd = record_rbd(record)
+        if not rbd:
+            self.stats['without_rbd'] += 1
+            return
+        if not record.get('rbd'):
+            record = dict(record, rbd=rbd)
+        row = self._db.execute("SELECT data FROM records WHERE rbd = ?", (rbd,)).fetchone()
+        if row is None:
+            self.stats['unique'] += 1
+            self._db.execute("INSERT INTO records (rbd, position, data) VALUES (?, ?, ?)",
+                             (rbd, self.stats['unique'], json.dumps(record, ensure_ascii=False)))
+        else:
+            self.stats['duplicates'] += 1
+            if self.rule == RULE_NON_EMPTY:
+                record = _merge_non_empty(json.loads(row[0]), record)
+            self._db.execute("UPDATE records SET data = ? WHERE rbd = ?", (json.dumps(record, ensure_ascii=False), rbd))
+        self._pending += 1
+        if self._pending >= self.batch_size:
+            self._db.commit()
+            self._pending = 0
+
+    def add_file(self, path: str):
+        """Agrega los registros de una salida .jsonl o .xlsx"""
+        before = self.stats['read']
+        for record in iter_records(path):
+            self.add(record)
+        logger.info(f"{path}: {self.stats['read'] - before} registros")
+
+    def records(self) -> Iterator[Dict[str, str]]:
+        """Registros combinados en el orden en que apareció cada RBD"""
+        self._db.commit()
+        for (data,) in self._db.execute("SELECT data FROM records ORDER BY position"):
+            yield json.loads(data)
+
+    def close(self):
+        """Cierra y elimina el SQLite temporal"""
+        self._db.close()
+        try:
+            os.remove(self._path)
+        except OSError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def merge_outputs(paths: List[str], jsonl_path: str, rule: str = RULE_NEWEST,
+                  temp_dir: Optional[str] = None) -> Dict[str, int]:
+    """
+    Combina las salidas (de la más antigua a la más nueva) en jsonl_path, un
+    registro por RBD. Retorna registros leídos, únicos, repetidos y sin RBD.
+    """
+    with RecordMerger(rule, temp_dir=temp_dir) as merger:
+        for path in paths:
+            merger.add_file(path)
+        sink = JsonlRecordSink(jsonl_path, append=False)
+        try:
+            for record in merger.records():
+                sink.write(record)
+        finally:
+            sink.close()
+        stats = dict(merger.stats)
+    if stats['without_rbd']:
+        logger.warning(f"{stats['without_rbd']} registros sin RBD ni URL de ficha se descartaron")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Combina salidas del scraper MINEDUC, un registro por RBD")
+    parser.add_argument("inputs", nargs="+", help="Salidas .jsonl o .xlsx, de la más antigua a la más nueva")
+    parser.add_argument("--output", default="colegios_chile.jsonl", help="Salida JSONL combinada")
+    parser.add_argument("--excel", default=None, help="Genera también este Excel con la salida combinada")
+    parser.add_argument("--rule", choices=RULES, default=RULE_NEWEST,
+                        help="newest: gana el registro más nuevo; non_empty: gana el valor más nuevo no vacío")
+    parser.add_argument("--by-mtime", action="store_true",
+                        help="Ordena las entradas por fecha de modificación en vez del orden indicado")
+    parser.add_argument("--temp-dir", default=None, help="Carpeta del SQLite temporal")
+    parser.add_argument("--fields", default=None,
+                        help="Campos del Excel separados por coma (por defecto todos), como en --fields del scraper")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    inputs = sorted(args.inputs, key=os.path.getmtime) if args.by_mtime else args.inputs
+    if args.output in inputs:
+        logger.error(f"La salida {args.output} no puede ser también una entrada")
+        return 1
+    stats = merge_outputs(inputs, args.output, args.rule, args.temp_dir)
+    logger.info(f"{len(inputs)} salidas combinadas en {args.output}: {stats['unique']} colegios "
+                f"({stats['read']} registros leídos, {stats['duplicates']} RBD repetidos, regla {args.rule})")
+    if args.excel:
+        total = export_excel(args.output, args.excel, record_columns(args.fields))
+        logger.info(f"Datos guardados en {args.excel} ({total} registros)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Salida incremental de registros en formato JSONL (un colegio por línea)
+Cada registro se escribe una sola vez; el Excel se genera al final (o cuando
+se pida) leyendo este archivo, en vez de reescribirlo en cada checkpoint
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from typing import Dict, Iterator, List, Optional
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from mineduc_parser import RECORD_COLUMNS, record_rbd
+
+logger = logging.getLogger(__name__)
+
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, 'rb') as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b'\n'
+
+
+class JsonlRecordSink:
+    """
+    Agrega registros al final de un archivo JSONL. Hace flush cada
+    `flush_every` registros y fsync como máximo cada `fsync_interval`
+    segundos, de modo que un corte deja en disco todo salvo lo último.
+    """
+
+    def __init__(self, path: str, append: bool = True, flush_every: int = 10, fsync_interval: float = 5.0):
+        """
+        Args:
+            path: Archivo JSONL de salida
+            append: Si es False el archivo se trunca (ejecución nueva)
+            flush_every: Registros entre cada flush del buffer
+            fsync_interval: Segundos mínimos entre cada fsync al disco
+        """
+        self.path = path
+        self.flush_every = flush_every
+        self.fsync_interval = fsync_interval
+        self.written = 0
+        self._pending = 0
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+        if append and self._file.tell() > 0 and not _ends_with_newline(path):
+            # La ejecución anterior se cortó a mitad de línea: no pegar el siguiente registro
+            self._file.write('\n')
+
+    def write(self, record: Dict[str, str]):
+        """Agrega un registro al archivo"""
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + '\n')
+            self.written += 1
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._flush(fsync=time.monotonic() - self._last_fsync >= self.fsync_interval)
+
+    def flush(self, fsync: bool = True):
+        """Fuerza el flush (y por defecto el fsync) de lo escrito"""
+        with self._lock:
+            self._flush(fsync)
+
+    def _flush(self, fsync: bool):
+        self._file.flush()
+        self._pending = 0
+        if fsync:
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._flush(fsync=True)
+                self._file.close()
+
+
+def read_records(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Lee los registros de un archivo JSONL. Una última línea incompleta (corte
+    a mitad de escritura) se ignora.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Línea {line_number} de {path} incompleta, se ignora")
+
+
+def read_excel_records(path: str) -> Iterator[Dict[str, str]]:
+    """
+    Lee los registros de un Excel fila por fila (sin cargar la hoja completa).
+    Las celdas vacías quedan como cadena vacía y los números como texto.
+    """
+    workbook = load_workbook(path, read_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        columns = [str(name) if name is not None else '' for name in header]
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            yield {column: '' if value is None else str(value) for column, value in zip(columns, row) if column}
+    finally:
+        workbook.close()
+
+
+def iter_records(path: str) -> Iterator[Dict[str, str]]:
+    """Registros de una salida .jsonl o .xlsx, uno a la vez"""
+    return read_excel_records(path) if path.endswith(".xlsx") else read_records(path)
+
+
+def load_records_by_rbd(path: str) -> Dict[str, Dict[str, str]]:
+    """
+    Carga la salida de una ejecución anterior (.jsonl o .xlsx) indexada por
+    RBD. Si un RBD aparece más de una vez se conserva el último registro.
+    """
+    by_rbd = {}
+    for record in iter_records(path):
+        rbd = record_rbd(record)
+        if rbd:
+            by_rbd[rbd] = record
+    return by_rbd
+
+
+def export_excel(jsonl_path: str, xlsx_path: str, columns: Optional[List[str]] = None) -> int:
+    """
+    Genera el Excel a partir del JSONL y retorna la cantidad de registros.
+    Se escribe fila por fila (openpyxl en modo write-only), así que la
+    memoria no crece con el tamaño de la salida.
+    """
+    columns = columns or RECORD_COLUMNS
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    header = []
+    for column in columns:
+        cell = WriteOnlyCell(sheet, value=column)
+        cell.font = Font(bold=True)
+        header.append(cell)
+    sheet.append(header)
+    total = 0
+    for record in read_records(jsonl_path):
+        sheet.append([record.get(column) if record.get(column) != '' else None for column in columns])
+        total += 1
+    workbook.save(xlsx_path)
+    return total
+
+
+if __name__ == "__main__":
+    # Uso: python record_sink.py colegios_chile.jsonl colegios_chile.xlsx
+    if len(sys.argv) != 3:
+        print("Uso: python record_sink.py <entrada.jsonl> <salida.xlsx>")
+        sys.exit(1)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    total = export_excel(sys.argv[1], sys.argv[2])
+    logger.info(f"Datos guardados en {sys.argv[2]} ({total} registros)")
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Estimación del tiempo total de una extracción a partir de una muestra
+Elige unas pocas comunas por región (muestreo estratificado), y con lo que se
+midió en ellas (búsquedas y fichas a distintos niveles de concurrencia) y el
+tamaño de cada comuna proyecta la duración de la ejecución completa y la
+concurrencia conveniente. Lo usa la prueba piloto (scraper_piloto.py).
+"""
+
+import math
+import random
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Option = Dict[str, str]
+
+
+def stratified_sample(regions: List[Tuple[Option, List[Option]]], counts: Dict[tuple, Optional[int]],
+                      per_region: int = 2, seed: int = 0) -> List[Tuple[Option, Option]]:
+    """
+    Elige per_region comunas de cada región. Si la región tiene comunas con
+    conteo conocido se eligen repartidas a lo largo de sus tamaños (de la más
+    chica a la más grande); si no, al azar con la semilla indicada.
+
+    Args:
+        regions: (región, comunas) del catálogo
+        counts: Colegios conocidos por (valor región, valor comuna)
+    """
+    rng = random.Random(seed)
+    sample = []
+    for region, comunas in regions:
+        if len(comunas) <= per_region:
+            sample.extend((region, comuna) for comuna in comunas)
+            continue
+        known = sorted((comuna for comuna in comunas if counts.get((region['value'], comuna['value'])) is not None),
+                       key=lambda comuna: counts[(region['value'], comuna['value'])])
+        if len(known) >= per_region:
+            # Posiciones equiespaciadas entre la comuna más chica y la más grande
+            step = (len(known) - 1) / max(per_region - 1, 1)
+            picks = [known[round(index * step)] for index in range(per_region)] if per_region > 1 \
+                else [known[len(known) // 2]]
+        else:
+            picks = rng.sample(comunas, per_region)
+        sample.extend((region, comuna) for comuna in picks)
+    return sample
+
+
+def estimate_school_total(regions: List[Tuple[Option, List[Option]]],
+                          counts: Dict[tuple, Optional[int]]) -> Dict:
+    """
+    Colegios esperados en todo el catálogo. Las comunas sin conteo se
+    estiman con el promedio de las comunas con conteo de su región (o del
+    país si la región no tiene ninguna).
+    """
+    known_all = [count for count in counts.values() if count is not None]
+    national_mean = sum(known_all) / len(known_all) if known_all else 0.0
+    total = 0.0
+    estimated_comunas = 0
+    by_region = {}
+    for region, comunas in regions:
+        region_counts = [counts.get((region['value'], comuna['value'])) for comuna in comunas]
+        known = [count for count in region_counts if count is not None]
+        mean = sum(known) / len(known) if known else national_mean
+        unknown = len(region_counts) - len(known)
+        region_total = sum(known) + unknown * mean
+        estimated_comunas += unknown
+        by_region[region['text']] = round(region_total)
+        total += region_total
+    return {
+        'schools': round(total),
+        'comunas': sum(len(comunas) for _, comunas in regions),
+        'estimated_comunas': estimated_comunas,
+        'by_region': by_region,
+    }
+
+
+def project_runtime(schools: int, comunas: int, search_seconds: float, startup_seconds: float,
+                    levels: List[Dict], max_error_rate: float = 0.05, tolerance: float = 0.1) -> Dict:
+    """
+    Proyecta la duración de la ejecución completa para cada nivel medido.
+
+    Args:
+        schools: Colegios esperados en total
+        comunas: Comunas del catálogo (una búsqueda cada una)
+        search_seconds: Duración media de una búsqueda
+        startup_seconds: Tiempo de arranque (abrir Chrome y la búsqueda)
+        levels: Por nivel: concurrency, fichas, failed, retries, wall_seconds,
+            latency_avg y latency_p95 (segundos por ficha), y opcionalmente
+            startup_seconds (arranque de los Chrome de ese nivel)
+        max_error_rate: Fracción de fichas fallidas que descarta un nivel
+        tolerance: Se recomienda el nivel más bajo cuyo ritmo esté a menos
+            de esta fracción del mejor, para no cargar el sitio sin ganancia
+
+    Returns:
+        Proyección por nivel (segundos y colegios/min) y el nivel recomendado
+    """
+    projections = []
+    for level in levels:
+        if not level['fichas'] or level['wall_seconds'] <= 0:
+            continue
+        rate = level['fichas'] / level['wall_seconds']
+        error_rate = level['failed'] / level['fichas']
+        # Descargas por ficha según los reintentos que hubo en la medición
+        # (las fallidas definitivas ya están entre ellos)
+        retry_rate = level.get('retries', 0) / level['fichas']
+        fetches = schools * (1 + retry_rate)
+        fetch_rate = (level['fichas'] + level.get('retries', 0)) / level['wall_seconds']
+        base = startup_seconds + level.get('startup_seconds', 0.0) + comunas * search_seconds
+        seconds = base + fetches / fetch_rate
+        # Cota pesimista: cada tanda de descargas demora lo del p95
+        slow_rate = level['concurrency'] / level['latency_p95'] if level.get('latency_p95') else fetch_rate
+        projections.append({
+            'concurrency': level['concurrency'],
+            'fichas_per_second': rate,
+            'error_rate': error_rate,
+            'retry_rate': retry_rate,
+            'latency_avg': level.get('latency_avg'),
+            'latency_p95': level.get('latency_p95'),
+            'seconds': seconds,
+            'seconds_pessimistic': base + fetches / min(fetch_rate, slow_rate),
+            'schools_per_minute': schools / seconds * 60 if seconds > 0 else 0.0,
+            'usable': error_rate <= max_error_rate,
+        })
+
+    usable = [projection for projection in projections if projection['usable']] or projections
+    recommended = None
+    if usable:
+        best = max(projection['fichas_per_second'] for projection in usable)
+        recommended = min((projection for projection in usable
+                           if projection['fichas_per_second'] >= (1 - tolerance) * best),
+                          key=lambda projection: projection['concurrency'])
+    return {
+        'schools': schools,
+        'comunas': comunas,
+        'search_seconds': search_seconds,
+        'startup_seconds': startup_seconds,
+        'levels': projections,
+        'recommended_concurrency': recommended['concurrency'] if recommended else None,
+        'projected_seconds': recommended['seconds'] if recommended else None,
+        'projected_seconds_pessimistic': recommended['seconds_pessimistic'] if recommended else None,
+    }
+
+
+def _duration(seconds: float) -> str:
+    hours, rest = divmod(int(math.ceil(seconds)), 3600)
+    return f"{hours}h {rest // 60:02d}m" if hours else f"{rest // 60}m {rest % 60:02d}s"
+
+
+def log_estimate(estimate: Dict):
+    """Registra en el log la proyección por nivel y la recomendación"""
+    logger.info(f"Proyección: {estimate['schools']} colegios en {estimate['comunas']} comunas, "
+                f"búsqueda media {estimate['search_seconds']:.2f}s")
+    for level in estimate['levels']:
+        logger.info(
+            f"  Concurrencia {level['concurrency']}: {level['fichas_per_second'] * 60:.1f} fichas/min, "
+            f"errores {100 * level['error_rate']:.0f}%, reintentos {100 * level['retry_rate']:.0f}%, total ≈ {_duration(level['seconds'])} "
+            f"(hasta {_duration(level['seconds_pessimistic'])})"
+            f"{'' if level['usable'] else ' — demasiados errores'}"
+        )
+    if estimate['recommended_concurrency'] is not None:
+        logger.info(
+            f"Recomendado: CONCURRENCY = {estimate['recommended_concurrency']}, duración estimada "
+            f"{_duration(estimate['projected_seconds'])} (hasta {_duration(estimate['projected_seconds_pessimistic'])})"
+        )
@@ -5,12 +5,22 @@ Extrae: nombre, teléfono y matrícula total de alumnos
 De todas las regiones y comunas de Chile
 """
 
-import time
+import os
 import json
+import hashlib
 import logging
+import argparse
+from logging.handlers import QueueListener
+import queue
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import List, Dict, Optional
-import pandas as pd
+from typing import Callable, List, Dict, Optional, Set, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -18,42 +28,337 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.chrome.options import Options
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from mineduc_parser import (ficha_fields_subset, parse_ficha_html, parse_results_rbds, parse_results_table,
+                            rbd_from_url, record_columns, record_rbd, results_table_present, select_fields)
+from page_cache import PageCache
+from record_sink import JsonlRecordSink, export_excel, read_records, load_records_by_rbd
+from job_ledger import JobLedger, PENDING, IN_FLIGHT, DONE, FAILED
+from comuna_catalog import ComunaCatalog
+from sharding import (parse_shard, shard_plan, shard_suffix, with_suffix, write_manifest, write_json_atomic,
+                      load_manifest)
+from lean_browser import DEFAULT_BLOCKED_URLS, LeanLoadStats, configure_lean_options
+from session_recovery import RetryQueue, driver_alive, needs_restart
+from rate_controller import AdaptiveController
+from metrics import Metrics
+from tracing import Tracer, NULL_TRACER
+from log_pipeline import (SCHOOL_LOGGER, LogPipeline, ForwardHandler, configure_worker_logging,
+                          current_levels, log_school)
+from readiness import (PageReadiness, select_has_options, comuna_options_repopulated,
+                       results_row_count_stable, search_submitted, element_present, option_signature)
 
 # Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper_mineduc.log'),
-        logging.StreamHandler()
-    ]
-)
+# El logging se configura con LogPipeline al ejecutar el script (ver el final)
 logger = logging.getLogger(__name__)
+school_logger = logging.getLogger(SCHOOL_LOGGER)
+
+# Búsqueda avanzada y fichas del sitio MINEDUC (standin_server.py imita ambas en local)
+BASE_URL = "https://mi.mineduc.cl/mime-web/mvc/mime/busqueda_avanzada"
+FICHA_URL_TEMPLATE = "https://mi.mineduc.cl/mime-web/mvc/mime/ficha?rbd={rbd}"
+
+# Motores disponibles para extraer la ficha de cada colegio
+ENGINE_SELENIUM = "selenium"
+ENGINE_HTTP = "http"
+
+# Metadatos de la ficha que se guardan en el JSONL (no van al Excel) para
+# detectar cambios en la siguiente ejecución incremental
+SIGNATURE_FIELDS = ['_ficha_hash', '_etag', '_last_modified']
+
+# Resultado de cada colegio en una ejecución incremental
+CHANGE_REUSED = "reused"
+CHANGE_UPDATED = "updated"
+CHANGE_ADDED = "added"
+
+
+# Extrae los campos indicados (entradas de FICHA_FIELDS) en una sola llamada
+# a chromedriver. Si se pidió la matrícula y falta, expande "Información
+# institucional" y la espera dentro del navegador antes de responder
+# (execute_async_script); si no se pidió, responde de inmediato.
+FICHA_EXTRACTION_SCRIPT = """
+var fields = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+
+function clean(text) { return (text || '').replace(/\\s+/g, ' ').trim(); }
+
+function ownText(element) {
+    var text = '';
+    for (var i = 0; i < element.childNodes.length; i++) {
+        if (element.childNodes[i].nodeType === 3) { text += element.childNodes[i].nodeValue; }
+    }
+    return text;
+}
+
+function nextSibling(element, tag, cls) {
+    for (var s = element.nextElementSibling; s; s = s.nextElementSibling) {
+        if (s.tagName.toLowerCase() === tag && (!cls || s.classList.contains(cls))) { return s; }
+    }
+    return null;
+}
+
+function findValue(alternative) {
+    if (alternative.selector) {
+        var found = document.querySelector(alternative.selector);
+        return found ? clean(found.textContent) : null;
+    }
+    var candidates = document.getElementsByTagName(alternative.label_tag);
+    for (var i = 0; i < candidates.length; i++) {
+        if (ownText(candidates[i]).indexOf(alternative.label) === -1) { continue; }
+        var sibling = nextSibling(candidates[i], alternative.value_tag, alternative.value_class);
+        if (sibling) { return clean(sibling.textContent); }
+    }
+    return null;
+}
+
+function extract() {
+    var out = {}, ms = {};
+    for (var i = 0; i < fields.length; i++) {
+        var value = null, start = performance.now();
+        for (var j = 0; j < fields[i][1].length && value === null; j++) { value = findValue(fields[i][1][j]); }
+        out[fields[i][0]] = value;
+        ms[fields[i][0]] = performance.now() - start;
+    }
+    out._ms = ms;
+    return out;
+}
+
+var result = extract();
+if (!('matricula_total' in result) || result.matricula_total !== null) { done(result); return; }
+
+var links = document.getElementsByTagName('a'), section = null;
+for (var k = 0; k < links.length; k++) {
+    if (links[k].textContent.indexOf('Información institucional') !== -1) {
+        links[k].click();
+        section = document.getElementById('info_inst') || links[k].nextElementSibling;
+        break;
+    }
+}
+if (!section) { done(result); return; }
+
+// Sección expandida: visible y con contenido (aunque no traiga matrícula)
+function expanded() { return section.offsetParent !== null && clean(section.textContent) !== ''; }
+
+var start = Date.now();
+(function poll() {
+    result = extract();
+    if (result.matricula_total !== null || expanded() || Date.now() - start > timeoutMs) { done(result); }
+    else { setTimeout(poll, 100); }
+})();
+"""
+
+# Campos que pueden estar fuera del HTML descargado hasta expandir
+# "Información institucional" en el navegador
+EXPANDED_FIELDS = ['matricula_total']
+
+# Describe el formulario de búsqueda avanzada tal como lo enviaría
+# EnviaBusqueda: action, método, campos actuales y el nombre de los selects
+# de región y comuna. Se lee una vez y luego cada comuna es un solo POST.
+SEARCH_FORM_SCRIPT = """
+var region = document.getElementById('region'), comuna = document.getElementById('comuna');
+var form = (comuna && comuna.form) || (region && region.form);
+if (!form) { return null; }
+var fields = [];
+for (var i = 0; i < form.elements.length; i++) {
+    var e = form.elements[i];
+    if (!e.name || e.disabled || e.type === 'button' || e.type === 'submit') { continue; }
+    if ((e.type === 'checkbox' || e.type === 'radio') && !e.checked) { continue; }
+    fields.push([e.name, e.value]);
+}
+return {
+    action: form.action || window.location.href,
+    method: (form.getAttribute('method') || 'post').toUpperCase(),
+    fields: fields,
+    region_field: region.name || region.id,
+    comuna_field: comuna.name || comuna.id
+};
+"""
+
+# Envía el formulario desde la misma página con fetch (mismas cookies) y
+# retorna el HTML de la respuesta sin navegar ni recargar la búsqueda.
+SEARCH_SUBMIT_SCRIPT = """
+var action = arguments[0], method = arguments[1], fields = arguments[2], done = arguments[arguments.length - 1];
+var body = new URLSearchParams();
+for (var i = 0; i < fields.length; i++) { body.append(fields[i][0], fields[i][1]); }
+var options = {method: method, credentials: 'same-origin'};
+if (method === 'GET') { action += (action.indexOf('?') === -1 ? '?' : '&') + body.toString(); }
+else { options.body = body; }
+fetch(action, options)
+    .then(function(response) {
+        return response.text().then(function(text) { done({status: response.status, html: text}); });
+    })
+    .catch(function(error) { done({status: 0, error: String(error)}); });
+"""
 
 
 class MinEducScraper:
     """Scraper para extraer datos de colegios del sitio MINEDUC"""
     
-    def __init__(self, headless: bool = False, resume_from: Optional[str] = None):
+    def __init__(self, headless: bool = False, resume_from: Optional[str] = None,
+                 engine: str = ENGINE_SELENIUM, http_pool_size: int = 10,
+                 concurrency: int = 1, workers: int = 1, cache_dir: Optional[str] = None,
+                 cache_ttl: float = 7 * 24 * 3600, cache_max_bytes: int = 500 * 1024 * 1024,
+                 output_file: str = "colegios_chile.jsonl", ledger_file: str = "scraper_ledger.sqlite",
+                 incremental_from: Optional[str] = None, direct_search: bool = True,
+                 catalog_file: str = "catalogo_comunas.json", catalog_max_age: float = 30 * 24 * 3600,
+                 refresh_catalog: bool = False, lean_browser: bool = True,
+                 blocked_urls: Optional[List[str]] = None, lean_calibrate: bool = True, max_retries: int = 3,
+                 retry_budget: Optional[int] = 500, page_load_timeout: float = 60, expand_timeout: float = 1.0,
+                 adaptive: bool = False, metrics_file: Optional[str] = "scraper_metrics.prom",
+                 metrics_summary_file: Optional[str] = "scraper_metrics.json", metrics_interval: float = 60,
+                 trace_file: Optional[str] = None, shard: Optional[Tuple[int, int]] = None,
+                 base_url: str = BASE_URL, ficha_url_template: str = FICHA_URL_TEMPLATE,
+                 fields: Optional[List[str]] = None):
         """
         Inicializa el scraper
         
         Args:
             headless: Si True, ejecuta Chrome en modo headless (sin ventana visible)
             resume_from: JSON file para resumir desde un punto específico
+            engine: Motor para las fichas: "selenium" (navegador) o "http"
+                (requests + BeautifulSoup). La búsqueda siempre usa Selenium.
+            http_pool_size: Conexiones keep-alive del pool HTTP
+            concurrency: Fichas que se extraen en paralelo dentro de cada comuna.
+                Con el motor selenium cada hilo abre su propio Chrome.
+            workers: Procesos con su propio Chrome que reparten las comunas
+                entre sí (modo pool). Con 1 se usa el recorrido secuencial.
+            cache_dir: Carpeta de la caché de páginas (None la desactiva).
+                Con caché, las búsquedas y fichas ya descargadas se leen del disco.
+            cache_ttl: Segundos de vigencia de cada página en la caché
+            cache_max_bytes: Tamaño máximo de la caché antes de desalojar (LRU)
+            output_file: Archivo JSONL donde se agrega cada registro apenas se
+                extrae. El Excel se genera desde este archivo.
+            ledger_file: Registro SQLite con el estado de cada comuna y RBD,
+                usado para reanudar exactamente donde quedó la ejecución
+            incremental_from: Salida de una ejecución anterior (.jsonl o .xlsx).
+                Si se indica, cada ficha se pide con GET condicional (ETag /
+                Last-Modified) y se compara su hash con el anterior: solo se
+                vuelven a parsear los colegios que cambiaron.
+            direct_search: Si es True cada comuna se busca enviando los
+                parámetros del formulario de búsqueda avanzada en un solo
+                request (POST por HTTP o fetch desde la página), sin recargar
+                la página ni seleccionar región y comuna en los dropdowns.
+            catalog_file: Catálogo JSON de regiones y comunas (con la última
+                cantidad de colegios de cada comuna)
+            catalog_max_age: Segundos tras los cuales el catálogo se vuelve
+                a leer de los dropdowns del sitio
+            refresh_catalog: Si es True el catálogo se vuelve a leer aunque
+                no esté vencido
+            lean_browser: Si es True Chrome usa carga 'eager' y bloquea
+                imágenes, fuentes, multimedia y hosts de terceros
+            blocked_urls: Patrones a bloquear en el perfil liviano (por
+                defecto DEFAULT_BLOCKED_URLS)
+            lean_calibrate: Si es True la primera página de cada tipo se carga
+                además como referencia para estimar el ahorro (dos cargas
+                completas más; desactivarlo en mediciones de ritmo)
+            max_retries: Reintentos (con backoff exponencial) de cada ficha fallida
+            retry_budget: Máximo de reintentos en toda la ejecución (None sin límite)
+            page_load_timeout: Segundos máximos de carga de una página antes
+                de considerar que Chrome quedó colgado
+            expand_timeout: Segundos máximos de espera a que "Información
+                institucional" se expanda en Chrome (se deja de esperar
+                apenas la sección aparece, traiga o no la matrícula)
+            adaptive: Si es True un controlador AIMD ajusta, según la latencia
+                y los errores de búsquedas y fichas, cuántos requests hay en
+                curso (hasta `concurrency`) y el intervalo mínimo entre ellos
+            metrics_file: Métricas por etapa en formato texto de Prometheus
+            metrics_summary_file: Resumen JSON de las métricas (colegios/min)
+            metrics_interval: Segundos entre cada escritura periódica de las métricas
+            trace_file: Si se indica, se registran spans (ejecución → región →
+                comuna → colegio → campo) y se guardan en este archivo en
+                formato Chrome trace-event. None desactiva las trazas.
+            shard: (i, N) para procesar solo la parte i de N del catálogo
+                (ver sharding.py). La salida, el registro de trabajos, el
+                progreso, las métricas y la traza llevan el sufijo del shard,
+                y al cerrar se escribe su manifiesto para merge_shards.py.
+            base_url: URL de la búsqueda avanzada (por ejemplo la de standin_server.py)
+            ficha_url_template: URL de las fichas, con {rbd} en lugar del RBD
+            fields: Campos a extraer de cada colegio (por defecto todos los de
+                FICHA_FIELDS). Los que no se piden no se buscan en la ficha (sin
+                expandir "Información institucional" si no se pide la
+                matrícula) y no van en el JSONL ni en el Excel; región,
+                comuna, URL y RBD van siempre.
         """
-        self.base_url = "https://mi.mineduc.cl/mime-web/mvc/mime/busqueda_avanzada"
+        if engine not in (ENGINE_SELENIUM, ENGINE_HTTP):
+            raise ValueError(f"Motor desconocido: {engine}")
+        if concurrency < 1:
+            raise ValueError("concurrency debe ser al menos 1")
+        if workers < 1:
+            raise ValueError("workers debe ser al menos 1")
+        self.shard = shard
+        if shard:
+            suffix = shard_suffix(shard)
+            output_file = with_suffix(output_file, suffix)
+            ledger_file = with_suffix(ledger_file, suffix)
+            metrics_file = metrics_file and with_suffix(metrics_file, suffix)
+            metrics_summary_file = metrics_summary_file and with_suffix(metrics_summary_file, suffix)
+            trace_file = trace_file and with_suffix(trace_file, suffix)
+        self._shard_plan = None
+        self.base_url = base_url
+        self.ficha_url_template = ficha_url_template
         self.headless = headless
         self.driver = None
         self.wait = None
+        self.metrics_file = metrics_file
+        self.metrics_summary_file = metrics_summary_file
+        self.metrics_interval = metrics_interval
+        self.metrics = Metrics(metrics_file, metrics_summary_file)
+        self.trace_file = trace_file
+        self.tracer = Tracer(trace_file) if trace_file else NULL_TRACER
+        self.readiness = PageReadiness(timeout=10, observer=self._observe_wait)
         self.data = []
-        self.progress_file = "scraper_progress.json"
+        self.progress_file = with_suffix("scraper_progress.json", shard_suffix(shard)) if shard \
+            else "scraper_progress.json"
+        self.output_file = output_file
+        self.sink = None
+        self.ledger_file = ledger_file
+        self.ledger = None
+        self._output_rbds = set()
         self.resume_from = resume_from
         self.current_region = None
         self.current_comuna = None
+        self.engine = engine
+        self.http_pool_size = max(http_pool_size, concurrency)
+        self.session = None
+        self.concurrency = concurrency
+        self.workers = workers
+        self._worker_local = threading.local()
+        self._worker_drivers = []
+        self._worker_drivers_lock = threading.Lock()
+        self._executor = None
+        self._executor_size = 0
+        self.cache_dir = cache_dir
+        self.cache_ttl = cache_ttl
+        self.cache_max_bytes = cache_max_bytes
+        self.cache = PageCache(cache_dir, ttl=cache_ttl, max_bytes=cache_max_bytes) if cache_dir else None
+        self.incremental_from = incremental_from
+        self.previous_records = load_records_by_rbd(incremental_from) if incremental_from else None
+        # En modo incremental la caché solo se escribe: leerla ocultaría los cambios
+        self.cache_read = self.cache is not None and self.previous_records is None
+        self.change_counts = {CHANGE_REUSED: 0, CHANGE_UPDATED: 0, CHANGE_ADDED: 0}
+        self._searched_comunas = set()
+        # Campos requeridos a cada colegio y los que ya trajo la tabla de
+        # resultados, por URL de ficha (ver _school_urls_from_results)
+        self.fields = select_fields(fields)
+        self.columns = record_columns(self.fields)
+        self._listed = {}
+        self._seen_rbds = set()
+        self.direct_search = direct_search
+        self._search_form = None
+        self.catalog = ComunaCatalog(catalog_file, max_age=catalog_max_age)
+        self.refresh_catalog = refresh_catalog
+        self.lean_browser = lean_browser
+        self.blocked_urls = blocked_urls
+        self.lean_stats = LeanLoadStats(blocked_urls if blocked_urls is not None else DEFAULT_BLOCKED_URLS,
+                                        calibrate=lean_calibrate) if lean_browser else None
+        self.max_retries = max_retries
+        self.retry_budget = retry_budget
+        self.retry_queue = RetryQueue(max_attempts=max_retries, budget=retry_budget)
+        self.page_load_timeout = page_load_timeout
+        self.expand_timeout = expand_timeout
+        self.driver_restarts = 0
+        self._context_region = None
+        self.adaptive = adaptive
+        self.controller = AdaptiveController(max_limit=concurrency) if adaptive else None
         
-    def setup_driver(self):
-        """Configura y retorna el driver de Chrome"""
+    def _create_driver(self) -> webdriver.Chrome:
+        """Crea una nueva instancia de Chrome con las opciones del scraper"""
         chrome_options = Options()
         if self.headless:
             chrome_options.add_argument("--headless")
@@ -61,11 +366,161 @@ class MinEducScraper:
         chrome_options.add_argument("--disable-dev-shm-usage")
         chrome_options.add_argument("--disable-gpu")
         chrome_options.add_argument("--window-size=1920,1080")
+        if self.lean_stats:
+            configure_lean_options(chrome_options)
+        
+        driver = webdriver.Chrome(options=chrome_options)
+        # Margen para la espera de la matrícula dentro de FICHA_EXTRACTION_SCRIPT
+        driver.set_script_timeout(self.expand_timeout + 10)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.lean_stats:
+            self.lean_stats.enable(driver)
+        return driver
         
-        self.driver = webdriver.Chrome(options=chrome_options)
+    def setup_driver(self):
+        """Configura el driver de Chrome principal"""
+        with self.metrics.time("inicio_driver"):
+            self.driver = self._create_driver()
         self.wait = WebDriverWait(self.driver, 10)
         logger.info("Driver de Chrome configurado correctamente")
         
+    def _load_page(self, driver, url: str, kind: str):
+        """Navega a url (con el perfil liviano, si está activo, midiendo lo transferido)"""
+        with self.metrics.time(f"carga_{kind}"), self.tracer.span(f"carga {kind}", url=url):
+            if self.lean_stats:
+                self.lean_stats.load(driver, url, kind)
+            else:
+                driver.get(url)
+            
+    def open_search_page(self):
+        """Carga la página de búsqueda y espera a que el dropdown de regiones esté poblado"""
+        self._load_page(self.driver, self.base_url, "búsqueda")
+        self.readiness.wait_for(self.driver, "regiones cargadas", select_has_options("region"))
+        
+    def _ficha_driver(self) -> webdriver.Chrome:
+        """
+        Retorna el driver con el que el hilo actual abre fichas: el principal
+        si no hay concurrencia, o uno propio por hilo del pool
+        """
+        if self.concurrency == 1:
+            return self.driver
+        driver = getattr(self._worker_local, 'driver', None)
+        if driver is None:
+            with self.metrics.time("inicio_driver"):
+                driver = self._create_driver()
+            self._worker_local.driver = driver
+            with self._worker_drivers_lock:
+                self._worker_drivers.append(driver)
+            logger.info(f"Driver de Chrome adicional configurado ({threading.current_thread().name})")
+        return driver
+        
+    def warm_up_drivers(self):
+        """
+        Abre de antemano el Chrome de cada hilo de extracción (motor selenium
+        con concurrencia), para que su arranque no se mezcle con lo que se
+        mida después (ver scraper_piloto.py)
+        """
+        if self.engine == ENGINE_HTTP or self.concurrency == 1:
+            return
+        # Cada tarea espera a las demás, así que cada hilo del pool toma una
+        barrier = threading.Barrier(self.concurrency)
+        
+        def open_driver(_):
+            try:
+                barrier.wait(timeout=60)
+            except threading.BrokenBarrierError:
+                pass
+            self._ficha_driver()
+        
+        list(self._ficha_executor().map(open_driver, range(self.concurrency)))
+        
+    def _ficha_executor(self) -> ThreadPoolExecutor:
+        """
+        Pool de hilos de extracción de toda la ejecución: cada hilo conserva
+        su Chrome entre comunas. Si cambió self.concurrency se cierra el pool
+        anterior (con sus Chrome) y se crea uno del nuevo tamaño.
+        """
+        if self._executor is not None and self._executor_size != self.concurrency:
+            self._shutdown_executor()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="ficha")
+            self._executor_size = self.concurrency
+        return self._executor
+        
+    def _shutdown_executor(self):
+        """Cierra el pool de hilos de extracción y el Chrome de cada hilo"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self._quit_worker_drivers()
+        
+    def _quit_worker_drivers(self):
+        """Cierra los drivers abiertos por los hilos de extracción"""
+        with self._worker_drivers_lock:
+            drivers, self._worker_drivers = self._worker_drivers, []
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception as e:
+                logger.warning(f"Error cerrando driver adicional: {e}")
+        
+    def _replace_driver(self, driver):
+        """
+        Reemplaza un driver muerto o colgado. Si es el principal se vuelve a
+        abrir la búsqueda con la región en curso; si es el de un hilo de
+        extracción, el hilo crea uno nuevo en su próxima ficha.
+        """
+        self.driver_restarts += 1
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.debug(f"Error cerrando driver sin respuesta: {e}")
+        
+        if driver is self.driver:
+            logger.warning("Chrome principal no responde, reiniciando sesión...")
+            self.setup_driver()
+            self.open_search_page()
+            if self._context_region:
+                self.select_region(self._context_region['value'])
+        else:
+            logger.warning(f"Chrome de {threading.current_thread().name} no responde, se reemplazará")
+            with self._worker_drivers_lock:
+                if driver in self._worker_drivers:
+                    self._worker_drivers.remove(driver)
+            if getattr(self._worker_local, 'driver', None) is driver:
+                self._worker_local.driver = None
+                
+    def _recover_driver(self, driver, error: BaseException):
+        """Reemplaza el driver si el error indica que murió o quedó colgado"""
+        if driver is None or not needs_restart(driver, error):
+            return
+        try:
+            self._replace_driver(driver)
+        except Exception as e:
+            logger.error(f"No se pudo reiniciar Chrome: {e}")
+            
+    def setup_http_session(self):
+        """Configura la sesión HTTP con conexiones keep-alive reutilizables"""
+        session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504))
+        adapter = HTTPAdapter(
+            pool_connections=self.http_pool_size,
+            pool_maxsize=self.http_pool_size,
+            max_retries=retry
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        session.headers.update({
+            'User-Agent': self.driver.execute_script("return navigator.userAgent;") if self.driver else 'Mozilla/5.0',
+            'Accept-Language': 'es-CL,es;q=0.9',
+        })
+        # Reutilizar las cookies de la sesión del navegador (JSESSIONID, etc.)
+        if self.driver:
+            for cookie in self.driver.get_cookies():
+                session.cookies.set(cookie['name'], cookie['value'], domain=cookie.get('domain'), path=cookie.get('path', '/'))
+        self.session = session
+        logger.info(f"Sesión HTTP configurada (pool de {self.http_pool_size} conexiones)")
+        
     def save_progress(self):
         """Guarda el progreso actual para poder resumir después"""
         progress = {
@@ -74,7 +529,8 @@ class MinEducScraper:
             'records_collected': len(self.data),
             'timestamp': datetime.now().isoformat()
         }
-        with open(self.progress_file, 'w', encoding='utf-8') as f:
+        with self.metrics.time("checkpoint"), self.tracer.span("checkpoint"), \
+                open(self.progress_file, 'w', encoding='utf-8') as f:
             json.dump(progress, f, ensure_ascii=False, indent=2)
             
     def load_progress(self) -> Optional[Dict]:
@@ -113,14 +569,21 @@ class MinEducScraper:
         
     def select_region(self, region_value: str) -> bool:
         """Selecciona una región específica"""
+        with self.metrics.time("seleccion_region"):
+            return self._select_region(region_value)
+            
+    def _select_region(self, region_value: str) -> bool:
         try:
             region_dropdown = self.wait.until(
                 EC.element_to_be_clickable((By.ID, "region"))
             )
             
+            # Si la región ya está seleccionada las comunas no van a cambiar
+            already_selected = region_dropdown.get_attribute("value") == region_value
+            comunas_before = option_signature(self.driver, "comuna")
+            
             # Seleccionar la región
             region_dropdown.click()
-            time.sleep(0.5)
             
             # Buscar la opción por value
             option = self.driver.find_element(
@@ -128,7 +591,11 @@ class MinEducScraper:
                 f"#region option[value='{region_value}']"
             )
             option.click()
-            time.sleep(2)  # Esperar a que se carguen las comunas dinámicamente
+            
+            # Esperar a que se carguen las comunas dinámicamente
+            if not already_selected:
+                self.readiness.wait_for(self.driver, "comunas repobladas",
+                                        comuna_options_repopulated(comunas_before))
             return True
         except Exception as e:
             logger.error(f"Error seleccionando región {region_value}: {e}")
@@ -141,7 +608,6 @@ class MinEducScraper:
             comuna_dropdown = self.wait.until(
                 EC.presence_of_element_located((By.ID, "comuna"))
             )
-            time.sleep(1)
             
             options = self.driver.find_elements(By.CSS_SELECTOR, "#comuna option")
             comunas = []
@@ -174,14 +640,15 @@ class MinEducScraper:
                 f"#comuna option[value='{comuna_value}']"
             )
             option.click()
-            time.sleep(1)
             
             # Hacer click en el botón/enlace de búsqueda
             search_button = self.wait.until(
                 EC.element_to_be_clickable((By.CSS_SELECTOR, "a.boton_caja[onclick*='EnviaBusqueda']")
             ))
+            previous_html = self.driver.find_element(By.TAG_NAME, "html")
             search_button.click()
-            time.sleep(3)  # Esperar resultados
+            self.readiness.wait_for(self.driver, "búsqueda enviada", search_submitted(previous_html),
+                                    required=False)
             return True
         except Exception as e:
             logger.error(f"Error seleccionando comuna {comuna_value}: {e}")
@@ -189,33 +656,18 @@ class MinEducScraper:
             
     def get_schools_in_page(self) -> List[str]:
         """Obtiene los links de todos los colegios en la tabla de resultados"""
-        try:
-            # Esperar a que la tabla de resultados esté presente
-            self.wait.until(
-                EC.presence_of_element_located((By.ID, "busqueda_avanzada"))
-            )
-            time.sleep(2)  # Esperar a que se completen todos los resultados
+        with self.metrics.time("tabla_resultados"):
+            return self._get_schools_in_page()
             
-            # Los links están en la tabla con ID="busqueda_avanzada"
-            # Usan onclick para enviar formulario, no href con 'ficha'
-            school_links = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "table#busqueda_avanzada tbody tr a"
-            )
+    def _get_schools_in_page(self) -> List[str]:
+        try:
+            # Esperar a que la tabla de resultados esté presente y completa
+            self.readiness.wait_for(self.driver, "tabla de resultados estable",
+                                    results_row_count_stable(), timeout=20)
             
-            # Extraer el RBD del onclick para construir la URL
-            urls = []
-            for link in school_links:
-                onclick = link.get_attribute("onclick")
-                if onclick and "document.fichaescuela" in onclick:
-                    # Extraer RBD del onclick: document.fichaescuela.rbd.value='12736'
-                    import re
-                    match = re.search(r"value='(\d+)'", onclick)
-                    if match:
-                        rbd = match.group(1)
-                        # Construir URL de la ficha
-                        url = f"https://mi.mineduc.cl/mime-web/mvc/mime/ficha?rbd={rbd}"
-                        urls.append(url)
+            # La tabla (ID="busqueda_avanzada") se lee completa desde el HTML:
+            # el RBD del onclick de cada fila y las columnas que ya muestra
+            urls = self._school_urls_from_results(self.driver.page_source)
                     
             logger.info(f"Se encontraron {len(urls)} colegios en esta página")
             return urls
@@ -223,224 +675,742 @@ class MinEducScraper:
             logger.error(f"Error obteniendo colegios: {e}")
             return []
             
+    def _ficha_url(self, rbd: str) -> str:
+        """URL de la ficha de un colegio"""
+        return self.ficha_url_template.format(rbd=rbd)
+        
+    def _school_urls_from_results(self, html: str) -> List[str]:
+        """
+        URLs de las fichas de una tabla de resultados, en su orden. Los campos
+        que la tabla ya muestra quedan en self._listed para no pedirlos a la ficha.
+        """
+        urls = []
+        for rbd, fields in parse_results_table(html):
+            url = self._ficha_url(rbd)
+            self._listed[url] = fields
+            urls.append(url)
+        return urls
+        
+    def _pending_fields(self, school_url: str) -> List[str]:
+        """Campos requeridos que la tabla de resultados no trajo (hay que leerlos de la ficha)"""
+        listed = self._listed.get(school_url, {})
+        return [field for field in self.fields if not listed.get(field)]
+        
+    def _new_school_record(self, school_url: str) -> Dict[str, str]:
+        """Retorna un registro vacío con las columnas del Excel (self.columns)"""
+        school_data = dict.fromkeys(self.columns, '')
+        school_data.update({
+            'region': self.current_region,
+            'comuna': self.current_comuna,
+            'url': school_url,
+            'rbd': rbd_from_url(school_url) or ''
+        })
+        return school_data
+        
+    def _log_school_data(self, school_data: Dict[str, str], missing: List[str]):
+        """Registra los datos extraídos de un colegio como registro estructurado (JSON)"""
+        log_school(school_logger, "Datos extraídos", school_data, missing=missing)
+        
+    def _school_record_from_fields(self, school_url: str, fields: Dict[str, Optional[str]]) -> Dict[str, str]:
+        """Arma el registro con los campos extraídos y avisa los que faltan"""
+        school_data = self._new_school_record(school_url)
+        listed = {field: value for field, value in self._listed.get(school_url, {}).items() if field in self.fields}
+        school_data.update(listed)
+        missing = []
+        for field, value in fields.items():
+            if value is not None:
+                school_data[field] = value
+            elif field not in listed:
+                missing.append(field)
+        if missing:
+            logger.warning("Campos sin extraer en %s: %s", school_url, ", ".join(missing))
+        
+        self._log_school_data(school_data, missing)
+        return school_data
+        
+    def _school_record_from_listing(self, school_url: str) -> Dict[str, str]:
+        """
+        Registro armado solo con la tabla de resultados, sin visitar la ficha.
+        En modo incremental se compara con el registro anterior.
+        """
+        self.metrics.inc('fichas_omitidas')
+        school_data = self._school_record_from_fields(school_url, {})
+        if self.previous_records is not None:
+            previous = self.previous_records.get(rbd_from_url(school_url))
+            if previous is None:
+                school_data['_change'] = CHANGE_ADDED
+            elif all(previous.get(field, '') == school_data[field] for field in self.fields):
+                # Se conservan los validadores de la ficha para la próxima comparación
+                school_data.update({field: previous[field] for field in SIGNATURE_FIELDS if previous.get(field)})
+                school_data['_change'] = CHANGE_REUSED
+            else:
+                school_data['_change'] = CHANGE_UPDATED
+        return school_data
+        
+    def _observe_wait(self, name: str, seconds: float):
+        self.metrics.observe(f"espera_{name}", seconds)
+        self.tracer.record(f"espera {name}", self.tracer.now() - seconds, seconds)
+        
+    def _observe_field(self, field: str, seconds: float, start: Optional[float] = None):
+        """Registra el tiempo de búsqueda de un campo (start: inicio en el reloj de la traza)"""
+        self.metrics.observe(f"campo_{field}", seconds)
+        if self.tracer.enabled:
+            self.tracer.record(f"campo {field}", self.tracer.now() - seconds if start is None else start, seconds)
+        
+    def _parse_ficha(self, html: str, fields: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        """Parsea una ficha (solo fields, si se indica) registrando el tiempo total y el de cada campo"""
+        with self.metrics.time("parseo_ficha"), self.tracer.span("parseo ficha"):
+            return parse_ficha_html(html, on_field=self._observe_field, fields=fields)
+            
     def extract_school_data(self, school_url: str) -> Optional[Dict[str, str]]:
         """
-        Extrae los datos de un colegio específico
+        Extrae los datos de un colegio específico con el motor configurado.
+        De la ficha solo se leen los campos que no trajo la tabla de
+        resultados; si la tabla los trajo todos, la ficha no se visita.
+        Si la ficha está en la caché se parsea desde el disco. Solo las
+        descargas pasan por el controlador adaptativo: las fichas resueltas
+        desde la tabla o la caché no ocupan cupo ni cuentan en su latencia.
         
         Returns:
-            Dict con nombre, telefono y matricula_total
+            Dict con las 12 columnas del registro
         """
+        pending = self._pending_fields(school_url)
+        if not pending:
+            return self._school_record_from_listing(school_url)
+        if self.previous_records is not None:
+            return self._tracked("ficha", self._extract_school_data_incremental, school_url, pending)
+        if self.cache_read:
+            cached = self.cache.get(PageCache.key_for(school_url))
+            if cached is not None:
+                try:
+                    return self._school_record_from_fields(school_url, self._parse_ficha(cached, pending))
+                except Exception as e:
+                    logger.error(f"Error parseando la ficha en caché {school_url}: {e}")
+                    return None
+        if self.engine == ENGINE_HTTP:
+            return self._tracked("ficha", self._extract_school_data_http, school_url, pending)
+        return self._tracked("ficha", self._extract_school_data_selenium, school_url, pending)
+        
+    def _fetch_ficha(self, school_url: str, headers: Optional[Dict[str, str]] = None) -> requests.Response:
+        """Descarga la ficha por HTTP (y la guarda en la caché si está activa)"""
+        with self.metrics.time("descarga_ficha"):
+            response = self.session.get(school_url, headers=headers, timeout=30)
+        response.raise_for_status()
+        if self.cache and response.status_code == 200:
+            self.cache.put(PageCache.key_for(school_url), response.text)
+        return response
+        
+    @staticmethod
+    def _ficha_signature(response: requests.Response) -> Dict[str, str]:
+        """Hash del contenido y validadores HTTP de una ficha descargada"""
+        return {
+            '_ficha_hash': hashlib.sha256(response.content).hexdigest(),
+            '_etag': response.headers.get('ETag', ''),
+            '_last_modified': response.headers.get('Last-Modified', ''),
+        }
+        
+    def _extract_school_data_http(self, school_url: str, fields: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+        """Extrae los datos de un colegio (solo fields, si se indica) descargando la ficha por HTTP"""
         try:
-            self.driver.get(school_url)
-            time.sleep(2)
-            
-            school_data = {
-                'nombre': '',
-                'direccion': '',
-                'telefono': '',
-                'email': '',
-                'pagina_web': '',
-                'director': '',
-                'sostenedor': '',
-                'matricula_total': '',
-                'region': self.current_region,
-                'comuna': self.current_comuna,
-                'url': school_url
-            }
+            response = self._fetch_ficha(school_url)
+            school_data = self._school_record_from_fields(school_url, self._parse_ficha(response.text, fields))
+            school_data.update(self._ficha_signature(response))
+            return school_data
             
-            # Extraer nombre - está en div.titulo_color dentro de un td
-            try:
-                nombre_element = self.driver.find_element(
-                    By.XPATH, 
-                    "//div[@class='titulo_color']//td[1]"
-                )
-                school_data['nombre'] = nombre_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer el nombre del colegio de {school_url}")
+        except Exception as e:
+            logger.error(f"Error extrayendo datos del colegio {school_url}: {e}")
+            return None
             
-            # Extraer dirección
-            try:
-                direccion_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Dirección:')]/following-sibling::td"
-                )
-                school_data['direccion'] = direccion_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer la dirección de {school_url}")
+    def _extract_school_data_incremental(self, school_url: str,
+                                         fields: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Compara la ficha con la de la ejecución anterior y solo la vuelve a
+        extraer si cambió. La señal de cambio es, en orden: 304 a un GET
+        condicional con los validadores anteriores, el mismo hash de contenido
+        o, si el registro anterior no trae hash (p. ej. leído de un .xlsx),
+        los mismos valores de campo tras parsear la ficha.
+        """
+        previous = self.previous_records.get(rbd_from_url(school_url))
+        headers = {}
+        if previous:
+            if previous.get('_etag'):
+                headers['If-None-Match'] = previous['_etag']
+            if previous.get('_last_modified'):
+                headers['If-Modified-Since'] = previous['_last_modified']
+        
+        try:
+            response = self._fetch_ficha(school_url, headers=headers)
+        except Exception as e:
+            logger.error(f"Error extrayendo datos del colegio {school_url}: {e}")
+            return None
+        
+        # Un registro anterior al que le faltan campos pedidos no se reutiliza
+        if previous and all(field in previous for field in self.fields) and (
+                response.status_code == 304 or
+                self._ficha_signature(response)['_ficha_hash'] == previous.get('_ficha_hash')):
+            school_data = {column: previous.get(column, '') for column in self.columns}
+            school_data.update({field: previous[field] for field in SIGNATURE_FIELDS if field in previous})
+            school_data.update({'region': self.current_region, 'comuna': self.current_comuna, 'url': school_url,
+                                'rbd': rbd_from_url(school_url) or ''})
+            if response.status_code == 200:
+                school_data.update(self._ficha_signature(response))
+            school_data['_change'] = CHANGE_REUSED
+            log_school(school_logger, "Sin cambios", school_data)
+            return school_data
+        
+        # La ficha ya se descargó: se parsea ese HTML con ambos motores. Con
+        # Chrome solo se vuelve a abrir si falta algo de "Información institucional"
+        values = self._parse_ficha(response.text, fields)
+        if self.engine == ENGINE_SELENIUM:
+            expanded = [field for field in EXPANDED_FIELDS if field in values and values[field] is None]
+            if expanded:
+                browser_values = self._extract_fields_selenium(school_url, expanded)
+                if browser_values is None:
+                    return None
+                values.update(browser_values)
+        school_data = self._school_record_from_fields(school_url, values)
+        school_data.update(self._ficha_signature(response))
+        if (previous and not previous.get('_ficha_hash') and all(field in previous for field in self.fields)
+                and all(previous.get(field, '') == school_data[field] for field in self.fields)):
+            # Sin hash anterior se comparan los valores; el registro ya trae el
+            # hash nuevo para la próxima ejecución
+            school_data['_change'] = CHANGE_REUSED
+            log_school(school_logger, "Sin cambios", school_data)
+            return school_data
+        school_data['_change'] = CHANGE_UPDATED if previous else CHANGE_ADDED
+        return school_data
             
-            # Extraer teléfono - buscar el td que contiene "Teléfono:" y obtener el siguiente
-            try:
-                telefono_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Teléfono:')]/following-sibling::td"
-                )
-                school_data['telefono'] = telefono_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer el teléfono de {school_url}")
+    def _extract_school_data_selenium(self, school_url: str,
+                                      fields: Optional[List[str]] = None) -> Optional[Dict[str, str]]:
+        """
+        Extrae los datos de un colegio navegando la ficha con Chrome. Todos
+        los campos (o solo fields, si se indica) se leen con un único script
+        (un solo viaje a chromedriver).
+        """
+        values = self._extract_fields_selenium(school_url, fields)
+        return None if values is None else self._school_record_from_fields(school_url, values)
+        
+    def _extract_fields_selenium(self, school_url: str,
+                                 fields: Optional[List[str]] = None) -> Optional[Dict[str, Optional[str]]]:
+        """Abre la ficha en Chrome y retorna los campos leídos (None si falló)"""
+        driver = None
+        try:
+            driver = self._ficha_driver()
+            self._load_page(driver, school_url, "ficha")
+            self.readiness.wait_for(driver, "ficha cargada",
+                                    element_present(By.CSS_SELECTOR, "div.titulo_color"), required=False)
             
-            # Extraer email
-            try:
-                email_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'E-mail contacto:')]/following-sibling::td"
-                )
-                school_data['email'] = email_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer el email de {school_url}")
+            script_start = self.tracer.now()
+            with self.metrics.time("script_ficha"), self.tracer.span("script ficha"):
+                values = driver.execute_async_script(FICHA_EXTRACTION_SCRIPT, ficha_fields_subset(fields),
+                                                     int(self.expand_timeout * 1000))
+            # Los tiempos por campo se midieron en el navegador: se ubican en
+            # orden dentro del span del script
+            offset = script_start
+            for field, ms in (values.pop('_ms', None) or {}).items():
+                self._observe_field(field, ms / 1000, start=offset)
+                offset += ms / 1000
+            if self.cache:
+                # Se guarda después de expandir "Información institucional"
+                self.cache.put(PageCache.key_for(school_url), driver.page_source)
+            return values
             
-            # Extraer página web
-            try:
-                web_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Página web:')]/following-sibling::td"
-                )
-                school_data['pagina_web'] = web_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer la página web de {school_url}")
+        except Exception as e:
+            logger.error(f"Error extrayendo datos del colegio {school_url}: {e}")
+            self._recover_driver(driver, e)
+            return None
             
-            # Extraer director(a)
-            try:
-                director_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Director(a):')]/following-sibling::td"
-                )
-                school_data['director'] = director_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer el director de {school_url}")
+    def _tracked(self, stage: str, function: Callable, *args):
+        """
+        Ejecuta function(*args) dentro de un cupo del controlador adaptativo
+        (si está activo); un resultado None cuenta como error. La espera por
+        el cupo se registra como la etapa espera_controlador y se descuenta
+        de la etapa en curso (ver _timed_stage).
+        """
+        if not self.controller:
+            return function(*args)
+        with self.controller.track(stage) as outcome:
+            self._observe_wait("controlador", outcome.wait)
+            self._worker_local.controller_wait = getattr(self._worker_local, 'controller_wait', 0.0) + outcome.wait
+            result = function(*args)
+            if result is None:
+                outcome.fail()
+            return result
             
-            # Extraer sostenedor
-            try:
-                sostenedor_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Sostenedor:')]/following-sibling::td"
-                )
-                school_data['sostenedor'] = sostenedor_element.text.strip()
-            except:
-                logger.warning(f"No se pudo extraer el sostenedor de {school_url}")
+    @contextmanager
+    def _timed_stage(self, stage: str, span: str, **args):
+        """
+        Mide el bloque como la etapa stage y el span de la traza span, sin
+        contar lo que esperó un cupo del controlador adaptativo
+        """
+        self._worker_local.controller_wait = 0.0
+        start = self.tracer.now()
+        try:
+            yield
+        finally:
+            wait = self._worker_local.controller_wait
+            elapsed = self.tracer.now() - start - wait
+            self.metrics.observe(stage, elapsed)
+            self.tracer.record(span, start + wait, elapsed, **args)
             
-            # Expandir "Información institucional" haciendo click en el enlace
-            try:
-                info_link = self.driver.find_element(
-                    By.XPATH,
-                    "//a[contains(text(), 'Información institucional')]"
-                )
-                info_link.click()
-                time.sleep(1)
-            except:
-                pass  # Puede que ya esté expandida
+    def _extract_numbered(self, numbered_url) -> Optional[Dict[str, str]]:
+        """Extrae un colegio registrando su posición dentro de la comuna"""
+        i, total, school_url = numbered_url
+        logger.debug("Procesando colegio %d/%d", i, total)
+        return self._timed_ficha(school_url)
+        
+    def _timed_ficha(self, school_url: str) -> Optional[Dict[str, str]]:
+        """Extrae una ficha midiendo su duración y contando las fallidas"""
+        with self._timed_stage("ficha", "colegio", rbd=rbd_from_url(school_url), url=school_url):
+            school_data = self.extract_school_data(school_url)
+        self.metrics.inc('fichas')
+        if school_data is None:
+            self.metrics.inc('fichas_failed')
+        return school_data
+        
+    def _retry_school(self, retry) -> Optional[Dict[str, str]]:
+        """Reintenta una ficha de la cola de reintentos"""
+        (index, school_url), attempt = retry
+        logger.info(f"Reintento {attempt}/{self.max_retries} de {school_url}")
+        self.metrics.inc('retries')
+        return self._timed_ficha(school_url)
+        
+    @staticmethod
+    def _completed(executor: Optional[ThreadPoolExecutor], function: Callable, items: List):
+        """(item, function(item)) a medida que termina cada uno (en orden si no hay executor)"""
+        if executor is None:
+            for item in items:
+                yield item, function(item)
+            return
+        futures = {executor.submit(function, item): item for item in items}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
             
-            # Extraer matrícula total - está en un div.form_detalle después del div que contiene el texto
-            try:
-                matricula_element = self.driver.find_element(
-                    By.XPATH,
-                    "//div[contains(text(), 'Matrícula total de alumnos:')]/following-sibling::div[@class='form_detalle']"
-                )
-                school_data['matricula_total'] = matricula_element.text.strip()
-            except:
-                # Intentar con td (por si la estructura es diferente)
-                try:
-                    matricula_element = self.driver.find_element(
-                        By.XPATH,
-                        "//td[contains(text(), 'Matrícula total de alumnos:')]/following-sibling::td"
-                    )
-                    school_data['matricula_total'] = matricula_element.text.strip()
-                except:
-                    logger.warning(f"No se pudo extraer la matrícula total de {school_url}")
-            
-            logger.info(f"Datos extraídos: {school_data['nombre']} | Dir: {school_data['direccion'][:30] if school_data['direccion'] else 'N/A'}... | Tel: {school_data['telefono']} | Email: {school_data['email'][:30] if school_data['email'] else 'N/A'}... | Web: {school_data['pagina_web'][:30] if school_data['pagina_web'] else 'N/A'}... | Director: {school_data['director'][:30] if school_data['director'] else 'N/A'}... | Sostenedor: {school_data['sostenedor'][:30] if school_data['sostenedor'] else 'N/A'}... | Matrícula: {school_data['matricula_total']}")
-            return school_data
+    def extract_schools(self, school_urls: List[str],
+                        on_result: Optional[Callable[[str, Optional[Dict[str, str]]], None]] = None
+                        ) -> List[Optional[Dict[str, str]]]:
+        """
+        Extrae todas las fichas de una comuna con hasta self.concurrency
+        extracciones simultáneas. Las fichas que fallan pasan a la cola de
+        reintentos (backoff exponencial) hasta agotar sus intentos o el
+        presupuesto. Los resultados conservan el orden de school_urls, tanto
+        en la lista retornada como en las llamadas a on_result.
+        
+        Args:
+            on_result: Se llama (en este hilo) con (url, registro), o con
+                (url, None) si la ficha agotó sus reintentos, en el orden de
+                school_urls: apenas termina una ficha se entregan todas las
+                terminadas que no esperan a una anterior todavía en curso
+        """
+        numbered = [(i, len(school_urls), url) for i, url in enumerate(school_urls, 1)]
+        # El pool se reutiliza en todas las comunas (ver _ficha_executor)
+        executor = self._ficha_executor() if self.concurrency > 1 and len(school_urls) > 1 else None
+        results = [None] * len(school_urls)
+        finished = [False] * len(school_urls)
+        delivered = 0
+        
+        def finish(index: int):
+            nonlocal delivered
+            finished[index] = True
+            while delivered < len(school_urls) and finished[delivered]:
+                if on_result:
+                    on_result(school_urls[delivered], results[delivered])
+                delivered += 1
+        
+        for (i, _, school_url), school_data in self._completed(executor, self._extract_numbered, numbered):
+            if school_data is not None:
+                results[i - 1] = school_data
+            elif self.retry_queue.push((i - 1, school_url)):
+                continue
+            else:
+                logger.warning(f"Sin presupuesto de reintentos para {school_url}")
+            finish(i - 1)
+        
+        while len(self.retry_queue):
+            batch = self.retry_queue.next_batch()
+            for retry, school_data in self._completed(executor, self._retry_school, batch):
+                (index, school_url), attempt = retry
+                if school_data is not None:
+                    results[index] = school_data
+                    self.retry_queue.mark_recovered()
+                elif self.retry_queue.push((index, school_url), attempt + 1):
+                    continue
+                else:
+                    logger.error(f"Reintentos agotados para {school_url}")
+                finish(index)
+        return results
+            
+    def start_browser(self):
+        """Abre Chrome en la página de búsqueda (y la sesión HTTP si corresponde)"""
+        self.setup_driver()
+        self.open_search_page()
+        # El modo incremental usa HTTP para comparar las fichas con ambos motores
+        if self.engine == ENGINE_HTTP or self.previous_records is not None:
+            self.setup_http_session()
             
+    def close_browser(self):
+        """Cierra todos los navegadores (también los de los hilos de extracción) y la sesión HTTP"""
+        self._shutdown_executor()
+        if self.driver:
+            self.driver.quit()
+            self.driver = None
+        if self.session:
+            self.session.close()
+            self.session = None
+            
+    def _submit_search_form(self, region_value: str, comuna_value: str) -> Optional[str]:
+        """
+        Envía el formulario de búsqueda avanzada con la región y comuna
+        indicadas y retorna el HTML de la respuesta (None si falló)
+        """
+        if self._search_form is None:
+            self._search_form = self.driver.execute_script(SEARCH_FORM_SCRIPT)
+            if self._search_form is None:
+                raise RuntimeError("No se encontró el formulario de búsqueda avanzada")
+        form = self._search_form
+        values = {form['region_field']: region_value, form['comuna_field']: comuna_value}
+        fields = [(name, values.get(name, value)) for name, value in form['fields']]
+        fields += [(name, value) for name, value in values.items() if name not in dict(form['fields'])]
+        
+        if self.session:
+            if form['method'] == 'GET':
+                response = self.session.get(form['action'], params=fields, timeout=30)
+            else:
+                response = self.session.post(form['action'], data=fields, timeout=30)
+            response.raise_for_status()
+            return response.text
+        
+        response = self.driver.execute_async_script(SEARCH_SUBMIT_SCRIPT, form['action'], form['method'], fields)
+        if not response or response.get('status') != 200:
+            raise RuntimeError(f"Respuesta {response.get('status') if response else None}: "
+                               f"{(response or {}).get('error', '')}")
+        return response['html']
+        
+    def _search_comuna_direct(self, region: Dict[str, str], comuna: Dict[str, str]) -> Optional[str]:
+        """
+        Busca una comuna con un solo request y retorna el HTML de la respuesta,
+        o None si el envío falló (timeout, error de red o 5xx). Esas fallas
+        son transitorias: se cuentan en 'busqueda_directa_fallida' y no
+        desactivan la búsqueda directa.
+        """
+        try:
+            return self._submit_search_form(region['value'], comuna['value'])
         except Exception as e:
-            logger.error(f"Error extrayendo datos del colegio {school_url}: {e}")
+            self.metrics.inc('busqueda_directa_fallida')
+            logger.warning(f"Búsqueda directa falló para {comuna['text']}, se usa el formulario: {e}")
             return None
             
-    def scrape_all(self):
-        """Ejecuta el scraping completo de todas las regiones y comunas"""
-        logger.info("Iniciando scraping completo...")
+    def _direct_result_trusted(self, html: str, region: Dict[str, str], comuna: Dict[str, str]) -> bool:
+        """
+        La respuesta directa basta sin confirmarla con el formulario: trae
+        colegios, trae la tabla de resultados vacía o la comuna ya estaba
+        vacía la última vez que se buscó (catálogo)
+        """
+        return (bool(parse_results_rbds(html)) or results_table_present(html)
+                or self.catalog.school_count(region, comuna) == 0)
+        
+    def search_comuna(self, region: Dict[str, str], comuna: Dict[str, str]) -> Optional[List[str]]:
+        """
+        Ejecuta la búsqueda de una comuna (o la lee de la caché)
+        
+        Returns:
+            URLs de las fichas en el orden de la tabla, o None si no se pudo buscar
+        """
+        cache_key = PageCache.key_for(self.base_url, {'region': region['value'], 'comuna': comuna['value']})
+        cached = self.cache.get(cache_key) if self.cache_read else None
+        if cached is not None:
+            school_urls = self._school_urls_from_results(cached)
+            logger.info(f"Se encontraron {len(school_urls)} colegios en esta página (caché)")
+            return school_urls
+        
+        direct_rbds = None
+        if self.direct_search:
+            html = self._search_comuna_direct(region, comuna)
+            if html is not None and self._direct_result_trusted(html, region, comuna):
+                school_urls = self._school_urls_from_results(html)
+                logger.info(f"Se encontraron {len(school_urls)} colegios en esta página (búsqueda directa)")
+                if self.cache:
+                    self.cache.put(cache_key, html)
+                return school_urls
+            if html is not None:
+                # Sin tabla de resultados no se distingue una comuna vacía de
+                # un envío incompleto: se confirma con el formulario
+                direct_rbds = set(parse_results_rbds(html))
         
-        # Cargar progreso si existe
-        progress = self.load_progress() if self.resume_from else None
-        skip_until_region = progress['current_region'] if progress else None
-        skip_until_comuna = progress['current_comuna'] if progress else None
-        should_skip = skip_until_region is not None
+        # Recargar página y seleccionar región nuevamente
+        self.open_search_page()
+        self.select_region(region['value'])
+        
+        # Seleccionar comuna y buscar
+        if not self.select_comuna(comuna['value']):
+            return None
+        
+        # Obtener todos los colegios de esta comuna
+        school_urls = self.get_schools_in_page()
+        if self.cache and school_urls:
+            self.cache.put(cache_key, self.driver.page_source)
+        if direct_rbds is not None and {rbd_from_url(url) for url in school_urls} != direct_rbds:
+            # La respuesta directa llegó bien pero no trae los colegios del
+            # formulario: el sitio no acepta el envío directo, se deja de intentar
+            logger.warning("La búsqueda directa no coincide con el formulario, se desactiva")
+            self.direct_search = False
+        return school_urls
+        
+    def scrape_comuna(self, region: Dict[str, str], comuna: Dict[str, str],
+                      skip_rbds: Optional[Set[str]] = None,
+                      on_search: Optional[Callable[[List[str]], None]] = None,
+                      on_result: Optional[Callable[[str, Optional[Dict[str, str]]], None]] = None
+                      ) -> Optional[List[Tuple[str, Optional[Dict[str, str]]]]]:
+        """
+        Busca una comuna y extrae sus fichas
+        
+        Args:
+            skip_rbds: RBD que ya fueron extraídos y no se vuelven a visitar
+            on_search: Se llama con todas las URLs de la comuna antes de extraer
+            on_result: Se llama con (url, registro) en el orden de la tabla,
+                apenas termina cada ficha y las anteriores (ver extract_schools),
+                para guardarla sin esperar a la comuna
+        
+        Returns:
+            Lista de (url, registro) por cada ficha visitada (registro None si
+            falló), o None si no se pudo ejecutar la búsqueda
+        """
+        with self.tracer.span("comuna", region=region['text'], comuna=comuna['text']):
+            return self._scrape_comuna(region, comuna, skip_rbds, on_search, on_result)
+            
+    def _scrape_comuna(self, region: Dict[str, str], comuna: Dict[str, str], skip_rbds: Optional[Set[str]],
+                       on_search: Optional[Callable[[List[str]], None]],
+                       on_result: Optional[Callable[[str, Optional[Dict[str, str]]], None]] = None):
+        self.current_region = region['text']
+        self.current_comuna = comuna['text']
+        self._context_region = region
+        self._listed = {}
         
         try:
-            self.setup_driver()
-            self.driver.get(self.base_url)
-            time.sleep(3)
+            with self._timed_stage("busqueda_comuna", "búsqueda"):
+                school_urls = self._tracked("búsqueda", self.search_comuna, region, comuna)
+        except (TimeoutException, requests.RequestException) as e:
+            # Una carga lenta o un error de red solo hace fallar esta comuna
+            # (queda FAILED en el registro y se reintenta al resumir)
+            logger.error(f"Error buscando comuna {comuna['text']}: {e}")
+            school_urls = None
+        except Exception as e:
+            if driver_alive(self.driver):
+                raise
+            logger.error(f"Error buscando comuna {comuna['text']}: {e}")
+            school_urls = None
+        if not school_urls and not driver_alive(self.driver):
+            # Chrome murió durante la búsqueda: se reinicia y se repite una vez
+            self._replace_driver(self.driver)
+            school_urls = self.search_comuna(region, comuna)
+        if school_urls is None:
+            return None
+        if on_search:
+            on_search(school_urls)
+        
+        pending = [url for url in school_urls if rbd_from_url(url) not in (skip_rbds or ())]
+        if len(pending) < len(school_urls):
+            logger.info(f"Saltando {len(school_urls) - len(pending)} colegios ya extraídos")
+        
+        # Procesar cada colegio (en paralelo si concurrency > 1)
+        return list(zip(pending, self.extract_schools(pending, on_result)))
+        
+    def read_catalog_from_site(self) -> List[Tuple[Dict[str, str], Optional[List[Dict[str, str]]]]]:
+        """Recorre los dropdowns y retorna (región, comunas) de todo el sitio"""
+        tree = []
+        for region in self.get_regions():
+            self.open_search_page()
+            if not self.select_region(region['value']):
+                tree.append((region, None))
+                continue
+            tree.append((region, self.get_comunas()))
+        return tree
+        
+    def get_catalog(self) -> List[Tuple[Dict[str, str], List[Dict[str, str]]]]:
+        """
+        Retorna (región, comunas) desde el catálogo en disco. Solo se
+        recorren los dropdowns si el catálogo venció o se pidió refrescarlo;
+        si para eso hace falta Chrome y no estaba abierto, se abre y se cierra.
+        """
+        stale = self.catalog.is_stale()
+        if stale and self.shard and self.catalog.regions():
+            # Cada máquina debe repartir el mismo catálogo: se refresca solo a pedido
+            logger.warning("El catálogo está vencido; en modo shard se usa igual (REFRESH_CATALOG lo actualiza)")
+            stale = False
+        if self.refresh_catalog or stale:
+            logger.info("Actualizando catálogo de regiones y comunas desde el sitio...")
+            opened = self.driver is None
+            if opened:
+                self.setup_driver()
+                self.open_search_page()
+            try:
+                self.catalog.replace(self.read_catalog_from_site())
+            finally:
+                if opened:
+                    self.close_browser()
+            self.refresh_catalog = False
+        self.catalog.log_summary()
+        return self.catalog.regions()
+        
+    def work_catalog(self) -> List[Tuple[Dict[str, str], List[Dict[str, str]]]]:
+        """
+        (región, comunas) que procesa esta ejecución: todo el catálogo o, en
+        modo shard, solo las comunas asignadas a este shard. El reparto se
+        guarda en shard_plan_deN.json la primera vez y se reutiliza después,
+        aunque el catálogo actualice sus conteos durante la ejecución.
+        """
+        regions = self.get_catalog()
+        if not self.shard:
+            return regions
+        index, total = self.shard
+        plan_file = f"shard_plan_de{total}.json"
+        keys = {(region['value'], comuna['value']) for region, comunas in regions for comuna in comunas}
+        plan = load_manifest(plan_file) if os.path.exists(plan_file) else None
+        if plan is None or {tuple(key) for group in plan['groups'] for key in group} != keys:
+            counts = {
+                (region['value'], comuna['value']): self.catalog.school_count(region, comuna)
+                for region, comunas in regions for comuna in comunas
+            }
+            groups, digest = shard_plan(regions, counts, total)
+            plan = {'shards': total, 'plan_digest': digest, 'groups': groups,
+                    'expected': [[counts[key] for key in group] for group in groups]}
+            write_json_atomic(plan_file, plan)
+            logger.info(f"Reparto de {len(keys)} comunas en {total} shards guardado en {plan_file}")
+        self._shard_plan = plan
+        assigned = {tuple(key) for key in plan['groups'][index - 1]}
+        selected = [
+            (region, [comuna for comuna in comunas if (region['value'], comuna['value']) in assigned])
+            for region, comunas in regions
+        ]
+        selected = [(region, comunas) for region, comunas in selected if comunas]
+        expected = sum(count or 0 for count in plan['expected'][index - 1])
+        logger.info(f"Shard {index}/{total}: {len(assigned)} comunas de {len(keys)} (~{expected} colegios esperados)")
+        return selected
+        
+    def write_shard_manifest(self) -> Optional[Dict]:
+        """Escribe el manifiesto del shard con el estado de cada comuna asignada"""
+        if not self.shard or self._shard_plan is None or self.ledger is None:
+            return None
+        index, total = self.shard
+        states = self.ledger.comuna_states()
+        names = {
+            (region['value'], comuna['value']): (region['text'], comuna['text'])
+            for region, comunas in self.catalog.regions() for comuna in comunas
+        }
+        group = self._shard_plan['groups'][index - 1]
+        assigned = []
+        for key, expected in zip(group, self._shard_plan['expected'][index - 1]):
+            key = tuple(key)
+            region_text, comuna_text = names.get(key, (None, None))
+            assigned.append({
+                'region': key[0], 'region_text': region_text,
+                'comuna': key[1], 'comuna_text': comuna_text,
+                'expected_schools': expected,
+                'state': states.get(key, PENDING),
+            })
+        path = f"shard_manifest{shard_suffix(self.shard)}.json"
+        manifest = write_manifest(path, self.shard, self._shard_plan['plan_digest'],
+                                  sum(len(g) for g in self._shard_plan['groups']), assigned,
+                                  self.output_file, len(self.data), self.fields)
+        done = sum(1 for entry in assigned if entry['state'] == DONE)
+        logger.info(f"Manifiesto {path}: {done}/{len(assigned)} comunas completadas, "
+                    f"{manifest['records']} registros{'' if manifest['complete'] else ' (incompleto)'}")
+        return manifest
+        
+    def open_output(self):
+        """
+        Abre la salida JSONL y el registro de trabajos. Al resumir se continúa
+        el JSONL existente (sus registros vuelven a self.data) y el registro
+        conserva el estado de cada RBD; en una ejecución nueva ambos se vacían.
+        """
+        if self.sink is not None:
+            return
+        resume = bool(self.resume_from)
+        if resume:
+            progress = self.load_progress()
+            if progress:
+                logger.info(f"Resumiendo ejecución anterior (última posición: {progress['current_region']} / {progress['current_comuna']})")
+            self.data = list(read_records(self.output_file))
+            self._output_rbds = {record_rbd(record) for record in self.data}
+            logger.info(f"{len(self.data)} registros ya extraídos en {self.output_file}")
+        self.sink = JsonlRecordSink(self.output_file, append=resume)
+        self.metrics.start_periodic(self.metrics_interval)
+        self.ledger = JobLedger(self.ledger_file, reset=not resume)
+        logger.info(f"Registros se agregan a {self.output_file}")
             
-            # Obtener todas las regiones
-            regions = self.get_regions()
+    def close_output(self):
+        """Cierra la salida JSONL y el registro de trabajos y escribe las métricas finales"""
+        self.metrics.stop_periodic()
+        self.metrics.log_summary()
+        self.tracer.close()
+        if self.sink:
+            self.sink.close()
+            self.sink = None
+        self.write_shard_manifest()
+        if self.ledger:
+            self.ledger.log_counts()
+            self.ledger.close()
+            self.ledger = None
             
-            for region in regions:
+    def _skip_rbds(self, region: Dict[str, str], comuna: Dict[str, str]) -> Set[str]:
+        """RBD de la comuna que ya están en la salida"""
+        return self.ledger.done_rbds(region, comuna) | self._output_rbds
+        
+    def _register_schools(self, region: Dict[str, str], comuna: Dict[str, str], school_urls: List[str],
+                          skip_rbds: Set[str]):
+        """Registra los colegios de una comuna y marca en curso los que se van a visitar"""
+        rbd_urls = [(rbd_from_url(url), url) for url in school_urls]
+        self.catalog.set_school_count(region, comuna, len(school_urls))
+        self._searched_comunas.add((region['text'], comuna['text']))
+        self._seen_rbds.update(rbd for rbd, _ in rbd_urls)
+        self.ledger.add_schools(region, comuna, rbd_urls)
+        self.ledger.mark_schools([rbd for rbd, _ in rbd_urls if rbd in skip_rbds], DONE)
+        self.ledger.mark_schools([rbd for rbd, _ in rbd_urls if rbd not in skip_rbds], IN_FLIGHT)
+        
+    def _store_result(self, school_url: str, school_data: Optional[Dict[str, str]]) -> bool:
+        """Guarda el resultado de una ficha en la salida y en el registro"""
+        if school_data:
+            self._add_record(school_data)
+            return True
+        self.ledger.mark_schools([rbd_from_url(school_url)], FAILED, "extracción fallida")
+        return False
+            
+    def _add_record(self, school_data: Dict[str, str]):
+        """Agrega un registro a la salida y guarda el progreso cada 10 colegios"""
+        change = school_data.pop('_change', None)
+        if change:
+            self.change_counts[change] += 1
+        self.data.append(school_data)
+        with self.metrics.time("escritura_registro"):
+            self.sink.write(school_data)
+            self.ledger.mark_schools([rbd_from_url(school_data['url'])], DONE)
+        self.metrics.inc('schools')
+            
+        # Guardar progreso cada 10 colegios
+        if len(self.data) % 10 == 0:
+            self.save_progress()
+            
+    def scrape_all(self):
+        """
+        Ejecuta el scraping completo de todas las regiones y comunas. Al
+        resumir se saltan las comunas completadas y los RBD ya extraídos.
+        """
+        logger.info("Iniciando scraping completo...")
+        
+        try:
+            self.open_output()
+            self.start_browser()
+            
+            # Regiones y comunas desde el catálogo (se leen del sitio solo si venció)
+            for region, comunas in self.work_catalog():
                 self.current_region = region['text']
                 
-                # Saltar hasta llegar a la región donde se dejó
-                if should_skip:
-                    if region['text'] != skip_until_region:
-                        logger.info(f"Saltando región {region['text']}")
-                        continue
-                    else:
-                        logger.info(f"Resumiendo desde región {region['text']}")
-                
-                logger.info(f"\n{'='*60}")
-                logger.info(f"Procesando región: {region['text']}")
-                logger.info(f"{'='*60}")
-                
-                # Navegar de nuevo a la página principal
-                self.driver.get(self.base_url)
-                time.sleep(2)
-                
-                # Seleccionar región
-                if not self.select_region(region['value']):
+                if self.ledger.region_done(region):
+                    logger.info(f"Saltando región {region['text']} (completada)")
                     continue
                 
-                # Obtener comunas de esta región
-                comunas = self.get_comunas()
-                
-                for comuna in comunas:
-                    self.current_comuna = comuna['text']
-                    
-                    # Saltar hasta llegar a la comuna donde se dejó
-                    if should_skip and skip_until_comuna:
-                        if comuna['text'] != skip_until_comuna:
-                            logger.info(f"Saltando comuna {comuna['text']}")
-                            continue
-                        else:
-                            logger.info(f"Resumiendo desde comuna {comuna['text']}")
-                            should_skip = False  # Ya llegamos al punto de reanudación
-                    
-                    logger.info(f"\nProcesando comuna: {comuna['text']}")
-                    
-                    # Recargar página y seleccionar región nuevamente
-                    self.driver.get(self.base_url)
-                    time.sleep(2)
-                    self.select_region(region['value'])
-                    time.sleep(2)
-                    
-                    # Seleccionar comuna y buscar
-                    if not self.select_comuna(comuna['value']):
-                        continue
-                    
-                    # Obtener todos los colegios de esta comuna
-                    school_urls = self.get_schools_in_page()
-                    
-                    # Procesar cada colegio
-                    for i, school_url in enumerate(school_urls, 1):
-                        logger.info(f"Procesando colegio {i}/{len(school_urls)}")
-                        
-                        school_data = self.extract_school_data(school_url)
-                        if school_data:
-                            self.data.append(school_data)
-                            
-                        # Guardar progreso cada 10 colegios
-                        if len(self.data) % 10 == 0:
-                            self.save_progress()
-                            self.save_to_excel(intermediate=True)
-                    
-                    logger.info(f"Comuna {comuna['text']} completada. Total registros: {len(self.data)}")
-                
-                logger.info(f"Región {region['text']} completada")
+                with self.tracer.span("región", region=region['text']):
+                    self._scrape_region(region, comunas)
             
             logger.info(f"\n{'='*60}")
             logger.info(f"Scraping completado. Total de colegios: {len(self.data)}")
@@ -449,34 +1419,249 @@ class MinEducScraper:
         except Exception as e:
             logger.error(f"Error durante el scraping: {e}")
             self.save_progress()
-            self.save_to_excel(intermediate=True)
+            self.sink.flush()
+            raise
+        finally:
+            self.readiness.log_summary()
+            if self.lean_stats:
+                self.lean_stats.log_summary()
+            self.log_recovery_stats()
+            if self.controller:
+                self.controller.log_summary()
+            if self.cache:
+                self.cache.log_stats()
+            self.close_browser()
+            
+    def _scrape_region(self, region: Dict[str, str], comunas: List[Dict[str, str]]):
+        """Procesa las comunas pendientes de una región (recorrido secuencial)"""
+        logger.info(f"\n{'='*60}")
+        logger.info(f"Procesando región: {region['text']}")
+        logger.info(f"{'='*60}")
+        
+        self.ledger.add_comunas(region, comunas)
+        
+        for comuna in comunas:
+            self.current_comuna = comuna['text']
+            
+            if self.ledger.comuna_state(region, comuna) == DONE:
+                logger.info(f"Saltando comuna {comuna['text']} (completada)")
+                continue
+            
+            logger.info(f"\nProcesando comuna: {comuna['text']}")
+            self.ledger.mark_comuna(region, comuna, IN_FLIGHT)
+            
+            skip_rbds = self._skip_rbds(region, comuna)
+            # Cada ficha se guarda apenas termina: un corte a mitad de la
+            # comuna conserva lo extraído y al resumir solo faltan esos RBD
+            stored = []
+            results = self.scrape_comuna(
+                region, comuna, skip_rbds=skip_rbds,
+                on_search=lambda urls: self._register_schools(region, comuna, urls, skip_rbds),
+                on_result=lambda url, school_data: stored.append(self._store_result(url, school_data))
+            )
+            if results is None:
+                self.ledger.mark_comuna(region, comuna, FAILED)
+                continue
+            
+            self.ledger.mark_comuna(region, comuna, DONE if all(stored) else FAILED)
+            self.metrics.inc('comunas')
+            
+            logger.info(f"Comuna {comuna['text']} completada. Total registros: {len(self.data)}")
+        
+        logger.info(f"Región {region['text']} completada")
+        
+    def _worker_options(self) -> Dict:
+        """Parámetros para construir el scraper de cada proceso del pool"""
+        return {
+            'headless': self.headless,
+            'engine': self.engine,
+            'http_pool_size': self.http_pool_size,
+            'concurrency': self.concurrency,
+            'cache_dir': self.cache_dir,
+            'cache_ttl': self.cache_ttl,
+            'cache_max_bytes': self.cache_max_bytes,
+            'incremental_from': self.incremental_from,
+            'direct_search': self.direct_search,
+            'lean_browser': self.lean_browser,
+            'blocked_urls': self.blocked_urls,
+            'max_retries': self.max_retries,
+            'retry_budget': self.retry_budget,
+            'page_load_timeout': self.page_load_timeout,
+            'adaptive': self.adaptive,
+            'metrics_file': self.metrics_file,
+            'metrics_summary_file': self.metrics_summary_file,
+            'metrics_interval': self.metrics_interval,
+            'trace_file': self.trace_file,
+            'base_url': self.base_url,
+            'ficha_url_template': self.ficha_url_template,
+            'fields': self.fields,
+        }
+        
+    def list_jobs(self) -> List[tuple]:
+        """
+        Registra las comunas del catálogo en el registro de trabajos y
+        retorna los (región, comuna) que no están completados, primero las
+        comunas con más colegios según el último conteo (las sin conteo al
+        inicio) para que ningún proceso quede al final con una comuna grande
+        """
+        jobs = []
+        for region, comunas in self.work_catalog():
+            if self.ledger.region_done(region):
+                logger.info(f"Saltando región {region['text']} (completada)")
+                continue
+            self.ledger.add_comunas(region, comunas)
+            for comuna in comunas:
+                if self.ledger.comuna_state(region, comuna) != DONE:
+                    jobs.append((region, comuna))
+        
+        def size(job):
+            count = self.catalog.school_count(*job)
+            return float('inf') if count is None else count
+        jobs.sort(key=size, reverse=True)
+        return jobs
+        
+    def scrape_all_pool(self):
+        """
+        Ejecuta el scraping completo repartiendo las comunas entre
+        self.workers procesos, cada uno con su propio Chrome. Este proceso
+        es el único que escribe los registros, el progreso y el registro de trabajos.
+        """
+        logger.info(f"Iniciando scraping completo con {self.workers} procesos...")
+        self.open_output()
+        jobs = self.list_jobs()
+        logger.info(f"Se repartirán {len(jobs)} comunas entre {self.workers} procesos")
+        
+        ctx = multiprocessing.get_context("spawn")
+        job_queue = ctx.Queue()
+        result_queue = ctx.Queue()
+        # Los procesos envían sus logs a este proceso, que es el único que los escribe
+        log_queue = ctx.Queue()
+        log_listener = QueueListener(log_queue, ForwardHandler())
+        log_listener.start()
+        log_levels = current_levels()
+        for region, comuna in jobs:
+            job_queue.put((region, comuna, self._skip_rbds(region, comuna)))
+        for _ in range(self.workers):
+            job_queue.put(None)
+        
+        processes = [
+            ctx.Process(target=_pool_worker, args=(worker_id, self._worker_options(), job_queue, result_queue,
+                                                   log_queue, log_levels),
+                        name=f"scraper-{worker_id}")
+            for worker_id in range(1, self.workers + 1)
+        ]
+        for process in processes:
+            process.start()
+        
+        try:
+            finished = 0
+            comuna_ok = {}
+            while finished < len(processes):
+                try:
+                    kind, payload = result_queue.get(timeout=5)
+                except queue.Empty:
+                    if not any(process.is_alive() for process in processes):
+                        logger.error("Todos los procesos terminaron sin reportar fin")
+                        break
+                    continue
+                
+                if kind == 'schools':
+                    region, comuna, school_urls = payload
+                    self.ledger.mark_comuna(region, comuna, IN_FLIGHT)
+                    self._register_schools(region, comuna, school_urls, self._skip_rbds(region, comuna))
+                    comuna_ok[(region['value'], comuna['value'])] = True
+                elif kind == 'result':
+                    region, comuna, school_url, school_data = payload
+                    self.current_region = region['text']
+                    self.current_comuna = comuna['text']
+                    if not self._store_result(school_url, school_data):
+                        comuna_ok[(region['value'], comuna['value'])] = False
+                elif kind == 'comuna_done':
+                    region, comuna = payload
+                    ok = comuna_ok.pop((region['value'], comuna['value']), True)
+                    self.ledger.mark_comuna(region, comuna, DONE if ok else FAILED)
+                    self.metrics.inc('comunas')
+                    logger.info(f"Comuna {region['text']} / {comuna['text']} completada. Total registros: {len(self.data)}")
+                elif kind == 'comuna_failed':
+                    region, comuna = payload
+                    self.ledger.mark_comuna(region, comuna, FAILED)
+                    logger.error(f"Comuna {region['text']} / {comuna['text']} no pudo procesarse")
+                elif kind == 'worker_done':
+                    finished += 1
+            
+            logger.info(f"\n{'='*60}")
+            logger.info(f"Scraping completado. Total de colegios: {len(self.data)}")
+            logger.info(f"{'='*60}")
+            
+        except BaseException:
+            for process in processes:
+                process.terminate()
+            self.save_progress()
+            self.sink.flush()
             raise
         finally:
-            if self.driver:
-                self.driver.quit()
+            for process in processes:
+                process.join(timeout=30)
+            log_listener.stop()
                 
+    def log_recovery_stats(self):
+        """Registra en el log los reinicios de Chrome y los reintentos de fichas"""
+        logger.info(f"Reinicios de Chrome: {self.driver_restarts}")
+        self.retry_queue.log_stats()
+        
+    def incremental_report(self) -> Dict[str, int]:
+        """
+        Colegios reutilizados, actualizados, agregados y eliminados respecto a
+        la ejecución anterior. Se cuentan como eliminados los RBD anteriores
+        de las comunas buscadas en esta ejecución que ya no aparecen en ellas.
+        """
+        removed = [
+            rbd for rbd, record in self.previous_records.items()
+            if (record.get('region'), record.get('comuna')) in self._searched_comunas and rbd not in self._seen_rbds
+        ]
+        return {
+            'reused': self.change_counts[CHANGE_REUSED],
+            'updated': self.change_counts[CHANGE_UPDATED],
+            'added': self.change_counts[CHANGE_ADDED],
+            'removed': len(removed),
+        }
+        
+    def log_incremental_report(self):
+        """Registra en el log el resumen de la ejecución incremental"""
+        report = self.incremental_report()
+        logger.info(
+            f"Actualización incremental: {report['reused']} reutilizados, {report['updated']} actualizados, "
+            f"{report['added']} agregados, {report['removed']} eliminados"
+        )
+        
     def save_to_excel(self, intermediate: bool = False):
-        """Guarda los datos recolectados en un archivo Excel"""
-        if not self.data:
+        """Genera el archivo Excel a partir de la salida JSONL"""
+        if self.sink:
+            self.sink.flush()
+        if not os.path.exists(self.output_file) or os.path.getsize(self.output_file) == 0:
             logger.warning("No hay datos para guardar")
             return
-            
-        df = pd.DataFrame(self.data)
-        
-        # Reordenar columnas
-        columns_order = ['nombre', 'direccion', 'telefono', 'email', 'pagina_web', 'director', 'sostenedor', 'matricula_total', 'region', 'comuna', 'url']
-        df = df[columns_order]
         
         filename = f"colegios_chile{'_intermediate' if intermediate else ''}.xlsx"
-        df.to_excel(filename, index=False, engine='openpyxl')
+        if self.shard:
+            filename = with_suffix(filename, shard_suffix(self.shard))
+        with self.metrics.time("exportacion_excel"), self.tracer.span("exportación excel"):
+            total = export_excel(self.output_file, filename, self.columns)
         
-        logger.info(f"Datos guardados en {filename} ({len(self.data)} registros)")
+        logger.info(f"Datos guardados en {filename} ({total} registros)")
         
     def run(self):
         """Ejecuta el scraper completo"""
         try:
-            self.scrape_all()
-            self.save_to_excel()
+            with self.tracer.span("ejecución", engine=self.engine, workers=self.workers,
+                                  concurrency=self.concurrency):
+                if self.workers > 1:
+                    self.scrape_all_pool()
+                else:
+                    self.scrape_all()
+                if self.previous_records is not None:
+                    self.log_incremental_report()
+                self.save_to_excel()
         except KeyboardInterrupt:
             logger.info("\nScraping interrumpido por el usuario")
             self.save_progress()
@@ -484,12 +1669,103 @@ class MinEducScraper:
         except Exception as e:
             logger.error(f"Error fatal: {e}")
             self.save_to_excel(intermediate=True)
+        finally:
+            self.close_output()
+
+
+def _pool_worker(worker_id: int, options: Dict, job_queue, result_queue, log_queue=None,
+                 log_levels: Optional[Dict[str, str]] = None):
+    """
+    Proceso del pool: abre su propio Chrome, toma trabajos (región, comuna,
+    RBD a saltar) de job_queue hasta recibir None y envía a result_queue las
+    URLs de cada comuna y el resultado de cada ficha. Sus logs van por
+    log_queue al proceso principal.
+    """
+    if log_queue is not None:
+        levels = dict(log_levels or {})
+        configure_worker_logging(log_queue, levels.pop('root', 'INFO'), levels)
+    # Cada proceso escribe sus propias métricas de etapa junto a las del principal
+    for key in ('metrics_file', 'metrics_summary_file', 'trace_file'):
+        if options.get(key):
+            root, extension = os.path.splitext(options[key])
+            options[key] = f"{root}_proceso{worker_id}{extension}"
+    scraper = MinEducScraper(**options)
+    scraper.metrics.start_periodic(scraper.metrics_interval)
+    try:
+        scraper.start_browser()
+        while True:
+            job = job_queue.get()
+            if job is None:
+                break
+            region, comuna, skip_rbds = job
+            label = f"{region['text']} / {comuna['text']}"
+            logger.info(f"[proceso {worker_id}] Procesando comuna: {label}")
+            try:
+                results = scraper.scrape_comuna(
+                    region, comuna, skip_rbds=skip_rbds,
+                    on_search=lambda urls: result_queue.put(('schools', (region, comuna, urls))),
+                    # Cada ficha se envía apenas terminan ella y las anteriores, no al cerrar la comuna
+                    on_result=lambda url, school_data: result_queue.put(('result', (region, comuna, url, school_data)))
+                )
+            except Exception as e:
+                logger.error(f"[proceso {worker_id}] Error procesando comuna {label}: {e}")
+                results = None
+            if results is None:
+                result_queue.put(('comuna_failed', (region, comuna)))
+                continue
+            result_queue.put(('comuna_done', (region, comuna)))
+    except Exception as e:
+        logger.error(f"[proceso {worker_id}] Error fatal: {e}")
+    finally:
+        scraper.readiness.log_summary()
+        if scraper.lean_stats:
+            scraper.lean_stats.log_summary()
+        scraper.log_recovery_stats()
+        if scraper.controller:
+            scraper.controller.log_summary()
+        if scraper.cache:
+            scraper.cache.log_stats()
+        scraper.close_browser()
+        scraper.metrics.stop_periodic()
+        scraper.tracer.close()
+        result_queue.put(('worker_done', worker_id))
 
 
 if __name__ == "__main__":
     # Configuración
     HEADLESS = True  # Cambiar a True para ejecutar sin ventana visible
     RESUME_FROM = None  # O especificar archivo JSON para resumir
+    ENGINE = ENGINE_SELENIUM  # ENGINE_HTTP descarga las fichas sin navegador
+    CONCURRENCY = 1  # Fichas extraídas en paralelo por comuna
+    WORKERS = 1  # Procesos con Chrome propio que se reparten las comunas
+    CACHE_DIR = None  # O "page_cache" para guardar el HTML descargado y reutilizarlo
+    INCREMENTAL_FROM = None  # O salida anterior (ej. "colegios_chile_anterior.jsonl") para refrescar solo cambios
+    DIRECT_SEARCH = True  # Buscar cada comuna con un solo request en vez de recargar y usar los dropdowns
+    REFRESH_CATALOG = False  # True para volver a leer regiones y comunas del sitio aunque el catálogo no haya vencido
+    LEAN_BROWSER = True  # Bloquear imágenes, fuentes, multimedia y terceros en Chrome
+    ADAPTIVE = False  # Ajustar solo los requests en curso (hasta CONCURRENCY) según latencia y errores
+    TRACE_FILE = None  # O "scraper_trace.json" para guardar la línea de tiempo (chrome://tracing, Perfetto)
+    # Nivel por etapa (nombre del logger). "colegios" es el JSON por colegio de scraper_colegios.jsonl;
+    # ej. {"colegios": "WARNING"} lo desactiva, {"readiness": "DEBUG"} detalla las esperas
+    LOG_LEVELS = {}
+    SHARD = None  # O "2/4" para procesar solo la parte 2 de 4 del catálogo (luego merge_shards.py)
+    FIELDS = None  # O ej. ["nombre", "matricula_total"] para extraer solo esos campos (None = todos)
+    
+    # Uso: python scraper_mineduc.py [--shard i/N] [--fields nombre,matricula_total]
+    parser = argparse.ArgumentParser(description="Scraper de colegios MINEDUC")
+    parser.add_argument("--shard", default=SHARD, help="Parte i/N del catálogo a procesar en esta máquina")
+    parser.add_argument("--fields", default=FIELDS,
+                        help="Campos a extraer separados por coma (por defecto todos): " + ",".join(select_fields()))
+    args = parser.parse_args()
+    shard = parse_shard(args.shard) if args.shard else None
+    fields = select_fields(args.fields) if args.fields else None
+    suffix = shard_suffix(shard) if shard else ""
     
-    scraper = MinEducScraper(headless=HEADLESS, resume_from=RESUME_FROM)
-    scraper.run()
+    with LogPipeline(f'scraper_mineduc{suffix}.log', school_log_file=f'scraper_colegios{suffix}.jsonl',
+                     levels=LOG_LEVELS):
+        scraper = MinEducScraper(headless=HEADLESS, resume_from=RESUME_FROM, engine=ENGINE,
+                                 concurrency=CONCURRENCY, workers=WORKERS, cache_dir=CACHE_DIR,
+                                 incremental_from=INCREMENTAL_FROM, direct_search=DIRECT_SEARCH,
+                                 refresh_catalog=REFRESH_CATALOG, lean_browser=LEAN_BROWSER, adaptive=ADAPTIVE,
+                                 trace_file=TRACE_FILE, shard=shard, fields=fields)
+        scraper.run()
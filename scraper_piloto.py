@@ -1,424 +1,221 @@
 #!/usr/bin/env python3
 """
 Script de PRUEBA PILOTO para el scraper MINEDUC
-Solo procesa 1 región y 1 comuna para verificar que todo funcione correctamente
+Verifica que todo funcione sobre una muestra de comunas (algunas por región)
+y, con lo medido en ellas, estima cuánto tardará la ejecución completa y qué
+concurrencia conviene usar antes de lanzarla
 """
 
+import json
 import time
 import logging
-from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import Select
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from metrics import Metrics
+from log_pipeline import LogPipeline
+from runtime_estimator import stratified_sample, estimate_school_total, project_runtime, log_estimate
+from scraper_mineduc import BASE_URL, ENGINE_SELENIUM, FICHA_URL_TEMPLATE, MinEducScraper
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scraper_piloto.log'),
-        logging.StreamHandler()
-    ]
-)
+# El logging se configura con LogPipeline al ejecutar el script (ver el final)
 logger = logging.getLogger(__name__)
 
 
 class MinEducScraperPiloto:
-    """Scraper de prueba - solo procesa 1 región y 1 comuna"""
-    
-    def __init__(self, headless: bool = False):
-        self.base_url = "https://mi.mineduc.cl/mime-web/mvc/mime/busqueda_avanzada"
-        self.headless = headless
-        self.driver = None
-        self.wait = None
+    """
+    Prueba piloto: busca una muestra estratificada de comunas, extrae fichas
+    de esas comunas con cada nivel de concurrencia y proyecta la duración de
+    la ejecución completa con el tamaño de cada comuna del catálogo
+    """
+
+    def __init__(self, headless: bool = False, engine: str = ENGINE_SELENIUM,
+                 levels: Tuple[int, ...] = (1, 2, 4, 8), comunas_per_region: int = 2,
+                 fichas_per_level: int = 8, seed: int = 0, base_url: str = BASE_URL,
+                 ficha_url_template: str = FICHA_URL_TEMPLATE, estimate_file: str = "estimacion_piloto.json",
+                 fields: Optional[List[str]] = None):
+        """
+        Args:
+            headless: Si True, ejecuta Chrome en modo headless (sin ventana visible)
+            engine: Motor de las fichas, el mismo que usará la ejecución completa
+            levels: Niveles de concurrencia a medir
+            comunas_per_region: Comunas de la muestra por región
+            fichas_per_level: Fichas mínimas por nivel (al menos dos por hilo)
+            seed: Semilla del muestreo cuando no hay conteos en el catálogo
+            base_url: URL de la búsqueda avanzada
+            ficha_url_template: URL de las fichas, con {rbd} en lugar del RBD
+            estimate_file: JSON donde se guarda la estimación
+            fields: Campos a extraer, los mismos que pedirá la ejecución completa
+        """
+        self.levels = sorted(set(levels))
+        self.comunas_per_region = comunas_per_region
+        self.fichas_per_level = fichas_per_level
+        self.seed = seed
+        self.estimate_file = estimate_file
+        self.scraper = MinEducScraper(headless=headless, engine=engine, concurrency=max(self.levels),
+                                      base_url=base_url, ficha_url_template=ficha_url_template,
+                                      metrics_file=None, metrics_summary_file=None, fields=fields,
+                                      # Las cargas de referencia caerían dentro del primer nivel medido
+                                      lean_calibrate=False)
         self.data = []
-        
-    def setup_driver(self):
-        """Configura el driver de Chrome"""
-        chrome_options = Options()
-        if self.headless:
-            chrome_options.add_argument("--headless")
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--window-size=1920,1080")
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 10)
-        logger.info("✓ Driver de Chrome configurado")
-        
-    def get_regions(self) -> List[Dict[str, str]]:
-        """Obtiene la lista de regiones"""
-        logger.info("Obteniendo regiones...")
-        
-        region_dropdown = self.wait.until(
-            EC.element_to_be_clickable((By.ID, "region"))
-        )
-        
-        options = self.driver.find_elements(By.CSS_SELECTOR, "#region option")
-        regions = []
-        
-        for option in options:
-            value = option.get_attribute("value")
-            text = option.text.strip()
-            if value and value.lower() != "todas" and text.lower() != "todas":
-                regions.append({'value': value, 'text': text})
-                
-        logger.info(f"✓ Se encontraron {len(regions)} regiones")
-        return regions
-        
-    def select_region(self, region_value: str, region_text: str) -> bool:
-        """Selecciona una región"""
-        try:
-            logger.info(f"Seleccionando región: {region_text}")
-            
-            region_dropdown = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "region"))
-            )
-            
-            # Seleccionar la región y disparar el evento change
-            region_dropdown.click()
-            time.sleep(0.5)
-            
-            option = self.driver.find_element(
-                By.CSS_SELECTOR, 
-                f"#region option[value='{region_value}']"
-            )
-            option.click()
-            time.sleep(2)  # Esperar a que se carguen las comunas
-            logger.info(f"✓ Región seleccionada: {region_text}")
-            return True
-        except Exception as e:
-            logger.error(f"✗ Error seleccionando región: {e}")
-            return False
-            
-    def get_comunas(self) -> List[Dict[str, str]]:
-        """Obtiene la lista de comunas"""
-        try:
-            logger.info("Obteniendo comunas...")
-            
-            comuna_dropdown = self.wait.until(
-                EC.presence_of_element_located((By.ID, "comuna"))
-            )
-            time.sleep(1)
-            
-            options = self.driver.find_elements(By.CSS_SELECTOR, "#comuna option")
-            comunas = []
-            
-            for option in options:
-                value = option.get_attribute("value")
-                text = option.text.strip()
-                # Filtrar "Todas" (value="0" o texto que contenga "todas")
-                if value and value != "0" and "todas" not in text.lower():
-                    comunas.append({
-                        'value': value,
-                        'text': text
-                    })
-                    
-            logger.info(f"✓ Se encontraron {len(comunas)} comunas")
-            return comunas
-        except Exception as e:
-            logger.error(f"✗ Error obteniendo comunas: {e}")
-            return []
-            
-    def select_comuna(self, comuna_value: str, comuna_text: str) -> bool:
-        """Selecciona una comuna y busca"""
-        try:
-            logger.info(f"Seleccionando comuna: {comuna_text}")
-            
-            comuna_dropdown = self.wait.until(
-                EC.element_to_be_clickable((By.ID, "comuna"))
-            )
-            
-            option = self.driver.find_element(
-                By.CSS_SELECTOR, 
-                f"#comuna option[value='{comuna_value}']"
-            )
-            option.click()
-            time.sleep(1)
-            
-            # Hacer clic en el botón/enlace de búsqueda
-            search_button = self.wait.until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "a.boton_caja[onclick*='EnviaBusqueda']")
-            ))
-            search_button.click()
-            time.sleep(3)
-            logger.info(f"✓ Comuna seleccionada y búsqueda ejecutada: {comuna_text}")
-            return True
-        except Exception as e:
-            logger.error(f"✗ Error seleccionando comuna: {e}")
-            return False
-            
-    def get_schools_in_page(self) -> List[str]:
-        """Obtiene los links de colegios en la tabla"""
-        try:
-            logger.info("Buscando colegios en la tabla...")
-            
-            # Esperar a que la tabla de resultados esté presente
-            self.wait.until(
-                EC.presence_of_element_located((By.ID, "busqueda_avanzada"))
-            )
-            time.sleep(2)  # Esperar a que se completen todos los resultados
-            
-            # Los links están en la tabla con ID="busqueda_avanzada"
-            # Usan onclick para enviar formulario, no href con 'ficha'
-            school_links = self.driver.find_elements(
-                By.CSS_SELECTOR, 
-                "table#busqueda_avanzada tbody tr a"
-            )
-            
-            # Extraer el RBD del onclick para construir la URL
-            urls = []
-            for link in school_links:
-                onclick = link.get_attribute("onclick")
-                if onclick and "document.fichaescuela" in onclick:
-                    # Extraer RBD del onclick: document.fichaescuela.rbd.value='12736'
-                    import re
-                    match = re.search(r"value='(\d+)'", onclick)
-                    if match:
-                        rbd = match.group(1)
-                        # Construir URL de la ficha
-                        url = f"https://mi.mineduc.cl/mime-web/mvc/mime/ficha?rbd={rbd}"
-                        urls.append(url)
-                    
-            logger.info(f"✓ Se encontraron {len(urls)} colegios")
-            return urls
-        except Exception as e:
-            logger.error(f"✗ Error obteniendo colegios: {e}")
-            return []
-            
-    def extract_school_data(self, school_url: str, region: str, comuna: str) -> Optional[Dict[str, str]]:
-        """Extrae los datos de un colegio"""
-        try:
-            logger.info(f"Extrayendo datos de: {school_url}")
-            self.driver.get(school_url)
-            time.sleep(2)
-            
-            school_data = {
-                'nombre': '',
-                'direccion': '',
-                'telefono': '',
-                'email': '',
-                'pagina_web': '',
-                'director': '',
-                'sostenedor': '',
-                'matricula_total': '',
-                'region': region,
-                'comuna': comuna,
-                'url': school_url
-            }
-            
-            # Extraer nombre - está en div.titulo_color dentro de un td
-            try:
-                nombre_element = self.driver.find_element(
-                    By.XPATH, 
-                    "//div[@class='titulo_color']//td[1]"
-                )
-                school_data['nombre'] = nombre_element.text.strip()
-                logger.info(f"  ✓ Nombre: {school_data['nombre']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer el nombre")
-            
-            # Extraer dirección
-            try:
-                direccion_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Dirección:')]/following-sibling::td"
-                )
-                school_data['direccion'] = direccion_element.text.strip()
-                logger.info(f"  ✓ Dirección: {school_data['direccion']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer la dirección")
-            
-            # Extraer teléfono
-            try:
-                telefono_element = self.driver.find_element(
-                    By.XPATH, 
-                    "//td[contains(text(), 'Teléfono')]/following-sibling::td | //strong[contains(text(), 'Teléfono')]/parent::*/following-sibling::*"
-                )
-                school_data['telefono'] = telefono_element.text.strip()
-                logger.info(f"  ✓ Teléfono: {school_data['telefono']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer el teléfono")
-            
-            # Extraer email
-            try:
-                email_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'E-mail contacto:')]/following-sibling::td"
-                )
-                school_data['email'] = email_element.text.strip()
-                logger.info(f"  ✓ Email: {school_data['email']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer el email")
-            
-            # Extraer página web
-            try:
-                web_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Página web:')]/following-sibling::td"
-                )
-                school_data['pagina_web'] = web_element.text.strip()
-                logger.info(f"  ✓ Página web: {school_data['pagina_web']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer la página web")
-            
-            # Extraer director(a)
-            try:
-                director_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Director(a):')]/following-sibling::td"
-                )
-                school_data['director'] = director_element.text.strip()
-                logger.info(f"  ✓ Director(a): {school_data['director']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer el director")
-            
-            # Extraer sostenedor
-            try:
-                sostenedor_element = self.driver.find_element(
-                    By.XPATH,
-                    "//td[contains(text(), 'Sostenedor:')]/following-sibling::td"
-                )
-                school_data['sostenedor'] = sostenedor_element.text.strip()
-                logger.info(f"  ✓ Sostenedor: {school_data['sostenedor']}")
-            except:
-                logger.warning(f"  ⚠ No se pudo extraer el sostenedor")
-            
-            # Expandir "Información institucional" haciendo click en el enlace
-            try:
-                info_link = self.driver.find_element(
-                    By.XPATH,
-                    "//a[contains(text(), 'Información institucional')]"
-                )
-                info_link.click()
-                time.sleep(1)
-                logger.info("  ✓ Sección 'Información institucional' expandida")
-            except:
-                pass  # Puede que ya esté expandida
-            
-            # Extraer matrícula total - está en un div.form_detalle después del div que contiene el texto
-            try:
-                matricula_element = self.driver.find_element(
-                    By.XPATH,
-                    "//div[contains(text(), 'Matrícula total de alumnos:')]/following-sibling::div[@class='form_detalle']"
-                )
-                school_data['matricula_total'] = matricula_element.text.strip()
-                logger.info(f"  ✓ Matrícula Total: {school_data['matricula_total']}")
-            except:
-                # Intentar con td (por si la estructura es diferente)
-                try:
-                    matricula_element = self.driver.find_element(
-                        By.XPATH,
-                        "//td[contains(text(), 'Matrícula total de alumnos:')]/following-sibling::td"
-                    )
-                    school_data['matricula_total'] = matricula_element.text.strip()
-                    logger.info(f"  ✓ Matrícula Total: {school_data['matricula_total']}")
-                except:
-                    logger.warning(f"  ⚠ No se pudo extraer la matrícula total")
-            
-            return school_data
-            
-        except Exception as e:
-            logger.error(f"✗ Error extrayendo datos: {e}")
-            return None
-            
-    def run_pilot_test(self):
-        """Ejecuta la prueba piloto - solo 1 región y 1 comuna"""
+        self.estimate = None
+
+    def _search_sample(self, sample) -> Tuple[List[Tuple[Dict, Dict, str]], List[float]]:
+        """Busca cada comuna de la muestra y retorna sus fichas y la duración de cada búsqueda"""
+        scraper = self.scraper
+        fichas = []
+        durations = []
+        for region, comuna in sample:
+            scraper._context_region = region
+            start = time.perf_counter()
+            school_urls = scraper.search_comuna(region, comuna)
+            durations.append(time.perf_counter() - start)
+            if school_urls is None:
+                logger.warning(f"✗ No se pudo buscar {region['text']} / {comuna['text']}")
+                continue
+            scraper.catalog.set_school_count(region, comuna, len(school_urls))
+            logger.info(f"✓ {region['text']} / {comuna['text']}: {len(school_urls)} colegios "
+                        f"({durations[-1]:.2f}s)")
+            fichas.append([(region, comuna, url) for url in school_urls])
+        # Intercalar las comunas para que cada nivel mida fichas de varias de ellas
+        interleaved = [entry for group in zip(*fichas) for entry in group] if fichas else []
+        longest = max((len(group) for group in fichas), default=0)
+        shortest = min((len(group) for group in fichas), default=0)
+        for group in fichas:
+            interleaved += group[shortest:longest]
+        return interleaved, durations
+
+    def _measure_level(self, concurrency: int, batch: List[Tuple[Dict, Dict, str]]) -> Dict:
+        """
+        Extrae el lote con la concurrencia indicada y mide ritmo, latencia,
+        errores y reintentos. Los Chrome de los hilos se abren antes de
+        empezar a medir; su arranque se informa aparte (startup_seconds).
+        """
+        scraper = self.scraper
+        scraper.concurrency = concurrency
+        warm_up = time.perf_counter()
+        scraper.warm_up_drivers()
+        warm_up = time.perf_counter() - warm_up
+        scraper.metrics = Metrics(None, None)
+        places = {url: (region['text'], comuna['text']) for region, comuna, url in batch}
+        start = time.perf_counter()
+        results = scraper.extract_schools([url for _, _, url in batch])
+        wall = time.perf_counter() - start
+        for school_data in results:
+            if school_data:
+                school_data['region'], school_data['comuna'] = places[school_data['url']]
+                self.data.append(school_data)
+        stats = scraper.metrics.summary()
+        ficha = stats['stages'].get('ficha', {})
+        level = {
+            'concurrency': concurrency,
+            'fichas': len(batch),
+            'failed': sum(1 for school_data in results if school_data is None),
+            'retries': int(stats['counters'].get('retries', 0)),
+            'wall_seconds': wall,
+            'startup_seconds': warm_up,
+            'latency_avg': ficha.get('avg'),
+            'latency_p95': ficha.get('p95'),
+            'stages': stats['stages'],
+        }
+        logger.info(f"✓ Concurrencia {concurrency}: {len(batch)} fichas en {wall:.1f}s "
+                    f"({len(batch) / wall * 60 if wall else 0:.1f}/min), {level['failed']} fallidas, "
+                    f"{level['retries']} reintentos (arranque de Chrome {warm_up:.1f}s aparte)")
+        return level
+
+    def run_pilot_test(self) -> Optional[Dict]:
+        """Ejecuta la prueba piloto y retorna la estimación (None si falló)"""
         logger.info("=" * 70)
-        logger.info("INICIANDO PRUEBA PILOTO - 1 REGIÓN, 1 COMUNA")
+        logger.info("INICIANDO PRUEBA PILOTO - MUESTRA ESTRATIFICADA DE COMUNAS")
         logger.info("=" * 70)
-        
+        scraper = self.scraper
+
         try:
-            self.setup_driver()
-            self.driver.get(self.base_url)
-            time.sleep(3)
-            
-            # Obtener regiones
-            regions = self.get_regions()
+            startup = time.perf_counter()
+            scraper.start_browser()
+            startup = time.perf_counter() - startup
+            regions = scraper.get_catalog()
             if not regions:
                 logger.error("No se pudieron obtener las regiones")
-                return
-            
-            # SOLO PRIMERA REGIÓN
-            region = regions[0]
-            logger.info(f"\n📍 REGIÓN DE PRUEBA: {region['text']}")
-            
-            # Navegar de nuevo y seleccionar región
-            self.driver.get(self.base_url)
-            time.sleep(2)
-            
-            if not self.select_region(region['value'], region['text']):
-                return
-            
-            # Obtener comunas
-            comunas = self.get_comunas()
-            if not comunas:
-                logger.error("No se pudieron obtener las comunas")
-                return
-            
-            # SOLO PRIMERA COMUNA
-            comuna = comunas[0]
-            logger.info(f"\n📍 COMUNA DE PRUEBA: {comuna['text']}")
-            
-            # Seleccionar comuna y buscar
-            if not self.select_comuna(comuna['value'], comuna['text']):
-                return
-            
-            # Obtener colegios
-            school_urls = self.get_schools_in_page()
-            if not school_urls:
-                logger.warning("No se encontraron colegios en esta comuna")
-                return
-            
-            logger.info(f"\n🏫 Se procesarán {len(school_urls)} colegios\n")
-            
-            # Procesar cada colegio
-            for i, school_url in enumerate(school_urls, 1):
-                logger.info(f"\n{'─' * 70}")
-                logger.info(f"COLEGIO {i}/{len(school_urls)}")
-                logger.info(f"{'─' * 70}")
-                
-                school_data = self.extract_school_data(school_url, region['text'], comuna['text'])
-                if school_data:
-                    self.data.append(school_data)
-            
-            # Guardar resultados
+                return None
+
+            counts = {
+                (region['value'], comuna['value']): scraper.catalog.school_count(region, comuna)
+                for region, comunas in regions for comuna in comunas
+            }
+            sample = stratified_sample(regions, counts, self.comunas_per_region, self.seed)
+            logger.info(f"\n📍 Muestra: {len(sample)} comunas de {len(counts)} "
+                        f"({self.comunas_per_region} por región)")
+
+            scraper.metrics = Metrics(None, None)
+            fichas, search_durations = self._search_sample(sample)
+            search_stages = scraper.metrics.summary()['stages']
+            if not fichas:
+                logger.warning("No se encontraron colegios en las comunas de la muestra")
+                return None
+
+            levels = []
+            position = 0
+            for concurrency in self.levels:
+                size = max(self.fichas_per_level, 2 * concurrency)
+                batch = fichas[position:position + size]
+                if not batch:
+                    logger.warning(f"No quedan fichas para medir la concurrencia {concurrency}")
+                    break
+                position += len(batch)
+                levels.append(self._measure_level(concurrency, batch))
+
+            # Conteos actualizados con la muestra
+            counts.update({(region['value'], comuna['value']): scraper.catalog.school_count(region, comuna)
+                           for region, comuna in sample})
+            schools = estimate_school_total(regions, counts)
+            self.estimate = project_runtime(
+                schools['schools'], schools['comunas'],
+                sum(search_durations) / len(search_durations), startup, levels,
+            )
+            self.estimate.update({
+                'engine': scraper.engine,
+                'fields': scraper.fields,
+                'sample': [{'region': region['text'], 'comuna': comuna['text'],
+                            'schools': scraper.catalog.school_count(region, comuna)} for region, comuna in sample],
+                'schools_by_region': schools['by_region'],
+                'estimated_comunas': schools['estimated_comunas'],
+                'search_stages': search_stages,
+                'measurements': levels,
+            })
+            with open(self.estimate_file, 'w', encoding='utf-8') as f:
+                json.dump(self.estimate, f, ensure_ascii=False, indent=2)
+
             self.save_results()
-            
+
             logger.info("\n" + "=" * 70)
             logger.info(f"✓ PRUEBA PILOTO COMPLETADA")
-            logger.info(f"✓ Total de colegios procesados: {len(self.data)}")
-            logger.info(f"✓ Archivo generado: colegios_piloto.xlsx")
+            logger.info(f"✓ Colegios esperados: {schools['schools']} "
+                        f"({schools['estimated_comunas']} comunas sin conteo, estimadas por región)")
+            log_estimate(self.estimate)
+            logger.info(f"✓ Archivos generados: colegios_piloto.xlsx, {self.estimate_file}")
             logger.info("=" * 70)
-            
+            return self.estimate
+
         except Exception as e:
             logger.error(f"✗ Error durante la prueba piloto: {e}")
             if self.data:
                 self.save_results()
+            return None
         finally:
-            if self.driver:
-                self.driver.quit()
-                
+            scraper.close_browser()
+            scraper.catalog.save()
+
     def save_results(self):
-        """Guarda los resultados en Excel"""
+        """Guarda los colegios extraídos durante la prueba en Excel"""
         if not self.data:
             logger.warning("No hay datos para guardar")
             return
-            
+
         df = pd.DataFrame(self.data)
-        columns_order = ['nombre', 'direccion', 'telefono', 'email', 'pagina_web', 'director', 'sostenedor', 'matricula_total', 'region', 'comuna', 'url']
-        df = df[columns_order]
-        
+        df = df[self.scraper.columns]
+
         filename = "colegios_piloto.xlsx"
         df.to_excel(filename, index=False, engine='openpyxl')
-        
+
         logger.info(f"\n📊 Datos guardados en {filename}")
         logger.info(f"   Registros: {len(self.data)}")
 
@@ -426,17 +223,24 @@ class MinEducScraperPiloto:
 if __name__ == "__main__":
     # Configuración
     HEADLESS = False  # Cambiar a True para ejecutar sin ventana visible
-    
+    ENGINE = ENGINE_SELENIUM  # El mismo motor que se usará en la ejecución completa
+    LEVELS = (1, 2, 4, 8)  # Niveles de concurrencia a medir
+    COMUNAS_PER_REGION = 2  # Comunas de la muestra por región
+    FIELDS = None  # Los mismos campos que pedirá la ejecución completa (None = todos)
+
     print("\n" + "=" * 70)
     print("🧪 SCRAPER MINEDUC - PRUEBA PILOTO")
     print("=" * 70)
     print("\nEste script probará:")
     print("  ✓ Conexión al sitio MINEDUC")
-    print("  ✓ Extracción de regiones")
-    print("  ✓ Extracción de comunas")
-    print("  ✓ Extracción de datos de colegios")
+    print("  ✓ Catálogo de regiones y comunas")
+    print(f"  ✓ Búsqueda de {COMUNAS_PER_REGION} comunas por región")
+    print(f"  ✓ Extracción de fichas con concurrencia {', '.join(map(str, LEVELS))}")
+    print("  ✓ Estimación de la duración total y la concurrencia recomendada")
     print(f"\nModo: {'Headless (sin ventana)' if HEADLESS else 'Con ventana visible'}")
     print("=" * 70 + "\n")
-    
-    scraper = MinEducScraperPiloto(headless=HEADLESS)
-    scraper.run_pilot_test()
+
+    with LogPipeline('scraper_piloto.log', school_log_file='scraper_piloto_colegios.jsonl'):
+        scraper = MinEducScraperPiloto(headless=HEADLESS, engine=ENGINE, levels=LEVELS,
+                                       comunas_per_region=COMUNAS_PER_REGION, fields=FIELDS)
+        scraper.run_pilot_test()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Recuperación de sesiones de Chrome y reintentos de fichas
+Detecta cuando chromedriver murió o quedó colgado (por ejemplo "Connection
+refused" a localhost) para reemplazar el driver, y reintenta las fichas que
+fallaron con backoff exponencial dentro de un presupuesto de reintentos
+"""
+
+import time
+import heapq
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+from selenium.common.exceptions import InvalidSessionIdException, TimeoutException
+
+logger = logging.getLogger(__name__)
+
+# Mensajes de error con los que selenium/urllib3 reportan un driver perdido
+DEAD_SESSION_MESSAGES = (
+    "connection refused",
+    "max retries exceeded",
+    "invalid session id",
+    "chrome not reachable",
+    "disconnected",
+    "session deleted",
+    "no such window",
+    "target window already closed",
+    "remote end closed connection",
+)
+
+
+def is_session_dead(error: BaseException) -> bool:
+    """True si el error indica que el driver ya no responde"""
+    if isinstance(error, (InvalidSessionIdException, ConnectionError)):
+        return True
+    message = str(error).lower()
+    return any(text in message for text in DEAD_SESSION_MESSAGES)
+
+
+def driver_alive(driver) -> bool:
+    """Hace una llamada mínima al driver para comprobar que responde"""
+    if driver is None:
+        return False
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception as e:
+        # Además de WebDriverException, urllib3 lanza sus propias excepciones
+        # cuando chromedriver ya no escucha
+        logger.debug(f"Driver sin respuesta: {e}")
+        return False
+
+
+def needs_restart(driver, error: BaseException) -> bool:
+    """
+    Decide si un error al usar el driver requiere reemplazarlo: el error
+    indica una sesión perdida, o fue un timeout y el driver no responde
+    """
+    if is_session_dead(error):
+        return True
+    if isinstance(error, TimeoutException):
+        return not driver_alive(driver)
+    return False
+
+
+class RetryQueue:
+    """
+    Cola de reintentos con backoff exponencial. Cada elemento se reintenta
+    como máximo `max_attempts` veces, esperando base_delay * 2^(intento-1)
+    segundos (tope max_delay); `budget` limita el total de reintentos de la
+    ejecución para que un sitio caído no la alargue indefinidamente.
+    """
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 2.0, max_delay: float = 60.0,
+                 budget: Optional[int] = 500):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+        self.retried = 0
+        self.recovered = 0
+        self.exhausted = 0
+        self._heap: List[Tuple[float, int, object, int]] = []
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    def push(self, item, attempt: int = 1) -> bool:
+        """
+        Programa el reintento número `attempt` de un elemento. Retorna False
+        (y lo cuenta como agotado) si superó sus intentos o el presupuesto.
+        """
+        with self._lock:
+            if attempt > self.max_attempts or (self.budget is not None and self.retried >= self.budget):
+                self.exhausted += 1
+                return False
+            self.retried += 1
+            delay = min(self.base_delay * 2 ** (attempt - 1), self.max_delay)
+            heapq.heappush(self._heap, (time.monotonic() + delay, self._sequence, item, attempt))
+            self._sequence += 1
+            return True
+
+    def mark_recovered(self):
+        with self._lock:
+            self.recovered += 1
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def next_batch(self) -> List[Tuple[object, int]]:
+        """
+        Espera hasta que venza el próximo reintento y retorna todos los
+        (elemento, intento) que ya vencieron
+        """
+        with self._lock:
+            if not self._heap:
+                return []
+            wait = self._heap[0][0] - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        now = time.monotonic()
+        batch = []
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                _, _, item, attempt = heapq.heappop(self._heap)
+                batch.append((item, attempt))
+        return batch
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'retried': self.retried,
+                'recovered': self.recovered,
+                'exhausted': self.exhausted,
+                'budget_left': None if self.budget is None else max(self.budget - self.retried, 0),
+            }
+
+    def log_stats(self):
+        stats = self.stats()
+        logger.info(
+            f"Reintentos: {stats['retried']} programados, {stats['recovered']} recuperados, "
+            f"{stats['exhausted']} agotados"
+            + (f", presupuesto restante {stats['budget_left']}" if stats['budget_left'] is not None else "")
+        )
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Reparto determinista de las comunas entre N máquinas (shards)
+Cada shard recibe un subconjunto disjunto de comunas con una cantidad de
+colegios esperada similar (según el catálogo). Al terminar, cada shard deja un
+manifiesto que merge_shards.py verifica antes de combinar las salidas.
+"""
+
+import os
+import json
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+Option = Dict[str, str]
+
+
+def parse_shard(text: str) -> Tuple[int, int]:
+    """Convierte "i/N" (1 <= i <= N) en (i, N)"""
+    try:
+        index, total = (int(part) for part in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard inválido '{text}': se espera i/N, por ejemplo 2/4")
+    if total < 1 or not 1 <= index <= total:
+        raise ValueError(f"Shard inválido '{text}': i debe estar entre 1 y N")
+    return index, total
+
+
+def shard_suffix(shard: Tuple[int, int]) -> str:
+    """Sufijo de los archivos de un shard, por ejemplo _shard2de4"""
+    return f"_shard{shard[0]}de{shard[1]}"
+
+
+def with_suffix(path: str, suffix: str) -> str:
+    """Agrega el sufijo antes de la extensión: salida.jsonl -> salida_shard2de4.jsonl"""
+    root, extension = os.path.splitext(path)
+    return f"{root}{suffix}{extension}"
+
+
+def partition(items: List[Tuple[tuple, float]], shards: int) -> List[List[tuple]]:
+    """
+    Reparte (clave, peso) en `shards` grupos de peso parecido: de mayor a
+    menor peso, cada elemento va al grupo más liviano (empates al de menor
+    índice). Las claves desempatan el orden, así que el resultado solo
+    depende de la lista de entrada.
+    """
+    groups = [[] for _ in range(shards)]
+    loads = [0.0] * shards
+    for key, weight in sorted(items, key=lambda item: (-item[1], item[0])):
+        target = min(range(shards), key=lambda index: (loads[index], index))
+        groups[target].append(key)
+        loads[target] += weight
+    return groups
+
+
+def shard_plan(regions: List[Tuple[Option, List[Option]]], counts: Dict[tuple, Optional[int]],
+               shards: int) -> Tuple[List[List[tuple]], str]:
+    """
+    Reparte las comunas del catálogo entre los shards. Las comunas sin
+    conteo pesan el promedio de las conocidas (o 1 si no hay ninguna).
+
+    Args:
+        regions: (región, comunas) del catálogo
+        counts: Colegios esperados por (valor región, valor comuna)
+
+    Returns:
+        Claves (valor región, valor comuna) de cada shard y un digest del
+        reparto completo, igual en todas las máquinas que usen el mismo catálogo
+    """
+    keys = [(region['value'], comuna['value']) for region, comunas in regions for comuna in comunas]
+    known = [counts[key] for key in keys if counts.get(key) is not None]
+    default = sum(known) / len(known) if known else 1
+    groups = partition([(key, counts.get(key) if counts.get(key) is not None else default) for key in keys], shards)
+    digest = hashlib.sha256(json.dumps(groups, sort_keys=True).encode('utf-8')).hexdigest()
+    return groups, digest
+
+
+def file_sha256(path: str) -> Optional[str]:
+    """SHA-256 de un archivo (None si no existe)"""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def write_manifest(path: str, shard: Tuple[int, int], plan_digest: str, comunas_total: int,
+                   assigned: List[Dict], output_file: str, records: int, fields: Optional[List[str]] = None):
+    """
+    Escribe el manifiesto de un shard: comunas asignadas con su estado,
+    registros escritos, campos extraídos y el hash de la salida para que el
+    merge la verifique
+    """
+    manifest = {
+        'shard': shard[0],
+        'shards': shard[1],
+        'plan_digest': plan_digest,
+        'comunas_total': comunas_total,
+        'assigned': assigned,
+        'complete': all(entry['state'] == 'done' for entry in assigned),
+        'output_file': os.path.basename(output_file),
+        'output_sha256': file_sha256(output_file),
+        'records': records,
+        'fields': fields,
+        'updated': datetime.now().isoformat(),
+    }
+    write_json_atomic(path, manifest)
+    return manifest
+
+
+def write_json_atomic(path: str, data: Dict):
+    """Escribe el JSON en un temporal y lo reemplaza de una vez"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(path: str) -> Dict:
+    """Lee un manifiesto (o el reparto guardado) de un shard"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
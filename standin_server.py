@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+Servidor local que imita el buscador MINEDUC para pruebas de carga sin conexión
+Sirve una búsqueda avanzada (selects #region/#comuna que se repueblan por JS,
+enlace a.boton_caja con EnviaBusqueda y tabla#busqueda_avanzada con el RBD en
+el onclick) y fichas ficha?rbd=N con la misma estructura de etiquetas y
+valores que el sitio real, para un número configurable de colegios sintéticos.
+Puede agregar latencia, errores HTTP y conexiones cortadas a pedido.
+
+Uso: python standin_server.py --schools 2000 --regions 4 --comunas 40 --latency 0.2 --error-rate 0.02
+"""
+
+import sys
+import json
+import time
+import socket
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+logger = logging.getLogger(__name__)
+
+SEARCH_PATH = "/mime-web/mvc/mime/busqueda_avanzada"
+FICHA_PATH = "/mime-web/mvc/mime/ficha"
+CONTROL_PATH = "/__standin/config"
+
+_STREETS = ["Bulnes", "Prat", "O'Higgins", "Baquedano", "Serrano", "Latorre", "Sotomayor", "Vivar"]
+_NAMES = ["Escuela", "Liceo", "Colegio", "Academia", "Instituto", "Escuela Básica"]
+_PEOPLE = ["María González", "Juan Muñoz", "Carolina Rojas", "Pedro Díaz", "Ana Soto", "Luis Contreras"]
+_DEPENDENCIES = ["Municipal", "Particular Subvencionado", "Particular Pagado", "Servicio Local"]
+
+# Encabezado de cada campo que puede mostrarse como columna extra de la tabla de resultados
+TABLE_HEADERS = {
+    'direccion': "Dirección", 'telefono': "Teléfono", 'email': "E-mail", 'pagina_web': "Página web",
+    'director': "Director(a)", 'sostenedor': "Sostenedor", 'matricula_total': "Matrícula",
+}
+
+
+class SyntheticSite:
+    """
+    Regiones, comunas y colegios generados a partir de una semilla: la
+    misma configuración produce siempre el mismo sitio. Los colegios se
+    reparten en forma desigual entre comunas (como en el sitio real) y una
+    fracción de las fichas omite algunos campos.
+    """
+
+    def __init__(self, schools: int = 500, regions: int = 3, comunas: int = 12, seed: int = 0,
+                 missing_rate: float = 0.1, table_fields: List[str] = ()):
+        """
+        Args:
+            schools: Colegios en total
+            regions: Regiones
+            comunas: Comunas en total (repartidas entre las regiones)
+            seed: Semilla de los datos generados
+            missing_rate: Fracción de fichas a las que les falta algún campo
+            table_fields: Campos que la tabla de resultados muestra además
+                del RBD, el nombre y la comuna (claves de TABLE_HEADERS)
+        """
+        unknown = [field for field in table_fields if field not in TABLE_HEADERS]
+        if unknown:
+            raise ValueError(f"Columnas desconocidas para la tabla de resultados: {', '.join(unknown)}")
+        self.table_fields = list(table_fields)
+        rng = random.Random(seed)
+        self.regions = [{'value': str(index), 'text': f"REGIÓN SINTÉTICA {index}"} for index in range(1, regions + 1)]
+        self.comunas: Dict[str, List[Dict[str, str]]] = {region['value']: [] for region in self.regions}
+        comuna_keys = []
+        for index in range(comunas):
+            region = self.regions[index % regions]
+            code = f"{region['value']}{index + 1:03d}"
+            self.comunas[region['value']].append({'value': code, 'text': f"Comuna {code}"})
+            comuna_keys.append((region['value'], code))
+
+        # Tamaños desiguales: algunas comunas concentran muchos colegios
+        cumulative, total = [], 0.0
+        for _ in comuna_keys:
+            total += rng.paretovariate(1.5)
+            cumulative.append(total)
+        self.schools_by_comuna: Dict[tuple, List[str]] = {key: [] for key in comuna_keys}
+        self.schools: Dict[str, Dict[str, str]] = {}
+        for number in range(schools):
+            # Cada comuna tiene al menos un colegio; el resto se reparte según los pesos
+            if number < len(comuna_keys):
+                key = comuna_keys[number]
+            else:
+                key = rng.choices(comuna_keys, cum_weights=cumulative)[0]
+            rbd = str(10000 + number)
+            school = {
+                'nombre': f"{rng.choice(_NAMES)} Sintética {rbd}",
+                'direccion': f"{rng.choice(_STREETS)} {rng.randint(1, 3000)}",
+                'telefono': str(rng.randint(2000000, 9999999)),
+                'email': f"contacto{rbd}@colegio.cl",
+                'pagina_web': f"www.colegio{rbd}.cl",
+                'director': rng.choice(_PEOPLE),
+                'sostenedor': f"Sostenedor {rng.randint(1, 400)}",
+                'dependencia': rng.choice(_DEPENDENCIES),
+                'matricula_total': str(rng.randint(20, 2500)),
+            }
+            if rng.random() < missing_rate:
+                for field in rng.sample(['telefono', 'email', 'pagina_web', 'matricula_total'], rng.randint(1, 2)):
+                    school[field] = ''
+            self.schools[rbd] = school
+            self.schools_by_comuna[key].append(rbd)
+
+    def results(self, region: str, comuna: str) -> List[str]:
+        """RBD de una búsqueda; comuna "0" (Todas) retorna los de toda la región"""
+        if comuna in ('', '0', None):
+            return [rbd for (region_value, _), rbds in self.schools_by_comuna.items()
+                    if region_value == region for rbd in rbds]
+        return self.schools_by_comuna.get((region, comuna), [])
+
+    def comuna_text(self, region: str, comuna: str) -> str:
+        return next((option['text'] for option in self.comunas.get(region, []) if option['value'] == comuna), '')
+
+    def search_page(self, region: str = '', comuna: str = '') -> str:
+        """Página de búsqueda avanzada, con la tabla de resultados si se indicó una región"""
+        region_options = ['<option value="">Todas</option>'] + [
+            f'<option value="{option["value"]}"{" selected" if option["value"] == region else ""}>'
+            f'{escape(option["text"])}</option>'
+            for option in self.regions
+        ]
+        comuna_options = ['<option value="0">Todas</option>'] + [
+            f'<option value="{option["value"]}"{" selected" if option["value"] == comuna else ""}>'
+            f'{escape(option["text"])}</option>'
+            for option in self.comunas.get(region, [])
+        ]
+        table = ''
+        if region:
+            rows = "\n".join(
+                f'<tr><td>{rbd}</td><td><a href="javascript:void(0)" '
+                f'onclick="document.fichaescuela.rbd.value=\'{rbd}\';document.fichaescuela.submit();">'
+                f'{escape(self.schools[rbd]["nombre"])}</a></td>'
+                f'<td>{escape(self.comuna_text(region, comuna))}</td>'
+                + "".join(f'<td>{escape(self.schools[rbd][field])}</td>' for field in self.table_fields)
+                + '</tr>'
+                for rbd in self.results(region, comuna)
+            )
+            headers = "".join(f'<th>{TABLE_HEADERS[field]}</th>' for field in self.table_fields)
+            table = (f'<table id="busqueda_avanzada"><thead><tr><th>RBD</th><th>Nombre</th><th>Comuna</th>'
+                     f'{headers}</tr></thead><tbody>\n{rows}\n</tbody></table>')
+        comunas_json = json.dumps(self.comunas, ensure_ascii=False).replace('</', '<\\/')
+        return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Búsqueda avanzada - Mineduc (sintético)</title></head>
+<body>
+<form name="busqueda" method="post" action="{SEARCH_PATH}">
+  <select id="region" name="region">{''.join(region_options)}</select>
+  <select id="comuna" name="comuna">{''.join(comuna_options)}</select>
+  <input type="hidden" name="pagina" value="1">
+  <a class="boton_caja" href="javascript:void(0)" onclick="EnviaBusqueda()">Buscar</a>
+</form>
+{table}
+<form name="fichaescuela" method="post" action="{FICHA_PATH}"><input type="hidden" name="rbd" value=""></form>
+<script>
+var COMUNAS = {comunas_json};
+function EnviaBusqueda() {{ document.busqueda.submit(); }}
+document.getElementById('region').addEventListener('change', function() {{
+  var region = this.value, select = document.getElementById('comuna');
+  // Como en el sitio real, las comunas llegan un momento después
+  setTimeout(function() {{
+    select.innerHTML = '<option value="0">Todas</option>';
+    (COMUNAS[region] || []).forEach(function(c) {{
+      var option = document.createElement('option');
+      option.value = c.value; option.textContent = c.text; select.appendChild(option);
+    }});
+  }}, 50);
+}});
+</script>
+</body>
+</html>"""
+
+    def ficha_page(self, rbd: str) -> Optional[str]:
+        """Ficha de un colegio con la misma estructura que el sitio (None si no existe)"""
+        school = self.schools.get(rbd)
+        if school is None:
+            return None
+        rows = "\n".join(
+            f'    <tr><td class="form_etiqueta">{label}</td><td class="form_dato">{escape(school[field])}</td></tr>'
+            for label, field in [("Dirección:", 'direccion'), ("Teléfono:", 'telefono'),
+                                 ("E-mail contacto:", 'email'), ("Página web:", 'pagina_web'),
+                                 ("Director(a):", 'director'), ("Sostenedor:", 'sostenedor')]
+            if school[field]
+        )
+        matricula = (f'  <div class="form_fila"><div class="form_etiqueta">Matrícula total de alumnos:</div>'
+                     f'<div class="form_detalle">{school["matricula_total"]}</div></div>'
+                     if school['matricula_total'] else '')
+        return f"""<!DOCTYPE html>
+<html lang="es">
+<head><meta charset="UTF-8"><title>Ficha Establecimiento - Mineduc (sintético)</title></head>
+<body>
+<div id="contenedor">
+<div class="titulo_color"><table width="100%"><tr>
+  <td>{escape(school['nombre'])}</td><td align="right">RBD: {rbd}</td>
+</tr></table></div>
+<div class="caja_ficha">
+  <table class="tabla_ficha">
+{rows}
+  </table>
+</div>
+<a href="javascript:void(0)" onclick="document.getElementById('info_inst').style.display='block'">Información institucional</a>
+<div id="info_inst" style="display:none">
+  <div class="form_fila"><div class="form_etiqueta">Dependencia:</div><div class="form_detalle">{school['dependencia']}</div></div>
+{matricula}
+</div>
+</div>
+<form name="fichaescuela" method="post" action="{FICHA_PATH}"><input type="hidden" name="rbd" value=""></form>
+</body>
+</html>"""
+
+
+class Faults:
+    """
+    Fallas inyectadas en cada request: latencia fija más una variación
+    aleatoria, fracción de respuestas 500/503 y fracción de conexiones
+    cortadas sin respuesta. Se pueden cambiar mientras el servidor corre.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 drop_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def update(self, **values):
+        """Cambia los parámetros indicados (latency, jitter, error_rate, drop_rate)"""
+        with self._lock:
+            for name, value in values.items():
+                if name not in ('latency', 'jitter', 'error_rate', 'drop_rate'):
+                    raise ValueError(f"Parámetro de falla desconocido: {name}")
+                setattr(self, name, float(value))
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return {'latency': self.latency, 'jitter': self.jitter,
+                    'error_rate': self.error_rate, 'drop_rate': self.drop_rate}
+
+    def draw(self) -> tuple:
+        """(segundos de espera, falla) para un request; falla es None, 'error' o 'drop'"""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            roll = self._random.random()
+            if roll < self.drop_rate:
+                fault = 'drop'
+            elif roll < self.drop_rate + self.error_rate:
+                fault = 'error'
+            else:
+                fault = None
+        return delay, fault
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "MineducStandin/1.0"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _params(self) -> Dict[str, str]:
+        parsed = urlparse(self.path)
+        params = {name: values[-1] for name, values in parse_qs(parsed.query).items()}
+        if self.command == 'POST':
+            length = int(self.headers.get('Content-Length') or 0)
+            body = self.rfile.read(length).decode('utf-8') if length else ''
+            if self.headers.get('Content-Type', '').startswith('application/json'):
+                params.update(json.loads(body or '{}'))
+            else:
+                params.update({name: values[-1] for name, values in parse_qs(body).items()})
+        return params
+
+    def _send(self, status: int, body: str, content_type: str = "text/html; charset=utf-8",
+              headers: Optional[Dict[str, str]] = None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(data)
+
+    def _drop(self):
+        """Corta la conexión sin responder"""
+        self.close_connection = True
+        try:
+            self.connection.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _handle(self):
+        standin: StandinServer = self.server.standin
+        path = urlparse(self.path).path
+        params = self._params()
+
+        if path == CONTROL_PATH:
+            if self.command == 'POST':
+                standin.faults.update(**params)
+            self._send(200, json.dumps({'faults': standin.faults.snapshot(), 'stats': standin.stats()}),
+                       "application/json")
+            return
+
+        kind = 'search' if path == SEARCH_PATH else 'ficha' if path == FICHA_PATH else 'other'
+        delay, fault = standin.faults.draw()
+        standin.count(kind, fault)
+        if delay:
+            time.sleep(delay)
+        if fault == 'drop':
+            self._drop()
+            return
+        if fault == 'error':
+            self._send(random.choice((500, 503)), "<html><body>Error interno</body></html>")
+            return
+
+        if kind == 'search':
+            self._send(200, standin.site.search_page(params.get('region', ''), params.get('comuna', '')))
+        elif kind == 'ficha':
+            html = standin.site.ficha_page(params.get('rbd', ''))
+            if html is None:
+                self._send(404, "<html><body>Establecimiento no encontrado</body></html>")
+                return
+            etag = '"' + hashlib.sha256(html.encode('utf-8')).hexdigest()[:16] + '"'
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self._send(200, html, headers={'ETag': etag})
+        else:
+            self._send(404, "<html><body>No encontrado</body></html>")
+
+    do_GET = _handle
+    do_POST = _handle
+    do_HEAD = _handle
+
+
+class StandinServer:
+    """
+    Servidor HTTP (un hilo por conexión) con el sitio sintético. start()
+    lo deja corriendo en segundo plano; base_url y ficha_url_template son
+    los valores para MinEducScraper.
+    """
+
+    def __init__(self, site: Optional[SyntheticSite] = None, host: str = "127.0.0.1", port: int = 0,
+                 faults: Optional[Faults] = None):
+        """
+        Args:
+            site: Sitio sintético (por defecto SyntheticSite())
+            host: Dirección donde escuchar
+            port: Puerto (0 elige uno libre)
+            faults: Latencia y fallas a inyectar (por defecto ninguna)
+        """
+        self.site = site or SyntheticSite()
+        self.faults = faults or Faults()
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.standin = self
+        self._thread = None
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def base_url(self) -> str:
+        return self.url + SEARCH_PATH
+
+    @property
+    def ficha_url_template(self) -> str:
+        return self.url + FICHA_PATH + "?rbd={rbd}"
+
+    def count(self, kind: str, fault: Optional[str]):
+        with self._lock:
+            self._counts[kind] = self._counts.get(kind, 0) + 1
+            if fault:
+                self._counts[fault] = self._counts.get(fault, 0) + 1
+
+    def stats(self) -> Dict[str, int]:
+        """Requests por tipo (search, ficha, other) y fallas inyectadas (error, drop)"""
+        with self._lock:
+            return dict(self._counts)
+
+    def start(self) -> "StandinServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="standin", daemon=True)
+        self._thread.start()
+        logger.info(f"Sitio sintético en {self.base_url} ({len(self.site.schools)} colegios)")
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitio MINEDUC sintético para pruebas sin conexión")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--schools", type=int, default=500, help="Colegios en total")
+    parser.add_argument("--regions", type=int, default=3, help="Regiones")
+    parser.add_argument("--comunas", type=int, default=12, help="Comunas en total")
+    parser.add_argument("--seed", type=int, default=0, help="Semilla de los datos generados")
+    parser.add_argument("--latency", type=float, default=0.0, help="Segundos de espera por request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Variación aleatoria adicional (segundos)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fracción de respuestas 500/503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="Fracción de conexiones cortadas")
+    parser.add_argument("--table-fields", default="",
+                        help=f"Columnas extra de la tabla de resultados ({','.join(TABLE_HEADERS)})")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    site = SyntheticSite(schools=args.schools, regions=args.regions, comunas=args.comunas, seed=args.seed,
+                         table_fields=[field for field in args.table_fields.split(",") if field])
+    faults = Faults(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate, drop_rate=args.drop_rate)
+    server = StandinServer(site, args.host, args.port, faults)
+    server.start()
+    logger.info(f"Fichas en {server.ficha_url_template}")
+    logger.info(f"Fallas ajustables con POST {server.url}{CONTROL_PATH} (JSON: latency, jitter, error_rate, drop_rate)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Pruebas del scraper (motor HTTP) contra el sitio sintético de standin_server.py
+Corren sin Chrome: el formulario de búsqueda se fija a mano en vez de leerlo
+con Selenium.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from record_sink import export_excel, read_records
+from scraper_mineduc import MinEducScraper
+from standin_server import Faults, StandinServer, SyntheticSite
+
+
+class StandinScraperTest(unittest.TestCase):
+
+    def setUp(self):
+        self._cwd = os.getcwd()
+        self._tmp = tempfile.TemporaryDirectory(prefix="test_scraper_")
+        os.chdir(self._tmp.name)
+        self.site = SyntheticSite(schools=40, regions=1, comunas=2, seed=3)
+        # La variación de latencia hace que las fichas terminen desordenadas
+        self.server = StandinServer(self.site, faults=Faults(jitter=0.05, seed=3)).start()
+
+    def tearDown(self):
+        self.server.stop()
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def make_scraper(self, **options) -> MinEducScraper:
+        scraper = MinEducScraper(engine="http", base_url=self.server.base_url,
+                                 ficha_url_template=self.server.ficha_url_template,
+                                 metrics_file=None, metrics_summary_file=None,
+                                 output_file="salida.jsonl", ledger_file="registro.sqlite", **options)
+        scraper.open_output()
+        scraper.setup_http_session()
+        scraper._search_form = {'action': self.server.base_url, 'method': 'POST',
+                                'fields': [('region', ''), ('comuna', '')],
+                                'region_field': 'region', 'comuna_field': 'comuna'}
+        scraper.retry_queue.base_delay = 0.01
+        return scraper
+
+    def scrape_region(self, scraper: MinEducScraper):
+        region = self.site.regions[0]
+        try:
+            scraper._scrape_region(region, self.site.comunas[region['value']])
+        finally:
+            scraper.close_browser()
+            scraper.close_output()
+
+    def table_order(self):
+        region = self.site.regions[0]['value']
+        return [rbd for comuna in self.site.comunas[region] for rbd in self.site.results(region, comuna['value'])]
+
+    def test_stored_order_follows_table_with_concurrency(self):
+        self.server.faults.update(error_rate=0.2)
+        scraper = self.make_scraper(concurrency=4)
+        self.scrape_region(scraper)
+
+        expected = self.table_order()
+        self.assertEqual([record['rbd'] for record in scraper.data], expected)
+        self.assertEqual([record['rbd'] for record in read_records("salida.jsonl")], expected)
+
+    def test_incremental_from_xlsx_without_hash_compares_values(self):
+        self.scrape_region(self.make_scraper())
+        # Un .xlsx no guarda _ficha_hash ni validadores HTTP
+        export_excel("salida.jsonl", "anterior.xlsx")
+        os.remove("salida.jsonl")
+        os.remove("registro.sqlite")
+        changed = self.table_order()[0]
+        self.site.schools[changed]['telefono'] = "1234567"
+
+        scraper = self.make_scraper(incremental_from="anterior.xlsx")
+        self.assertFalse(any(record.get('_ficha_hash') for record in scraper.previous_records.values()))
+        self.scrape_region(scraper)
+
+        report = scraper.incremental_report()
+        self.assertEqual(report['updated'], 1)
+        self.assertEqual(report['reused'], len(self.table_order()) - 1)
+        self.assertEqual(report['added'], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Trazas de una ejecución en formato Chrome trace-event
+Registra spans anidados (ejecución → región → comuna → colegio → campo) con
+su inicio, duración y atributos (RBD, comuna, ...). El JSON resultante se abre
+en chrome://tracing o https://ui.perfetto.dev para ver la línea de tiempo
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+
+class Tracer:
+    """
+    Acumula eventos "X" (completos) por hilo y los escribe al cerrar. El
+    visor anida los spans de un mismo hilo según su inicio y duración.
+    """
+
+    enabled = True
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Archivo JSON donde se escribe la traza al cerrar
+        """
+        self.path = path
+        self._events: List[Dict] = []
+        self._threads: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @staticmethod
+    def now() -> float:
+        """Reloj de la traza (segundos, monotónico)"""
+        return time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, **args):
+        """Registra el bloque como un span con los atributos indicados"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, start, time.perf_counter() - start, **args)
+
+    def record(self, name: str, start: float, duration: float, **args):
+        """Registra un span ya medido (inicio según Tracer.now(), duración en segundos)"""
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'ph': 'X',
+            'ts': start * 1e6,
+            'dur': duration * 1e6,
+            'pid': self._pid,
+            'tid': thread.ident,
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._events.append(event)
+            if thread.ident not in self._threads:
+                self._threads[thread.ident] = thread.name
+
+    def close(self):
+        """Escribe la traza (eventos y nombres de los hilos) en self.path"""
+        with self._lock:
+            events = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._threads.items()
+            ] + self._events
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, f, ensure_ascii=False)
+            logger.info(f"Traza guardada en {self.path} ({len(self._events)} spans)")
+        except OSError as e:
+            logger.warning(f"No se pudo escribir la traza {self.path}: {e}")
+
+
+class NullTracer:
+    """Trazas desactivadas: span() retorna siempre el mismo contexto vacío"""
+
+    enabled = False
+    _null = nullcontext()
+
+    @staticmethod
+    def now() -> float:
+        return 0.0
+
+    def span(self, name: str, **args):
+        return self._null
+
+    def record(self, name: str, start: float, duration: float, **args):
+        pass
+
+    def close(self):
+        pass
+
+
+NULL_TRACER = NullTracer()